@@ -22,6 +22,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings cover the rest of the stack.
+    'propertycontrol.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -58,12 +60,16 @@ DATABASES = {
         'PASSWORD': 'Aa@123456',
         'HOST': 'localhost',
         'PORT': '3306',
+        # Keep connections between requests (and between the async views'
+        # pooled reads) instead of reconnecting every time.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'propertycontrol.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -72,11 +78,34 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 6,  # Default if not passed, but it's always best to pass from frontend
 }
 
+# Reference data (departments, categories) is cached per process by default.
+# Point PROPERTYCONTROL_CACHE_ALIAS at a shared backend (e.g. Redis) so that
+# invalidations reach every worker immediately.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'propertycontrol',
+    }
+}
+PROPERTYCONTROL_CACHE_ALIAS = 'default'
+PROPERTYCONTROL_REFDATA_CACHE_TIMEOUT = 300  # seconds
+PROPERTYCONTROL_USER_CACHE_TTL = 30  # seconds, per-process user cache
+
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_REFRESH_SERIALIZER': 'propertycontrol.authentication.RevocableTokenRefreshSerializer',
+}
+
+# Revoked (logged-out or rotated) token JTIs. The in-process store is
+# per worker; use RedisRevocationStore to share revocations between workers:
+# {'BACKEND': 'propertycontrol.revocation.RedisRevocationStore',
+#  'OPTIONS': {'url': 'redis://localhost:6379/0'}}
+PROPERTYCONTROL_REVOCATION_STORE = {
+    'BACKEND': 'propertycontrol.revocation.InMemoryRevocationStore',
+    'OPTIONS': {'max_entries': 100000},
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -98,5 +127,43 @@ USE_TZ = True
 STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Serve MEDIA_ROOT from Django (with ETag/Range support, no authentication).
+# Leave this off in production and let the front-end web server serve it.
+PROPERTYCONTROL_SERVE_MEDIA = DEBUG
+
+# Stream uploads to a temporary file instead of buffering them in memory.
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+# Thumbnail/medium renditions: 'sync', 'thread' (background pool), 'queue'
+# (background job, needs `manage.py run_jobs`) or 'lazy'.
+PROPERTYCONTROL_IMAGE_RENDITIONS = 'thread'
+
+# Background jobs (`manage.py run_jobs`). Failed attempts are retried after
+# BACKOFF, 2 x BACKOFF, ... seconds; running jobs that have not reported
+# progress for TIMEOUT seconds are assumed lost and re-queued.
+PROPERTYCONTROL_JOB_FILES_ROOT = os.path.join(BASE_DIR, 'job_files')
+PROPERTYCONTROL_JOB_MAX_ATTEMPTS = 3
+PROPERTYCONTROL_JOB_RETRY_BACKOFF = 10  # seconds
+PROPERTYCONTROL_JOB_RETRY_BACKOFF_MAX = 3600  # seconds
+PROPERTYCONTROL_JOB_TIMEOUT = 3600  # seconds
+
+# Property codes are <category code>-000123, numbered per category. Each
+# process reserves BLOCK_SIZE numbers at a time; numbers still unused when
+# a process exits are skipped.
+PROPERTYCONTROL_CODE_BLOCK_SIZE = 100
+PROPERTYCONTROL_CODE_DEFAULT_PREFIX = 'PROP'  # for properties without a category
+
+# Serve the property and transfer lists from values() rows through the
+# precompiled serializers in fastread.py instead of DRF's field machinery.
+PROPERTYCONTROL_FAST_READS = True
+
+# Worker threads (each with its own DB connection) that run the async
+# views' independent ORM reads side by side.
+PROPERTYCONTROL_ASYNC_DB_THREADS = 8
+
+# Per-endpoint request metrics (GET /api/admin/metrics/). Percentiles are
+# over each endpoint's last WINDOW requests; a request running one SELECT
+# shape THRESHOLD times or more is logged as a possible N+1.
+PROPERTYCONTROL_METRICS_WINDOW = 1000
+PROPERTYCONTROL_N_PLUS_ONE_THRESHOLD = 10
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,10 +1,13 @@
 # backend/config/urls.py
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+from propertycontrol.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('propertycontrol.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if getattr(settings, 'PROPERTYCONTROL_SERVE_MEDIA', settings.DEBUG):
+    urlpatterns.append(re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media))
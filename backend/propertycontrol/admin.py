@@ -1,7 +1,11 @@
 # backend/propertycontrol/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
-from .models import User, Department, Category, Property, PropertyTransfer
+from .search import search_properties
+from .models import (
+    User, Department, Category, Property, PropertyTransfer, InventoryCounter, Job,
+    DepreciationPolicy, ValuationRun, CodeSequence
+)
 
 @admin.register(User)
 class UserAdmin(DjangoUserAdmin):
@@ -24,6 +28,9 @@ class DepartmentAdmin(admin.ModelAdmin):
     list_filter  = ("manager",)
     search_fields = ("name", "code")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).for_api()
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -46,7 +53,14 @@ class PropertyAdmin(admin.ModelAdmin):
         "name", "code", "serial_number", 
         "brand", "model",
     )
-    readonly_fields = ("code",)   # code is auto-generated
+    readonly_fields = ("code", "legacy_code")   # code is auto-generated
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).for_api()
+
+    def get_search_results(self, request, queryset, search_term):
+        # Same indexed backend as the API instead of per-field icontains.
+        return search_properties(queryset, search_term), False
 
 
 @admin.register(PropertyTransfer)
@@ -62,4 +76,62 @@ class PropertyTransferAdmin(admin.ModelAdmin):
     )
     search_fields = (
         "property__name", "property__code",
-    )
\ No newline at end of file
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).for_api()
+
+
+@admin.register(CodeSequence)
+class CodeSequenceAdmin(admin.ModelAdmin):
+    list_display = ("prefix", "next_value", "updated_at")
+    search_fields = ("prefix",)
+    # Lowering next_value would hand out codes that are already taken.
+    readonly_fields = ("prefix", "next_value", "updated_at")
+
+
+@admin.register(InventoryCounter)
+class InventoryCounterAdmin(admin.ModelAdmin):
+    list_display = (
+        "current_department", "category",
+        "status", "count", "total_value",
+    )
+    list_filter = ("status", "category")
+    readonly_fields = (
+        "current_department", "category",
+        "status", "count", "total_value",
+    )
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "kind", "status", "progress",
+        "attempts", "created_by", "created_at", "finished_at",
+    )
+    list_filter = ("status", "kind")
+    readonly_fields = (
+        "kind", "payload", "result", "error", "progress", "progress_message",
+        "attempts", "locked_by", "created_by", "created_at", "started_at", "finished_at",
+    )
+
+
+@admin.register(DepreciationPolicy)
+class DepreciationPolicyAdmin(admin.ModelAdmin):
+    list_display = (
+        "category", "method", "useful_life_years",
+        "salvage_rate", "declining_rate",
+    )
+    list_filter = ("method",)
+
+
+@admin.register(ValuationRun)
+class ValuationRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "as_of", "properties_valued", "properties_changed",
+        "value_before", "value_after", "started_at", "finished_at",
+    )
+    readonly_fields = (
+        "as_of", "created_by", "started_at", "finished_at", "properties_valued",
+        "properties_changed", "value_before", "value_after",
+    )
@@ -0,0 +1,159 @@
+# backend/propertycontrol/analytics.py
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import PropertyTransfer, TransferRollup, TransferRollupDay
+
+BUCKETS = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+GROUP_FIELDS = ('from_department', 'to_department', 'category')
+# A day is closed, and may be rolled up, this long after it ends, so
+# transactions still in flight at midnight have committed.
+ROLLUP_GRACE = timedelta(hours=1)
+# Rolled-up days this recent are re-counted on every run and redone if a
+# transfer committed later than the grace period added to them.
+ROLLUP_RECHECK = timedelta(days=7)
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def closed_before():
+    """Days strictly before the returned date are closed."""
+    return timezone.localtime(timezone.now() - ROLLUP_GRACE).date()
+
+
+def transfers_between(start, end):
+    return PropertyTransfer.objects.filter(
+        transfer_date__gte=day_start(start), transfer_date__lt=day_start(end)
+    ).order_by()
+
+
+def roll_up(day):
+    """(Re)build the rollup rows of one day and mark it done; return the row count."""
+    rows = transfers_between(day, day + timedelta(days=1)).values(
+        'from_department', 'to_department', 'category'
+    ).annotate(transfers=Count('id'), total_value=Sum('value'))
+    with transaction.atomic():
+        TransferRollup.objects.filter(day=day).delete()
+        TransferRollup.objects.bulk_create([
+            TransferRollup(
+                day=day,
+                week=day - timedelta(days=day.weekday()),
+                month=day.replace(day=1),
+                from_department_id=row['from_department'],
+                to_department_id=row['to_department'],
+                category_id=row['category'],
+                count=row['transfers'],
+                total_value=row['total_value'] or 0,
+            )
+            for row in rows
+        ])
+        TransferRollupDay.objects.update_or_create(day=day)
+    return len(rows)
+
+
+def late_days(start, end):
+    """Rolled-up days in ``[start, end)`` whose transfer count no longer matches the log."""
+    logged = dict(
+        transfers_between(start, end).annotate(period=TruncDay('transfer_date', output_field=DateField()))
+        .values('period').annotate(transfers=Count('id')).values_list('period', 'transfers')
+    )
+    rolled = dict(
+        TransferRollup.objects.filter(day__gte=start, day__lt=end).order_by()
+        .values('day').annotate(transfers=Sum('count')).values_list('day', 'transfers')
+    )
+    marked = TransferRollupDay.objects.filter(day__gte=start, day__lt=end).values_list('day', flat=True)
+    return {day for day in marked if logged.get(day, 0) != rolled.get(day, 0)}
+
+
+def roll_up_closed_days(since=None, rebuild=False):
+    """
+    Roll up every closed day from ``since`` (default: the first transfer)
+    that has no marker yet, or every one of them with ``rebuild``. Days in
+    the last ROLLUP_RECHECK are also redone when transfers committed after
+    they were rolled up. Only new or changed days cost anything, so this is
+    cheap to run from cron. Returns the number of days rolled up.
+    """
+    if since is None:
+        first = PropertyTransfer.objects.order_by('transfer_date').values_list('transfer_date', flat=True).first()
+        if first is None:
+            return 0
+        since = timezone.localtime(first).date()
+    until = closed_before()
+    done = set() if rebuild else set(
+        TransferRollupDay.objects.filter(day__gte=since, day__lt=until).values_list('day', flat=True)
+    )
+    if done:
+        done -= late_days(max(since, until - ROLLUP_RECHECK), until)
+    rolled = 0
+    day = since
+    while day < until:
+        if day not in done:
+            roll_up(day)
+            rolled += 1
+        day += timedelta(days=1)
+    return rolled
+
+
+def contiguous_ranges(days):
+    """``[date, ...]`` (sorted) -> ``[(first, day after last), ...]``."""
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return ranges
+
+
+def transfer_analytics(start, end, bucket='month', group_by=()):
+    """
+    Transfer counts and value moved between ``start`` and ``end`` (dates,
+    end exclusive) per ``bucket`` and ``group_by`` fields.
+
+    Days with a TransferRollupDay marker are read from the rollup table;
+    the rest (today, and anything not rolled up yet) is aggregated from the
+    transfer log with the same truncation. Both reads GROUP BY in the
+    database; only the two small results are merged here.
+    """
+    trunc = BUCKETS[bucket]
+    group_by = [field for field in GROUP_FIELDS if field in group_by]
+    totals = defaultdict(lambda: [0, Decimal('0')])
+
+    rolled = TransferRollup.objects.filter(day__gte=start, day__lt=end).order_by().annotate(
+        period=F(bucket)
+    ).values('period', *group_by).annotate(transfers=Sum('count'), moved=Sum('total_value'))
+
+    live = transfers_between(start, end)
+    rolled_days = TransferRollupDay.objects.filter(day__gte=start, day__lt=end).order_by('day')
+    for first, after in contiguous_ranges(rolled_days.values_list('day', flat=True)):
+        live = live.exclude(transfer_date__gte=day_start(first), transfer_date__lt=day_start(after))
+    live = live.annotate(
+        period=trunc('transfer_date', output_field=DateField())
+    ).values('period', *group_by).annotate(transfers=Count('id'), moved=Sum('value'))
+
+    for rows in (rolled, live):
+        for row in rows:
+            key = (row['period'],) + tuple(row[field] for field in group_by)
+            totals[key][0] += row['transfers']
+            totals[key][1] += Decimal(row['moved'] or 0)
+
+    def sort_key(item):
+        return tuple((value is None, value) for value in item[0])
+
+    return [
+        {
+            'period': key[0].isoformat(),
+            **dict(zip(group_by, key[1:])),
+            'count': count,
+            'value': str(value.quantize(Decimal('0.01'))),
+        }
+        for key, (count, value) in sorted(totals.items(), key=sort_key)
+    ]
@@ -0,0 +1,150 @@
+# backend/propertycontrol/async_views.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import dashboard
+from .authentication import ClaimsJWTAuthentication
+from .fieldsets import ordering_fields, restrict_queryset, selected_fields
+from .filters import filter_properties, parse_as_of
+from .models import Property, PropertyTransfer
+from .pagination import PropertyCursorPagination
+from .serializers import PropertyAsOfSerializer, PropertySerializer, PropertyTransferSerializer
+
+# Async counterparts of the read-heavy endpoints, for ASGI deployments.
+# Responses match the DRF views byte for byte; authentication reuses the
+# JWT claims path, which needs no query for tokens minted at login.
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        JSONRenderer().render(data), status=status, content_type='application/json'
+    )
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'PROPERTYCONTROL_ASYNC_DB_THREADS', 8),
+            thread_name_prefix='async-db',
+        )
+    return _executor
+
+
+def run_concurrently(func, *args):
+    """
+    Run a blocking ORM call on a worker thread with its own connection.
+
+    Django's async ORM serializes every query onto one thread, so
+    ``asyncio.gather`` over it gains nothing; independent reads dispatched
+    through here really do overlap. The threads come from a fixed pool and
+    keep their connections between calls for as long as CONN_MAX_AGE allows.
+    """
+    def call():
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False, executor=get_executor())()
+
+
+def jwt_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            result = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+        except APIException as exc:
+            return json_response({'detail': exc.detail}, status=exc.status_code)
+        if result is None:
+            return json_response(
+                {'detail': 'Authentication credentials were not provided.'}, status=401
+            )
+        request.user, request.auth = result
+        return await view(request, *args, **kwargs)
+    return require_GET(wrapper)
+
+
+@jwt_required
+async def dashboard_stats(request):
+    try:
+        as_of = parse_as_of(request.GET.get('as_of'))
+    except ValueError as e:
+        return json_response({'as_of': [str(e)]}, status=400)
+    totals, departments, categories, recent = await asyncio.gather(
+        run_concurrently(dashboard.property_totals, as_of),
+        run_concurrently(dashboard.department_names),
+        run_concurrently(dashboard.category_count),
+        run_concurrently(dashboard.recent_transfers, 5, as_of),
+    )
+    return json_response(dashboard.build_stats(totals, departments, categories, recent, as_of))
+
+
+@jwt_required
+async def recent_transfers(request):
+    try:
+        limit = int(request.GET.get('limit', 5))
+    except (ValueError, TypeError):
+        limit = 5
+    transfers = [
+        transfer async for transfer in
+        PropertyTransfer.objects.for_api().order_by('-transfer_date')[:limit]
+    ]
+    return json_response(PropertyTransferSerializer(transfers, many=True).data)
+
+
+@jwt_required
+async def property_list(request):
+    try:
+        as_of = parse_as_of(request.GET.get('as_of'))
+    except ValueError as e:
+        return json_response({'as_of': [str(e)]}, status=400)
+    serializer_class = PropertyAsOfSerializer if as_of is not None else PropertySerializer
+    try:
+        fields = selected_fields(serializer_class, request.GET)
+    except ValidationError as e:
+        return json_response(e.detail, status=400)
+    queryset = filter_properties(Property.objects.for_api(), request.GET, as_of=as_of)
+    # Same switch as OptionalCursorPaginationMixin on the sync view.
+    cursor = request.GET.get('pagination') == 'cursor' or 'cursor' in request.GET
+    paginator = PropertyCursorPagination() if cursor else api_settings.DEFAULT_PAGINATION_CLASS()
+    if fields is not None:
+        queryset = restrict_queryset(
+            queryset, serializer_class, fields, always=ordering_fields(queryset, paginator)
+        )
+
+    context = {'request': request}
+    if fields is not None:
+        context['fields'] = fields
+    if as_of is not None:
+        context['department_names'] = dict(await run_concurrently(dashboard.department_names))
+
+    try:
+        properties = await run_concurrently(paginator.paginate_queryset, queryset, Request(request))
+    except NotFound as e:
+        return json_response({'detail': e.detail}, status=404)
+    results = serializer_class(properties, many=True, context=context).data
+    return json_response(paginator.get_paginated_response(results).data)
+
+
+@jwt_required
+async def property_detail(request, pk):
+    try:
+        prop = await Property.objects.for_api().aget(pk=pk)
+    except Property.DoesNotExist:
+        return json_response({'detail': 'No Property matches the given query.'}, status=404)
+    return json_response(PropertySerializer(prop, context={'request': request}).data)
@@ -0,0 +1,162 @@
+# backend/propertycontrol/authentication.py
+import copy
+import time
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+from .revocation import RevocationStoreFull, get_revocation_store
+
+# user id -> (expires_at, user); per process, bounded by USER_CACHE_SIZE.
+_user_cache = {}
+USER_CACHE_SIZE = 10000
+
+
+def revoke_token(token):
+    """Revoke ``token``; False if it was already revoked."""
+    return get_revocation_store().revoke(token[api_settings.JTI_CLAIM], token['exp'])
+
+
+class RevocableRefreshToken(RefreshToken):
+    """Refresh token checked against the revocation store instead of the DB blacklist."""
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if get_revocation_store().is_revoked(self[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is revoked')
+
+    def outstand(self):
+        # Nothing to record: only revoked JTIs are stored, and only until expiry.
+        return None
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh that re-reads ``role`` and ``department`` from the user, so the
+    new access token (and the rotated refresh token) never carry claims
+    older than the refresh itself, and an inactive user cannot refresh.
+    """
+    token_class = RevocableRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        try:
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]})
+        except (KeyError, User.DoesNotExist):
+            user = None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # The rotated-out token must not be usable again; losing the
+            # race to revoke it means another refresh already used it. If
+            # it cannot be revoked at all, refuse rather than hand out a
+            # second live token.
+            try:
+                revoked = revoke_token(refresh)
+            except RevocationStoreFull:
+                raise InvalidToken('Token revocation is unavailable; log in again')
+            if not revoked:
+                raise InvalidToken('Token is revoked')
+
+        set_user_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
+def set_user_claims(token, user):
+    token['role'] = user.role
+    token['department'] = user.department_id
+
+
+def token_for_user(user):
+    """Mint a refresh token carrying the claims ClaimsJWTAuthentication reads."""
+    refresh = RevocableRefreshToken.for_user(user)
+    set_user_claims(refresh, user)
+    return refresh
+
+
+def get_cached_user(user_id):
+    now = time.monotonic()
+    entry = _user_cache.get(user_id)
+    if entry is None or entry[0] <= now:
+        try:
+            user = User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if len(_user_cache) >= USER_CACHE_SIZE:
+            _user_cache.clear()
+        ttl = getattr(settings, 'PROPERTYCONTROL_USER_CACHE_TTL', 30)
+        entry = _user_cache[user_id] = (now + ttl, user)
+    # Hand out a copy so one request's changes never leak into another.
+    return copy.copy(entry[1])
+
+
+def invalidate_cached_user(user_id):
+    _user_cache.pop(user_id, None)
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    ``request.user`` backed by the token claims.
+
+    ``id``, ``role`` and ``department_id`` come straight from the token, so
+    permission checks cost no query. Any other attribute loads the full
+    ``User`` through the short-TTL cache above.
+    """
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: get_cached_user(user_id))
+        self.__dict__['_claims'] = {
+            'id': user_id,
+            'role': token['role'],
+            'department_id': token.get('department'),
+        }
+
+    id = property(lambda self: self.__dict__['_claims']['id'])
+    pk = id
+    role = property(lambda self: self.__dict__['_claims']['role'])
+    department_id = property(lambda self: self.__dict__['_claims']['department_id'])
+    is_authenticated = True
+    is_anonymous = False
+
+    def __bool__(self):
+        return True
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the ``role``/``department`` claims minted
+    by ``token_for_user`` instead of loading the user on every request.
+
+    A role change or deactivation therefore takes effect when the access
+    token expires: the refresh serializer re-reads the claims from the user
+    and refuses inactive users. Tokens minted without the claims fall back
+    to the regular per-request lookup.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if get_revocation_store().is_revoked(validated_token[api_settings.JTI_CLAIM]):
+            raise InvalidToken('Token is revoked')
+        return validated_token
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
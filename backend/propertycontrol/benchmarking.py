@@ -0,0 +1,486 @@
+# backend/propertycontrol/benchmarking.py
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import DateTimeField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from . import codes
+from .fieldsets import ordering_fields, restrict_queryset
+from .metrics import percentile
+
+from .models import (
+    User, Department, Category, Property, PropertyTransfer, InventoryCounter, CodeSequence,
+    VersionConflict
+)
+from .transfers import transfer_property
+
+# Contended writes are retried this many times (with jittered backoff)
+# before the stress run counts them as failed.
+MAX_RETRIES = 50
+
+STATUS_WEIGHTS = {
+    'active': 80,
+    'inactive': 10,
+    'under_maintenance': 7,
+    'disposed': 3,
+}
+
+ASSET_TYPES = ['Laptop', 'Desktop', 'Monitor', 'Printer', 'Router', 'Projector', 'Phone', 'Desk', 'Chair']
+BRANDS = ['Dell', 'HP', 'Lenovo', 'Canon', 'Cisco', 'Ikea']
+FIRST_NAMES = ['Ali', 'Sara', 'Reza', 'Maryam', 'Hossein', 'Zahra', 'Mehdi', 'Fatemeh', 'Amir', 'Narges']
+LAST_NAMES = ['Ahmadi', 'Karimi', 'Hosseini', 'Rezaei', 'Moradi', 'Jafari', 'Ghaderi', 'Sadeghi']
+
+
+def zipf_weights(count, exponent=1.0):
+    """A few heavy hitters and a long tail: how departments and categories are sized in practice."""
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def seed_dataset(properties=10000, departments=50, categories=20, transfers=20000, users=1,
+                 history_days=365, batch_size=2000, seed=0, username=None, password=None):
+    """
+    Bulk-insert a synthetic inventory and return the created departments,
+    categories, users and the benchmark (admin) user.
+
+    Department and category sizes follow a Zipf distribution, prices are
+    log-normal and depreciate with age, and most assets are recent. The
+    transfers walk properties from department to department (a few move far
+    more often than the rest) over the last ``history_days`` days, so each
+    property's log is one consistent chain that starts after its purchase
+    and ends in its current department. Codes come from the category
+    sequences; usernames and department/category codes carry a random run
+    tag so repeated runs never collide. ``seed`` fixes the random draws, but
+    not the tag or the dates, which count back from now.
+    """
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:6].upper()
+    now = timezone.now()
+
+    user = User.objects.create_user(
+        username=username or f'bench-{tag}', password=password or uuid.uuid4().hex, role='admin'
+    )
+    depts = Department.objects.bulk_create([
+        Department(name=f'Department {i}', code=f'{tag}{i}'[:10])
+        for i in range(departments)
+    ])
+    kinds = [ASSET_TYPES[i % len(ASSET_TYPES)] for i in range(categories)]
+    cats = Category.objects.bulk_create([
+        Category(name=f'{kind}s {i}', code=f'C{tag}{i}'[:10])
+        for i, kind in enumerate(kinds)
+    ])
+    # New category codes have no properties yet: start their sequences
+    # outright instead of having the first reservation look for the highest.
+    CodeSequence.objects.bulk_create([CodeSequence(prefix=codes.code_prefix(cat.code)) for cat in cats])
+    # One hash for everyone: hashing per user would take longer than the rest of the seed.
+    hashed = make_password(uuid.uuid4().hex)
+    staff = [user] + User.objects.bulk_create([
+        User(
+            username=f'bench-{tag}-{i}', password=hashed, role='user',
+            first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+            department=rng.choice(depts),
+        )
+        for i in range(users - 1)
+    ])
+    dept_weights = zipf_weights(departments)
+
+    # Plan the walk first, so properties are inserted already sitting where
+    # their last transfer leaves them and bought before their first one.
+    homes = rng.choices(depts, dept_weights, k=properties)
+    current = list(homes)
+    first_move = {}
+    walk = []
+    for n in range(transfers):
+        index = int(properties * rng.random() ** 3)
+        target = rng.choices(depts, dept_weights)[0]
+        if target == current[index]:
+            target = depts[(depts.index(target) + 1) % departments]
+        walk.append((index, current[index], target))
+        current[index] = target
+        first_move.setdefault(index, n)
+    step = timedelta(days=history_days) / max(transfers, 1)
+    history_start = now - timedelta(days=history_days)
+
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(STATUS_WEIGHTS.values())
+    category_indexes = rng.choices(range(categories), zipf_weights(categories, 0.7), k=properties)
+    today = timezone.localdate(now)
+    property_codes = []
+    for start in range(0, properties, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, properties)):
+            age_days = int(rng.triangular(0, 3650, 0))
+            if i in first_move:
+                age_days = max(age_days, (now - history_start - step * first_move[i]).days + 2)
+            price = Decimal(min(500000, max(10, rng.lognormvariate(7, 1.2)))).quantize(Decimal('0.01'))
+            value = price * Decimal(max(0.1, 1 - 0.15 * age_days / 365))
+            prop = Property(
+                name=f'{kinds[category_indexes[i]]} {i}',
+                category=cats[category_indexes[i]],
+                department=homes[i],
+                current_department=current[i],
+                status=rng.choices(statuses, status_weights)[0],
+                purchase_date=today - timedelta(days=age_days),
+                purchase_price=price,
+                current_value=value.quantize(Decimal('0.01')),
+                serial_number=f'SN{rng.randint(0, 10 ** 9):09d}',
+                brand=rng.choice(BRANDS),
+                created_by=rng.choice(staff),
+            )
+            batch.append(prop)
+        codes.assign_codes(batch)
+        for prop in batch:
+            prop.search_document = prop.build_search_document()
+        Property.objects.bulk_create(batch)
+        property_codes.extend(prop.code for prop in batch)
+
+    seeded = Property.objects.filter(created_by__in=staff)
+    # Entered on the purchase date, as far as as_of and the dashboard can tell.
+    seeded.update(created_at=Cast('purchase_date', DateTimeField()))
+    ids = dict(seeded.values_list('code', 'id'))
+    values = {pk: (value, category) for pk, value, category in seeded.values_list('id', 'current_value', 'category')}
+
+    for start in range(0, transfers, batch_size):
+        batch = []
+        for index, from_dept, to_dept in walk[start:start + batch_size]:
+            property_id = ids[property_codes[index]]
+            value, category_id = values[property_id]
+            batch.append(PropertyTransfer(
+                property_id=property_id,
+                from_department=from_dept,
+                to_department=to_dept,
+                transferred_by=rng.choice(staff),
+                value=value,
+                category_id=category_id,
+            ))
+        PropertyTransfer.objects.bulk_create(batch)
+
+    # transfer_date is auto_now_add: date the log over the history, in
+    # order, one UPDATE per day (transfers of a day keep their id order).
+    transfer_ids = PropertyTransfer.objects.filter(transferred_by__in=staff).order_by('id').values_list('id', flat=True)
+    by_day = defaultdict(list)
+    for n, pk in enumerate(transfer_ids):
+        by_day[(step * n).days].append(pk)
+    for day, pks in by_day.items():
+        for start in range(0, len(pks), batch_size):
+            PropertyTransfer.objects.filter(pk__in=pks[start:start + batch_size]).update(
+                transfer_date=history_start + timedelta(days=day)
+            )
+
+    InventoryCounter.objects.rebuild()
+    return {'user': user, 'users': staff, 'departments': depts, 'categories': cats}
+
+
+def time_requests(client, path, repeat):
+    """Issue ``repeat`` GETs and return the latencies in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+    return timings
+
+
+def time_serialization(queryset, serializer_class, fields=None, rows=100, repeat=20):
+    """
+    Median milliseconds to fetch ``rows`` rows of ``queryset`` and to
+    serialize them, with every field or only ``fields`` (restricting the
+    queryset the way the list views do).
+    """
+    context = {}
+    if fields is not None:
+        queryset = restrict_queryset(queryset, serializer_class, fields, always=ordering_fields(queryset))
+        context['fields'] = fields
+    fetch, serialize = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        objects = list(queryset[:rows])
+        fetched = time.perf_counter()
+        serializer_class(objects, many=True, context=context).data
+        fetch.append((fetched - started) * 1000)
+        serialize.append((time.perf_counter() - fetched) * 1000)
+    return {'fetch_ms': percentile(fetch, 50), 'serialize_ms': percentile(serialize, 50)}
+
+
+def time_read_paths(queryset, serializer_class, rows=1000, repeat=5):
+    """
+    Median milliseconds to fetch, serialize and render ``rows`` rows of
+    ``queryset`` through DRF (model instances, the serializer, JSONRenderer)
+    and through the fast path (values() rows, the fastread twin, rendered
+    by JSONRenderer and by FastJSONRenderer), plus whether every path
+    produced the same bytes.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from .fastread import FAST_SERIALIZERS
+    from .renderers import FastJSONRenderer
+
+    fast = FAST_SERIALIZERS[serializer_class]
+    paths = {
+        'drf': (
+            lambda: list(queryset[:rows]),
+            lambda objects: serializer_class(objects, many=True).data,
+            JSONRenderer(),
+        ),
+        'fast': (
+            lambda: list(fast.values(queryset)[:rows]),
+            lambda values: fast.serialize(values, {}),
+            JSONRenderer(),
+        ),
+        'fast+orjson': (
+            lambda: list(fast.values(queryset)[:rows]),
+            lambda values: fast.serialize(values, {}),
+            FastJSONRenderer(),
+        ),
+    }
+    results, outputs = {}, set()
+    for name, (fetch, serialize, renderer) in paths.items():
+        timings = {'fetch': [], 'serialize': [], 'render': []}
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fetched = fetch()
+            after_fetch = time.perf_counter()
+            data = serialize(fetched)
+            after_serialize = time.perf_counter()
+            output = renderer.render(data)
+            timings['fetch'].append((after_fetch - started) * 1000)
+            timings['serialize'].append((after_serialize - after_fetch) * 1000)
+            timings['render'].append((time.perf_counter() - after_serialize) * 1000)
+        outputs.add(output)
+        row = {f'{step}_ms': percentile(values, 50) for step, values in timings.items()}
+        total = sum(row.values())
+        row['rows_per_second'] = len(fetched) / total * 1000 if total else 0.0
+        results[name] = row
+    return {'rows': rows, 'identical': len(outputs) == 1, 'paths': results}
+
+
+def http_request(url, method='GET', data=None, token=None):
+    """Send one request and return ``(status, body bytes)``."""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    body = json.dumps(data).encode() if data is not None else None
+    request = urllib.request.Request(url, data=body, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def login(base_url, username, password):
+    status, body = http_request(
+        f'{base_url}/api/auth/login/', 'POST', {'username': username, 'password': password}
+    )
+    if status != 200:
+        raise RuntimeError(f'Login to {base_url} failed with {status}')
+    return json.loads(body)['access']
+
+
+def http_load(url, token, concurrency, requests, method='GET', data=None):
+    """
+    Fire ``requests`` requests at ``url`` from ``concurrency`` threads and
+    summarize throughput and latency percentiles. ``url`` and ``data`` may
+    be functions of the request number, to spread requests over rows.
+    """
+    def one(n):
+        target = url(n) if callable(url) else url
+        body = data(n) if callable(data) else data
+        started = time.perf_counter()
+        status, _ = http_request(target, method, body, token)
+        return (time.perf_counter() - started) * 1000, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    timings = [ms for ms, _ in results]
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': sum(1 for _, status in results if status >= 400),
+        'requests_per_second': requests / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+        'p99_ms': percentile(timings, 99),
+    }
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_in_background(host='127.0.0.1', port=0):
+    """
+    Serve this project from a threaded WSGI server (the one runserver uses)
+    on a daemon thread. Returns ``(server, base_url)``; call
+    ``server.shutdown()`` when done. Port 0 picks a free port.
+    """
+    server = ThreadedWSGIServer((host, port), QuietWSGIRequestHandler)
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def stress_transfers(property_ids, department_ids, user, threads=8, transfers=1000, seed=0):
+    """
+    Run ``transfers`` single-property transfers over a few ``property_ids``
+    from ``threads`` threads, each on its own database connection. Version
+    conflicts and lock errors (SQLite "database is locked", MySQL deadlocks)
+    are retried. Returns throughput, retry and latency figures.
+    """
+    rng = random.Random(seed)
+    departments = list(Department.objects.filter(pk__in=department_ids))
+    plan = [(rng.choice(property_ids), rng.choice(departments)) for _ in range(transfers)]
+
+    def one(property_id, department):
+        retries = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                transfer_property(property_id, department, user)
+                return (time.perf_counter() - started) * 1000, retries, True
+            except (VersionConflict, OperationalError):
+                retries += 1
+                if retries > MAX_RETRIES:
+                    return (time.perf_counter() - started) * 1000, retries, False
+                time.sleep(random.uniform(0, 0.002 * retries))
+
+    def worker(items):
+        try:
+            return [one(*item) for item in items]
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = [row for rows in pool.map(worker, [plan[i::threads] for i in range(threads)]) for row in rows]
+    elapsed = time.perf_counter() - started
+
+    timings = [ms for ms, _, _ in results]
+    return {
+        'transfers': transfers,
+        'threads': threads,
+        'properties': len(property_ids),
+        'succeeded': sum(1 for _, _, ok in results if ok),
+        'failed': sum(1 for _, _, ok in results if not ok),
+        'retries': sum(retries for _, retries, _ in results),
+        'transfers_per_second': transfers / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+        'p99_ms': percentile(timings, 99),
+    }
+
+
+def transfer_history_errors(property_ids):
+    """
+    ``{property_id: problem}`` for properties whose transfer log is not one
+    unbroken chain: each transfer must start where the previous one ended,
+    and the last must end at the current department. A lost update shows up
+    here as two transfers out of the same department.
+    """
+    errors = {}
+    last = {}
+    rows = PropertyTransfer.objects.filter(property_id__in=property_ids).order_by(
+        'property_id', 'id'
+    ).values_list('id', 'property_id', 'from_department_id', 'to_department_id')
+    for transfer_id, property_id, from_id, to_id in rows:
+        if property_id in last and last[property_id] != from_id:
+            errors.setdefault(property_id, f'transfer {transfer_id} does not start where the previous ended')
+        last[property_id] = to_id
+    current = Property.objects.filter(pk__in=property_ids).values_list('id', 'current_department_id')
+    for property_id, department_id in current:
+        if property_id in last and last[property_id] != department_id:
+            errors.setdefault(property_id, 'current department differs from the last transfer')
+    return errors
+
+
+def benchmark_creates(category, department, user, threads=8, creates=2000, batch_size=1,
+                      block_size=None):
+    """
+    Create ``creates`` properties in ``category`` from ``threads`` threads,
+    one ``save()`` each with ``batch_size`` 1, else ``batch_size`` rows per
+    ``bulk_create`` as the importer does. ``block_size`` overrides the code
+    block size for the run. Lock errors are retried; duplicate codes are
+    counted as collisions. Returns throughput and latency per operation.
+    """
+    today = date.today()
+
+    def build(i):
+        return Property(
+            name=f'Bench {i}', category=category, department=department, created_by=user,
+            purchase_date=today, purchase_price=Decimal('100.00'), current_value=Decimal('100.00'),
+        )
+
+    def create(batch):
+        if len(batch) == 1:
+            batch[0].save()
+            return
+        codes.assign_codes(batch)
+        for prop in batch:
+            prop.prepare_for_insert()
+        with transaction.atomic():
+            Property.objects.bulk_create(batch)
+            InventoryCounter.objects.record_bulk_insert(batch)
+
+    def worker(indexes):
+        timings, collisions = [], 0
+        try:
+            for start in range(0, len(indexes), batch_size):
+                chunk = indexes[start:start + batch_size]
+                started = time.perf_counter()
+                for attempt in range(MAX_RETRIES):
+                    batch = [build(i) for i in chunk]
+                    try:
+                        create(batch)
+                        break
+                    except IntegrityError:
+                        collisions += 1
+                        break
+                    except OperationalError:
+                        time.sleep(random.uniform(0, 0.002 * (attempt + 1)))
+                timings.append((time.perf_counter() - started) * 1000)
+            return timings, collisions
+        finally:
+            connection.close()
+
+    previous_block_size = codes.allocator.block_size
+    codes.allocator.block_size = block_size
+    codes.allocator.clear()
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(worker, [list(range(creates))[i::threads] for i in range(threads)]))
+    finally:
+        codes.allocator.block_size = previous_block_size
+    elapsed = time.perf_counter() - started
+
+    timings = [ms for rows, _ in results for ms in rows]
+    return {
+        'creates': creates,
+        'threads': threads,
+        'batch_size': batch_size,
+        'block_size': block_size or codes.get_block_size(),
+        'collisions': sum(collisions for _, collisions in results),
+        'creates_per_second': creates / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+    }
@@ -0,0 +1,76 @@
+# backend/propertycontrol/caching.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def get_cache():
+    return caches[getattr(settings, 'PROPERTYCONTROL_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    # Bounds staleness when each worker has its own (local-memory) cache and
+    # cannot see another worker's invalidation.
+    return getattr(settings, 'PROPERTYCONTROL_REFDATA_CACHE_TIMEOUT', 300)
+
+
+def resource_version(resource):
+    """Return the current version stamp (a Unix timestamp in seconds) of ``resource``."""
+    cache = get_cache()
+    key = f'refdata:{resource}:version'
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time())
+        if not cache.add(key, version, get_timeout()):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate(resource):
+    """
+    Advance the version stamp of ``resource``. The stamp moves forward by at
+    least a second even for several writes within the same second, so it
+    doubles as a Last-Modified that never repeats for different data.
+    """
+    cache = get_cache()
+    key = f'refdata:{resource}:version'
+    previous = cache.get(key) or 0
+    cache.set(key, max(int(time.time()), previous + 1), get_timeout())
+
+
+class CachedListMixin:
+    """
+    Serve ``list()`` from the cache with an ETag validator.
+
+    Responses are keyed by the resource version, host and full path, and a
+    matching ``If-None-Match`` or ``If-Modified-Since`` gets a 304 without
+    touching the database. Writes bump the version through the signal
+    receivers in ``signals.py``; the version is also the Last-Modified time.
+    """
+    cache_resource = None
+
+    def list(self, request, *args, **kwargs):
+        version = resource_version(self.cache_resource)
+        etag = '"%s"' % hashlib.md5(
+            f'{version}:{request.get_host()}:{request.get_full_path()}'.encode()
+        ).hexdigest()
+
+        response = get_conditional_response(request, etag=etag, last_modified=version)
+        if response is None:
+            cache = get_cache()
+            key = f'refdata:{self.cache_resource}:{etag}'
+            data = cache.get(key)
+            if data is None:
+                data = super().list(request, *args, **kwargs).data
+                cache.set(key, data, get_timeout())
+            response = Response(data)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(version)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
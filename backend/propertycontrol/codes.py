@@ -0,0 +1,152 @@
+# backend/propertycontrol/codes.py
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import connection, transaction
+
+CODE_DIGITS = 6
+
+
+def get_block_size():
+    return getattr(settings, 'PROPERTYCONTROL_CODE_BLOCK_SIZE', 100)
+
+
+def get_default_prefix():
+    return getattr(settings, 'PROPERTYCONTROL_CODE_DEFAULT_PREFIX', 'PROP')
+
+
+def code_prefix(category_code):
+    """Properties are numbered per category code; uncategorised ones share a default prefix."""
+    return (category_code or get_default_prefix()).strip().upper()
+
+
+def format_code(prefix, number):
+    return f'{prefix}-{number:0{CODE_DIGITS}d}'
+
+
+class CodeAllocator:
+    """
+    Hand out property code numbers from blocks reserved in the database.
+
+    A reservation costs one UPDATE on the prefix's CodeSequence row; the
+    numbers left over from a block serve later creates in this process
+    without touching the database. Leftovers are only kept once the
+    reservation has committed (inside an outer transaction exactly the
+    numbers needed are reserved), so a rollback can never hand the same
+    number out twice. Numbers held by a process that exits are skipped,
+    leaving gaps but no duplicates.
+    """
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size
+        self.blocks = defaultdict(deque)
+        self.lock = threading.Lock()
+
+    def allocate(self, prefix, count):
+        """Return ``count`` codes for ``prefix``."""
+        from .models import CodeSequence
+
+        numbers = []
+        with self.lock:
+            blocks = self.blocks[prefix]
+            while blocks and len(numbers) < count:
+                start, end = blocks.popleft()
+                take = min(end - start, count - len(numbers))
+                numbers.extend(range(start, start + take))
+                if start + take < end:
+                    blocks.appendleft((start + take, end))
+
+        missing = count - len(numbers)
+        if missing:
+            block_size = self.block_size or get_block_size()
+            size = missing if connection.in_atomic_block else max(missing, block_size)
+            first = CodeSequence.objects.reserve(prefix, size)
+            numbers.extend(range(first, first + missing))
+            if size > missing:
+                transaction.on_commit(lambda: self.keep(prefix, first + missing, first + size))
+        return [format_code(prefix, number) for number in numbers]
+
+    def keep(self, prefix, start, end):
+        with self.lock:
+            self.blocks[prefix].append((start, end))
+
+    def clear(self):
+        with self.lock:
+            self.blocks.clear()
+
+
+allocator = CodeAllocator()
+
+
+def assign_codes(properties):
+    """
+    Give every property without a code the next one of its category's
+    sequence. A batch costs at most one category query and one reservation
+    per prefix, however many rows it holds.
+    """
+    from .models import Category, Property
+
+    pending = [prop for prop in properties if not prop.code]
+    if not pending:
+        return
+    category_field = Property._meta.get_field('category')
+    category_codes = {}
+    for prop in pending:
+        if prop.category_id and category_field.is_cached(prop) and prop.category is not None:
+            category_codes[prop.category_id] = prop.category.code
+    missing = {prop.category_id for prop in pending if prop.category_id} - set(category_codes)
+    if missing:
+        category_codes.update(Category.objects.filter(pk__in=missing).values_list('id', 'code'))
+
+    by_prefix = defaultdict(list)
+    for prop in pending:
+        by_prefix[code_prefix(category_codes.get(prop.category_id))].append(prop)
+    for prefix, group in by_prefix.items():
+        for prop, code in zip(group, allocator.allocate(prefix, len(group))):
+            prop.code = code
+
+
+# What Property codes looked like before sequences: str(uuid4())[:8].upper().
+LEGACY_CODE_PATTERN = r'^[0-9A-F]{8}$'
+
+
+def legacy_properties():
+    from .models import Property
+
+    return Property.objects.filter(code__regex=LEGACY_CODE_PATTERN)
+
+
+def renumber_legacy_codes(batch_size=1000, progress=None):
+    """
+    Move properties with a legacy random code onto their category's
+    sequence, in id order, keeping the old code in ``legacy_code`` (which
+    is searchable). Batches are locked, written with one ``bulk_update``
+    and bump the version so a stale copy cannot save the old code back.
+    Returns the number of properties renumbered.
+    """
+    from django.db.models import F
+
+    from .models import Property
+
+    done = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                legacy_properties().filter(id__gt=last_id).order_by('id').select_for_update()
+                .only('id', 'code', 'category_id', *Property.SEARCH_FIELDS)[:batch_size]
+            )
+            if not batch:
+                return done
+            last_id = batch[-1].pk
+            for prop in batch:
+                prop.legacy_code, prop.code = prop.code, ''
+            assign_codes(batch)
+            for prop in batch:
+                prop.search_document = prop.build_search_document()
+                prop.version = F('version') + 1
+            Property.objects.bulk_update(batch, ['code', 'legacy_code', 'search_document', 'version'])
+        done += len(batch)
+        if progress:
+            progress(done)
@@ -0,0 +1,88 @@
+# backend/propertycontrol/dashboard.py
+from django.db.models import Count, Sum
+
+from .models import Department, Category, Property, PropertyTransfer, InventoryCounter
+from .serializers import PropertyTransferSerializer
+
+# The dashboard is assembled from independent reads so the async view can
+# run them concurrently; the sync view simply calls them in turn.
+
+
+def property_totals(as_of=None):
+    """Return ``(total, active, {department_id: count})``, from the counter table unless ``as_of`` is given."""
+    if as_of is not None:
+        return property_totals_as_of(as_of)
+    # The counter table holds one row per (current_department, category,
+    # status), so this read does not depend on the size of the inventory.
+    grouped = InventoryCounter.objects.order_by().values(
+        'current_department', 'status'
+    ).annotate(total=Sum('count'))
+    return sum_totals(grouped, 'current_department')
+
+
+def property_totals_as_of(as_of):
+    """
+    Like ``property_totals`` but with departments reconstructed at ``as_of``
+    from the transfer log. Status changes are not logged, so ``active``
+    counts the properties that are active now.
+    """
+    grouped = Property.objects.as_of(as_of).order_by().values(
+        'department_as_of', 'status'
+    ).annotate(total=Count('id'))
+    return sum_totals(grouped, 'department_as_of')
+
+
+def sum_totals(grouped, department_key):
+    total_properties = 0
+    active_properties = 0
+    by_department_id = {}
+    for row in grouped:
+        total_properties += row['total']
+        if row['status'] == 'active':
+            active_properties += row['total']
+        if row[department_key] is not None:
+            by_department_id[row[department_key]] = (
+                by_department_id.get(row[department_key], 0) + row['total']
+            )
+    return total_properties, active_properties, by_department_id
+
+
+def department_names():
+    return list(Department.objects.values_list('id', 'name'))
+
+
+def category_count():
+    return Category.objects.count()
+
+
+def recent_transfers(limit=5, as_of=None):
+    transfers = PropertyTransfer.objects.for_api()
+    if as_of is not None:
+        transfers = transfers.filter(transfer_date__lt=as_of)
+    return list(transfers.order_by('-transfer_date')[:limit])
+
+
+def build_stats(totals, departments, categories, recent, as_of=None):
+    total_properties, active_properties, by_department_id = totals
+    stats = {
+        'total_properties': total_properties,
+        'active_properties': active_properties,
+        'total_departments': len(departments),
+        'total_categories': categories,
+        'recent_transfers': PropertyTransferSerializer(recent, many=True).data,
+        'properties_by_department': {}
+    }
+
+    for dept_id, dept_name in departments:
+        stats['properties_by_department'][dept_name] = by_department_id.get(dept_id, 0)
+
+    if as_of is not None:
+        stats['as_of'] = as_of.isoformat()
+    return stats
+
+
+def dashboard_stats(as_of=None):
+    return build_stats(
+        property_totals(as_of), department_names(), category_count(),
+        recent_transfers(as_of=as_of), as_of,
+    )
@@ -0,0 +1,92 @@
+# backend/propertycontrol/exports.py
+import csv
+
+from .models import Property, PropertyTransfer
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (header, values_list lookup); ``id`` must stay first for keyset iteration.
+PROPERTY_COLUMNS = [
+    ('id', 'id'),
+    ('code', 'code'),
+    ('name', 'name'),
+    ('category', 'category__code'),
+    ('department', 'department__code'),
+    ('current_department', 'current_department__code'),
+    ('status', 'status'),
+    ('purchase_date', 'purchase_date'),
+    ('purchase_price', 'purchase_price'),
+    ('current_value', 'current_value'),
+    ('serial_number', 'serial_number'),
+    ('property_code', 'property_code'),
+    ('brand', 'brand'),
+    ('model', 'model'),
+    ('description', 'description'),
+    ('created_by', 'created_by__username'),
+    ('created_at', 'created_at'),
+]
+
+TRANSFER_COLUMNS = [
+    ('id', 'id'),
+    ('transfer_date', 'transfer_date'),
+    ('property', 'property__code'),
+    ('property_name', 'property__name'),
+    ('from_department', 'from_department__code'),
+    ('to_department', 'to_department__code'),
+    ('transferred_by', 'transferred_by__username'),
+    ('notes', 'notes'),
+]
+
+
+def iter_keyset(queryset, lookups, chunk_size=None):
+    """
+    Yield ``values_list`` rows ordered by id, one ``WHERE id > last`` page of
+    ``chunk_size`` at a time. Unlike ``iterator()`` this keeps memory flat on
+    MySQL, whose driver otherwise buffers the whole result set.
+    """
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    queryset = queryset.order_by('id')
+    last_id = None
+    while True:
+        page = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        rows = list(page.values_list(*lookups)[:chunk_size])
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+
+def export_rows(kind, queryset=None):
+    columns = PROPERTY_COLUMNS if kind == 'properties' else TRANSFER_COLUMNS
+    if queryset is None:
+        model = Property if kind == 'properties' else PropertyTransfer
+        queryset = model.objects.all()
+    header = [name for name, _ in columns]
+    return header, iter_keyset(queryset, [lookup for _, lookup in columns])
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    """Yield the CSV text line by line, starting with a BOM for spreadsheet apps."""
+    writer = csv.writer(Echo())
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(path, header, rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for row in rows:
+        sheet.append([
+            value.replace(tzinfo=None) if getattr(value, 'tzinfo', None) else value
+            for value in row
+        ])
+    workbook.save(path)
@@ -0,0 +1,260 @@
+# backend/propertycontrol/fastread.py
+import datetime
+from decimal import Decimal, getcontext
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import fields, relations
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from . import images
+from .metrics import serializer_timer
+from .fieldsets import ordering_fields
+from .serializers import PropertyAsOfSerializer, PropertySerializer, PropertyTransferSerializer
+
+# Read-only fast path for the big list endpoints. Rows come from values()
+# and are turned into dicts by a function generated once per serializer
+# and field selection, which does what the DRF fields would do for each
+# column without instantiating fields or walking attributes per row. The
+# output is byte-for-byte the serializer's; see FastReadTests.
+
+SKIP = object()  # a custom getter's way of leaving the key out, like DRF's SkipField
+
+
+def fast_reads_enabled():
+    return getattr(settings, 'PROPERTYCONTROL_FAST_READS', True)
+
+
+def decimal_converter(field):
+    if (not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+            or field.localize or field.decimal_places is None):
+        return field.to_representation
+    context = getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    exponent = Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value).strip())
+        return '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+    return convert
+
+
+def iso_datetime(value, tz):
+    if tz is not None:
+        value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def file_converter(storage):
+    def convert(name, request):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def is_iso(field, default):
+    output_format = getattr(field, 'format', default)
+    return output_format is not None and output_format.lower() == fields.ISO_8601
+
+
+def model_field(model, attrs):
+    for attr in attrs[:-1]:
+        model = model._meta.get_field(attr).related_model
+    return model._meta.get_field(attrs[-1])
+
+
+def field_code(name, field, model, namespace, index):
+    """Return ``(lines, values() paths)`` assigning ``d[name]`` from ``row``."""
+    attrs = field.source_attrs
+    path = '__'.join(attrs)
+    key = repr(name)
+    value = f'row[{path!r}]'
+
+    if isinstance(field, relations.PrimaryKeyRelatedField) or isinstance(field, (
+        fields.CharField, fields.IntegerField, fields.BooleanField, fields.ChoiceField, fields.ReadOnlyField,
+    )):
+        # Columns already come back as the str/int/bool these fields emit.
+        assign = [f'd[{key}] = {value}']
+    elif isinstance(field, fields.DecimalField):
+        namespace[f'f{index}'] = decimal_converter(field)
+        assign = [f'v = {value}', f'd[{key}] = None if v is None else f{index}(v)']
+    elif isinstance(field, fields.DateTimeField) and is_iso(field, api_settings.DATETIME_FORMAT):
+        namespace[f'f{index}'] = iso_datetime
+        assign = [f'v = {value}', f'd[{key}] = None if v is None else f{index}(v, tz)']
+    elif isinstance(field, fields.DateField) and is_iso(field, api_settings.DATE_FORMAT):
+        assign = [f'v = {value}', f'd[{key}] = None if v is None else v.isoformat()']
+    elif isinstance(field, fields.FileField) and getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        namespace[f'f{index}'] = file_converter(model_field(model, attrs).storage)
+        assign = [f'd[{key}] = f{index}({value}, request)']
+    else:
+        raise ImproperlyConfigured(
+            f'No fast representation for {type(field).__name__} {name!r}; add it to the custom getters.'
+        )
+
+    # DRF leaves the key out when a nullable relation on the way is empty.
+    guards = [
+        '__'.join(attrs[:depth]) for depth in range(1, len(attrs))
+        if model_field(model, attrs[:depth]).null
+    ]
+    if not guards:
+        return assign, [path]
+    if field.default is not fields.empty:
+        raise ImproperlyConfigured(f'{name!r} has a default; it needs a custom getter.')
+    condition = ' and '.join(f'row[{guard!r}] is not None' for guard in guards)
+    lines = [f'if {condition}:', *(f'    {line}' for line in assign)]
+    if field.allow_null:
+        lines += ['else:', f'    d[{key}] = None']
+    return lines, [path, *guards]
+
+
+# The key includes the client's ?fields=/?omit= selection, so the cache must
+# be bounded: every distinct selection would otherwise keep its own function.
+@lru_cache(maxsize=256)
+def compile_serializer(fast_class, selected=None):
+    """Generate ``to_dict(row, request, tz, context)`` and the values() paths it reads."""
+    serializer_class = fast_class.serializer_class
+    model = serializer_class.Meta.model
+    serializer = serializer_class()
+    names = [
+        name for name, field in serializer.fields.items()
+        if not field.write_only and (selected is None or name in selected)
+    ]
+
+    namespace = {'SKIP': SKIP}
+    lines = []
+    paths = set()
+    for index, name in enumerate(names):
+        if name in fast_class.custom:
+            field_paths, getter = fast_class.custom[name]
+            namespace[f'c{index}'] = getter
+            paths.update(field_paths)
+            lines += [
+                f'v = c{index}(row, request, context)',
+                'if v is not SKIP:',
+                f'    d[{name!r}] = v',
+            ]
+            continue
+        field_lines, field_paths = field_code(name, serializer.fields[name], model, namespace, index)
+        lines += field_lines
+        paths.update(field_paths)
+
+    source = '\n'.join([
+        'def to_dict(row, request, tz, context):',
+        '    d = {}',
+        *(f'    {line}' for line in lines),
+        '    return d',
+    ])
+    exec(compile(source, f'<fastread {serializer_class.__name__}>', 'exec'), namespace)
+    return namespace['to_dict'], tuple(sorted(paths))
+
+
+class FastSerializer:
+    """
+    Fast read-only twin of ``serializer_class``. ``custom`` maps the fields
+    that are not plain columns (method fields, ``get_full_name`` sources)
+    to ``(values() paths, getter(row, request, context))``.
+    """
+    serializer_class = None
+    custom = {}
+
+    @classmethod
+    def values(cls, queryset, fields=None, always=()):
+        _, paths = compile_serializer(cls, tuple(fields) if fields is not None else None)
+        return queryset.values(*dict.fromkeys((*paths, *always)))
+
+    @classmethod
+    def serialize(cls, rows, context, fields=None):
+        to_dict, _ = compile_serializer(cls, tuple(fields) if fields is not None else None)
+        request = context.get('request')
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        with serializer_timer():
+            return [to_dict(row, request, tz, context) for row in rows]
+
+
+def full_name(relation):
+    """Getter for ``source='<relation>.get_full_name'``."""
+    first, last = f'{relation}__first_name', f'{relation}__last_name'
+
+    def get(row, request, context):
+        if row[relation] is None:
+            return SKIP
+        return ('%s %s' % (row[first], row[last])).strip()
+    return (relation, first, last), get
+
+
+def image_renditions(row, request, context):
+    if not row['image']:
+        return None
+    urls = {}
+    for rendition in images.RENDITIONS:
+        url = images.rendition_url(row['id'], row['image_hash'], rendition)
+        urls[rendition] = request.build_absolute_uri(url) if request is not None else url
+    return urls
+
+
+def department_as_of_name(row, request, context):
+    return context.get('department_names', {}).get(row['department_as_of'])
+
+
+class PropertyFastSerializer(FastSerializer):
+    serializer_class = PropertySerializer
+    custom = {
+        'image_renditions': (('id', 'image', 'image_hash'), image_renditions),
+        'created_by_name': full_name('created_by'),
+    }
+
+
+class PropertyAsOfFastSerializer(FastSerializer):
+    serializer_class = PropertyAsOfSerializer
+    custom = {
+        **PropertyFastSerializer.custom,
+        'department_as_of_name': (('department_as_of',), department_as_of_name),
+    }
+
+
+class PropertyTransferFastSerializer(FastSerializer):
+    serializer_class = PropertyTransferSerializer
+    custom = {
+        'transferred_by_name': full_name('transferred_by'),
+    }
+
+
+FAST_SERIALIZERS = {
+    fast.serializer_class: fast
+    for fast in (PropertyFastSerializer, PropertyAsOfFastSerializer, PropertyTransferFastSerializer)
+}
+
+
+class FastListMixin:
+    """
+    List through the fast twin of ``get_serializer_class()`` when one is
+    registered (and PROPERTYCONTROL_FAST_READS is on); the response is the
+    same as the serializer's.
+    """
+
+    def list(self, request, *args, **kwargs):
+        fast = FAST_SERIALIZERS.get(self.get_serializer_class()) if fast_reads_enabled() else None
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+
+        context = self.get_serializer_context()
+        fields = context.get('fields')
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = fast.values(queryset, fields, always=ordering_fields(queryset, self.paginator))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page, context, fields))
+        return Response(fast.serialize(rows, context, fields))
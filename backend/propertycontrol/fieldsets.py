@@ -0,0 +1,132 @@
+# backend/propertycontrol/fieldsets.py
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework.exceptions import ValidationError
+
+# Sparse fieldsets: ``?fields=id,name,code`` keeps only those output fields,
+# ``?omit=description,image`` drops some. The selection trims the serializer
+# and the query alike: only() the columns the kept fields read and
+# select_related() just the relations they traverse.
+
+
+def parse_names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def selected_fields(serializer_class, params):
+    """
+    The output fields chosen by ``?fields=``/``?omit=``, in declaration
+    order, or None when neither is given. Unknown names raise
+    ValidationError.
+    """
+    wanted, omitted = parse_names(params.get('fields')), parse_names(params.get('omit'))
+    if not wanted and not omitted:
+        return None
+    available = list(serializer_class().fields)
+    unknown = sorted(set(wanted + omitted) - set(available))
+    if unknown:
+        key = 'fields' if set(unknown) & set(wanted) else 'omit'
+        raise ValidationError({key: [f"Unknown field(s): {', '.join(unknown)}."]})
+    return [
+        name for name in available
+        if (not wanted or name in wanted) and name not in omitted
+    ]
+
+
+def field_paths(serializer_class, names):
+    """
+    Model paths (``category__name``) read by the output fields ``names``.
+    Fields whose source is not a chain of model fields (methods,
+    annotations) must be listed in ``Meta.field_sources``.
+    """
+    model = serializer_class.Meta.model
+    overrides = getattr(serializer_class.Meta, 'field_sources', {})
+    fields = serializer_class().fields
+    paths = []
+    for name in names:
+        if name in overrides:
+            paths.extend(overrides[name])
+            continue
+        attrs = fields[name].source_attrs
+        try:
+            if not attrs:
+                raise FieldDoesNotExist
+            current = model
+            for attr in attrs[:-1]:
+                current = current._meta.get_field(attr).related_model
+            current._meta.get_field(attrs[-1])
+        except (AttributeError, FieldDoesNotExist):
+            raise ImproperlyConfigured(
+                f'{serializer_class.__name__}.{name} reads {fields[name].source!r}; '
+                f'list the columns it needs in Meta.field_sources.'
+            )
+        paths.append('__'.join(attrs))
+    return paths
+
+
+def restrict_queryset(queryset, serializer_class, names, always=()):
+    """
+    Load only what the ``names`` output fields read, plus the primary key
+    and the ``always`` fields (the ordering, which pagination cursors read).
+    """
+    paths = {queryset.model._meta.pk.name, *field_paths(serializer_class, names), *always}
+    relations = {
+        '__'.join(path.split('__')[:depth])
+        for path in paths
+        for depth in range(1, path.count('__') + 1)
+    }
+    return queryset.select_related(None).select_related(*sorted(relations)).only(*sorted(paths))
+
+
+def ordering_fields(queryset, paginator=None):
+    """The fields rows are ordered by; pagination cursors read them off each row."""
+    ordering = getattr(paginator, 'ordering', None) or ()
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    ordering = [*ordering, *(queryset.query.order_by or queryset.model._meta.ordering)]
+    names = [field.lstrip('-') for field in ordering if isinstance(field, str)]
+    # Annotations (e.g. a search rank) are selected anyway and cannot be only()'d.
+    return [name for name in names if name not in queryset.query.annotations and name != '?']
+
+
+class SparseFieldsMixin:
+    """Serializer mixin: keep only the fields listed in ``context['fields']``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get('fields')
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
+
+class SparseFieldsetViewMixin:
+    """
+    List-view mixin for ``?fields=``/``?omit=``: the selection is passed
+    to the serializer (which needs ``SparseFieldsMixin``) through its
+    context and applied to the queryset.
+    """
+
+    @property
+    def selected_fields(self):
+        if not hasattr(self, '_selected_fields'):
+            self._selected_fields = None
+            if self.request.method == 'GET':
+                self._selected_fields = selected_fields(
+                    self.get_serializer_class(), self.request.query_params
+                )
+        return self._selected_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.selected_fields is not None:
+            context['fields'] = self.selected_fields
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.selected_fields is None:
+            return queryset
+        return restrict_queryset(
+            queryset, self.get_serializer_class(), self.selected_fields,
+            always=ordering_fields(queryset, self.paginator),
+        )
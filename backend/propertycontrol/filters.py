@@ -0,0 +1,57 @@
+# backend/propertycontrol/filters.py
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .search import search_properties
+
+
+def parse_as_of(value):
+    """
+    Parse an ``as_of`` parameter into an aware datetime bound (exclusive).
+    A date means the end of that day; a datetime is used as given. Raises
+    ``ValueError`` for anything else.
+    """
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+        moment = parse_datetime(value) if day is None else None
+    except ValueError:
+        day = moment = None
+    if day is not None:
+        moment = datetime.combine(day + timedelta(days=1), time.min)
+    elif moment is None:
+        raise ValueError(f'Invalid as_of "{value}"; use YYYY-MM-DD or an ISO 8601 datetime.')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_properties(queryset, params, as_of=None):
+    """
+    Apply the ``search``/``department``/``category`` list filters. With
+    ``as_of``, only properties that existed then are kept and ``department``
+    matches where they were at that moment.
+    """
+    search = params.get('search', None)
+    department = params.get('department', None)
+    category = params.get('category', None)
+
+    if as_of is not None:
+        queryset = queryset.as_of(as_of)
+
+    if search:
+        queryset = search_properties(queryset, search)
+
+    if department:
+        if as_of is not None:
+            queryset = queryset.filter(department_as_of=department)
+        else:
+            queryset = queryset.filter(current_department__id=department)
+
+    if category:
+        queryset = queryset.filter(category__id=category)
+
+    return queryset
@@ -0,0 +1,103 @@
+# backend/propertycontrol/images.py
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# name -> bounding box; renditions keep the aspect ratio.
+RENDITIONS = {
+    'thumbnail': (150, 150),
+    'medium': (600, 600),
+}
+RENDITION_DIR = 'properties/renditions'
+
+_executor = None
+
+
+def content_hash(fieldfile):
+    """SHA-256 of an (uploaded or stored) file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in fieldfile.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def rendition_name(image_hash, rendition):
+    return f'{RENDITION_DIR}/{image_hash[:2]}/{image_hash}_{rendition}.jpg'
+
+
+def rendition_signature(property_id, rendition):
+    return signing.Signer(salt='propertycontrol.images.rendition').signature(f'{property_id}:{rendition}')
+
+
+def valid_rendition_signature(property_id, rendition, signature):
+    return constant_time_compare(rendition_signature(property_id, rendition), signature or '')
+
+
+def rendition_url(property_id, image_hash, rendition):
+    """
+    Storage URL of the rendition, built from the hash without touching the
+    storage: outside ``'lazy'`` mode renditions are generated on upload.
+    Lazy mode and rows not hashed yet get the generating endpoint, signed
+    so that an ``<img>`` tag (which sends no token) can load it.
+    """
+    if image_hash and getattr(settings, 'PROPERTYCONTROL_IMAGE_RENDITIONS', 'thread') != 'lazy':
+        return default_storage.url(rendition_name(image_hash, rendition))
+    url = reverse('property-image-rendition', args=[property_id, rendition])
+    return f'{url}?signature={rendition_signature(property_id, rendition)}'
+
+
+def generate_renditions(image_name, image_hash, storage=None):
+    """Write every missing rendition of ``image_name``; return the rendition names."""
+    storage = storage or default_storage
+    missing = {
+        rendition: size for rendition, size in RENDITIONS.items()
+        if not default_storage.exists(rendition_name(image_hash, rendition))
+    }
+    if missing:
+        with storage.open(image_name, 'rb') as original:
+            image = ImageOps.exif_transpose(Image.open(original))
+            image = image.convert('RGB')
+            for rendition, size in missing.items():
+                resized = image.copy()
+                resized.thumbnail(size, Image.LANCZOS)
+                buffer = ContentFile(b'')
+                resized.save(buffer, format='JPEG', quality=85, optimize=True)
+                default_storage.save(rendition_name(image_hash, rendition), buffer)
+    return [rendition_name(image_hash, rendition) for rendition in RENDITIONS]
+
+
+def _generate_quietly(image_name, image_hash, storage):
+    try:
+        generate_renditions(image_name, image_hash, storage)
+    except Exception:
+        logger.exception('Could not generate renditions for %s', image_name)
+
+
+def schedule_renditions(image_name, image_hash, storage=None):
+    """
+    Produce the renditions according to PROPERTYCONTROL_IMAGE_RENDITIONS:
+    ``'sync'`` on the request thread, ``'thread'`` (default) on a background
+    thread pool, ``'queue'`` as an ``image_renditions`` job for the
+    ``run_jobs`` worker, or ``'lazy'`` on the first request for a rendition.
+    """
+    mode = getattr(settings, 'PROPERTYCONTROL_IMAGE_RENDITIONS', 'thread')
+    if mode == 'sync':
+        _generate_quietly(image_name, image_hash, storage)
+    elif mode == 'thread':
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='renditions')
+        _executor.submit(_generate_quietly, image_name, image_hash, storage)
+    elif mode == 'queue':
+        from .jobs import enqueue
+        enqueue('image_renditions', {'image': image_name, 'image_hash': image_hash})
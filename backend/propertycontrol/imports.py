@@ -0,0 +1,157 @@
+# backend/propertycontrol/imports.py
+import copy
+import csv
+import io
+import os
+from datetime import datetime
+from itertools import islice
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .codes import assign_codes
+from .models import Department, Category, Property, InventoryCounter
+from .serializers import PropertyImportSerializer
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def iter_csv_rows(fileobj):
+    text = io.TextIOWrapper(getattr(fileobj, 'file', fileobj), encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        text.detach()
+
+
+def iter_xlsx_rows(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError('XLSX import requires the openpyxl package.')
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        return iter_csv_rows(fileobj)
+    if extension == '.xlsx':
+        return iter_xlsx_rows(fileobj)
+    raise ImportFormatError(f'Unsupported file type "{extension}"; use .csv or .xlsx.')
+
+
+def normalize_row(row):
+    """Strip cells and drop empty ones so serializer defaults apply."""
+    cleaned = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        if isinstance(value, datetime):
+            value = value.date()
+        value = value.isoformat() if hasattr(value, 'isoformat') else str(value).strip()
+        if value != '':
+            cleaned[str(key).strip()] = value
+    return cleaned
+
+
+class PropertyImporter:
+    """
+    Import property rows in chunks of ``chunk_size``.
+
+    Each chunk resolves its department/category codes with one query per
+    table, validates every row with ``PropertyImportSerializer`` and inserts
+    the valid ones with a single ``bulk_create``. Invalid rows are reported
+    by line number and do not abort the import. Only the first
+    ``max_errors`` errors are kept, so memory stays bounded by the chunk size.
+    """
+
+    def __init__(self, user, chunk_size=1000, max_errors=1000):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.departments = {}
+        self.categories = {}
+
+    def run(self, rows, progress=None, checkpoint=None, resume=None):
+        """
+        ``progress(result)`` is called after every chunk, if given.
+
+        ``checkpoint(result)`` is called inside each chunk's transaction, so
+        a saved result always matches the committed rows. Passing it back as
+        ``resume`` skips the ``result['rows']`` rows it covers instead of
+        importing them again.
+        """
+        result = {'rows': 0, 'created': 0, 'failed': 0, 'errors': []}
+        result.update(copy.deepcopy(resume or {}))
+        numbered = islice(enumerate(rows, start=2), result['rows'], None)  # line 1 is the header
+        while True:
+            chunk = list(islice(numbered, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk([(line, normalize_row(row)) for line, row in chunk], result, checkpoint)
+            if progress is not None:
+                progress(result)
+        result['errors_truncated'] = result['failed'] > len(result['errors'])
+        return result
+
+    def import_chunk(self, chunk, result, checkpoint=None):
+        self.load_lookups(chunk)
+        serializer = PropertyImportSerializer(context={
+            'departments': self.departments,
+            'categories': self.categories,
+        })
+
+        valid = []
+        for line, row in chunk:
+            try:
+                data = serializer.run_validation(row)
+            except ValidationError as exc:
+                result['failed'] += 1
+                if len(result['errors']) < self.max_errors:
+                    result['errors'].append({'row': line, 'errors': exc.detail})
+                continue
+            valid.append(Property(**data, created_by=self.user))
+
+        assign_codes(valid)
+        for prop in valid:
+            prop.prepare_for_insert()
+
+        with transaction.atomic():
+            Property.objects.bulk_create(valid)
+            InventoryCounter.objects.record_bulk_insert(valid)
+            result['rows'] += len(chunk)
+            result['created'] += len(valid)
+            if checkpoint is not None:
+                checkpoint(result)
+
+    def load_lookups(self, chunk):
+        department_codes = set()
+        category_codes = set()
+        for _, row in chunk:
+            department_codes.update(
+                row[key] for key in ('department', 'current_department') if key in row
+            )
+            if 'category' in row:
+                category_codes.add(row['category'])
+
+        department_codes -= self.departments.keys()
+        if department_codes:
+            self.departments.update(
+                Department.objects.in_bulk(department_codes, field_name='code')
+            )
+        category_codes -= self.categories.keys()
+        if category_codes:
+            self.categories.update(
+                Category.objects.in_bulk(category_codes, field_name='code')
+            )
@@ -0,0 +1,308 @@
+# backend/propertycontrol/jobs.py
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(job, context); filled in by the @job_handler decorator.
+HANDLERS = {}
+
+
+class JobFailed(Exception):
+    """Raised by a handler for errors a retry cannot fix; ``result`` is kept on the job."""
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def job_handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def job_storage():
+    """Private storage for job inputs and outputs (uploads, export files)."""
+    return FileSystemStorage(location=getattr(
+        settings, 'PROPERTYCONTROL_JOB_FILES_ROOT', os.path.join(settings.BASE_DIR, 'job_files')
+    ))
+
+
+def enqueue(kind, payload, user=None, idempotency_key=None, max_attempts=None):
+    """
+    Queue a job and return ``(job, created)``. With an ``idempotency_key`` a
+    repeated request from the same user returns the job it already queued.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind "{kind}"')
+    existing = existing_job(user, idempotency_key)
+    if existing is not None:
+        return existing, False
+    fields = {
+        'kind': kind,
+        'payload': payload,
+        'created_by': user,
+        'idempotency_key': idempotency_key or None,
+        'max_attempts': max_attempts or getattr(settings, 'PROPERTYCONTROL_JOB_MAX_ATTEMPTS', 3),
+    }
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**fields), True
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        return Job.objects.get(created_by=user, idempotency_key=idempotency_key), False
+
+
+def existing_job(user, idempotency_key):
+    if not idempotency_key:
+        return None
+    return Job.objects.filter(created_by=user, idempotency_key=idempotency_key).first()
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2 x base, 4 x base, ... capped at the maximum."""
+    base = getattr(settings, 'PROPERTYCONTROL_JOB_RETRY_BACKOFF', 10)
+    cap = getattr(settings, 'PROPERTYCONTROL_JOB_RETRY_BACKOFF_MAX', 3600)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+
+def claim_jobs(worker_id, limit):
+    """
+    Mark up to ``limit`` due jobs as running for ``worker_id`` and return
+    their ids. The conditional UPDATE makes the claim safe between workers
+    even where SKIP LOCKED is unavailable.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(status='queued', run_after__lte=now).order_by('run_after', 'id')
+    claimed = []
+    with transaction.atomic():
+        if connections[candidates.db].features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        for job_id in candidates.values_list('id', flat=True)[:limit]:
+            updated = Job.objects.filter(pk=job_id, status='queued').update(
+                status='running', locked_by=worker_id, started_at=now, heartbeat_at=now,
+                attempts=F('attempts') + 1, error='',
+            )
+            if updated:
+                claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale(timeout=None):
+    """
+    Put back jobs whose worker died mid-run; return how many. A job is stale
+    once it has not heartbeated for ``timeout`` seconds, however long it has
+    been running. The lost run counted as an attempt when it was claimed, so
+    a job that keeps killing its worker fails once it is out of attempts
+    instead of looping forever.
+    """
+    timeout = timeout or getattr(settings, 'PROPERTYCONTROL_JOB_TIMEOUT', 3600)
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=timeout)
+    stale = Job.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status='running',
+    )
+    for job in stale.filter(attempts__gte=F('max_attempts')):
+        failed = Job.objects.filter(pk=job.pk, status='running').update(
+            status='failed', error='Worker lost on the last attempt', locked_by='', finished_at=now,
+        )
+        if failed:
+            discard_inputs(job)
+    return stale.filter(attempts__lt=F('max_attempts')).update(
+        status='queued', run_after=now, locked_by=''
+    )
+
+
+class JobContext:
+    """Handed to handlers so they can report progress."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def progress(self, percent=None, message=''):
+        fields = {'progress_message': message[:255]}
+        if percent is not None:
+            fields['progress'] = max(0, min(int(percent), 100))
+        Job.objects.filter(pk=self.job.pk).update(heartbeat_at=timezone.now(), **fields)
+
+
+def run_job(job_id):
+    """
+    Execute a claimed job and record its outcome. Unexpected errors are
+    retried with backoff until ``max_attempts``; ``JobFailed`` is final.
+    Returns the final status.
+    """
+    job = Job.objects.get(pk=job_id)
+    handler = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise JobFailed(f'No handler for job kind "{job.kind}"')
+        result = handler(job, JobContext(job))
+    except JobFailed as exc:
+        return _finish(job, 'failed', result=exc.result, error=str(exc))
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed on attempt %s', job.pk, job.kind, job.attempts)
+        if job.attempts < job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(
+                status='queued', error=str(exc), locked_by='',
+                run_after=timezone.now() + retry_delay(job.attempts),
+            )
+            return 'queued'
+        return _finish(job, 'failed', error=str(exc))
+    return _finish(job, 'succeeded', result=result, progress=100)
+
+
+def _finish(job, status, result=None, error='', **fields):
+    Job.objects.filter(pk=job.pk).update(
+        status=status, result=result, error=error, locked_by='',
+        finished_at=timezone.now(), **fields
+    )
+    if status == 'failed':
+        discard_inputs(job)
+    return status
+
+
+def discard_inputs(job):
+    """Delete the uploaded input file of a job that will not run again."""
+    name = job.payload.get('file')
+    if name:
+        job_storage().delete(name)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+# --------------------
+# Handlers
+# --------------------
+
+@job_handler('import_properties')
+def import_properties_job(job, context):
+    from .imports import ImportFormatError, PropertyImporter, iter_rows
+    from .models import User
+
+    storage = job_storage()
+    name = job.payload['file']
+    user = User.objects.get(pk=job.payload['user'])
+
+    def report(result):
+        context.progress(message=f'{result["rows"]} rows processed')
+
+    def checkpoint(result):
+        # Saved with each chunk, so a retry resumes after the last committed
+        # row instead of importing the committed chunks a second time.
+        Job.objects.filter(pk=job.pk).update(result=result, heartbeat_at=timezone.now())
+
+    try:
+        with storage.open(name, 'rb') as fileobj:
+            result = PropertyImporter(user).run(
+                iter_rows(fileobj, name), progress=report, checkpoint=checkpoint, resume=job.result,
+            )
+    except ImportFormatError as exc:
+        raise JobFailed(str(exc))
+    storage.delete(name)
+    return result
+
+
+@job_handler('export')
+def export_job(job, context):
+    from .exports import export_rows, iter_csv, write_xlsx
+    from .filters import filter_properties
+    from .models import Property, PropertyTransfer
+
+    kind, file_format = job.payload['kind'], job.payload.get('format', 'csv')
+    params = job.payload.get('params', {})
+    if kind == 'properties':
+        queryset = filter_properties(Property.objects.all(), params)
+    else:
+        queryset = PropertyTransfer.objects.all()
+        if params.get('property'):
+            queryset = queryset.filter(property__id=params['property'])
+    header, rows = export_rows(kind, queryset)
+
+    storage = job_storage()
+    name = f'exports/{kind}-{job.pk}.{file_format}'
+    path = storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if file_format == 'xlsx':
+        write_xlsx(path, header, rows)
+    else:
+        with open(path, 'w', encoding='utf-8', newline='') as out:
+            for line in iter_csv(header, rows):
+                out.write(line)
+    return {'file': name, 'filename': f'{kind}.{file_format}'}
+
+
+@job_handler('bulk_transfer')
+def bulk_transfer_job(job, context):
+    from .filters import filter_properties
+    from .models import Department, Property, User
+    from .transfers import TransferError, bulk_transfer
+
+    payload = job.payload
+    if 'properties' in payload:
+        queryset = Property.objects.filter(pk__in=payload['properties'])
+    else:
+        queryset = filter_properties(Property.objects.all(), payload.get('filter', {}))
+    from_department = payload.get('from_department')
+    try:
+        return bulk_transfer(
+            queryset,
+            Department.objects.get(pk=payload['to_department']),
+            User.objects.get(pk=payload['user']),
+            from_department=Department.objects.get(pk=from_department) if from_department else None,
+            notes=payload.get('notes', ''),
+            property_ids=payload.get('properties'),
+        )
+    except TransferError as exc:
+        raise JobFailed(str(exc), {'properties': exc.property_ids[:100]})
+
+
+@job_handler('image_renditions')
+def image_renditions_job(job, context):
+    from . import images
+    from .storage import get_image_storage
+
+    names = images.generate_renditions(
+        job.payload['image'], job.payload['image_hash'], get_image_storage()
+    )
+    return {'renditions': names}
+
+
+@job_handler('revaluation')
+def revaluation_job(job, context):
+    from datetime import date
+    from .models import User
+    from .valuation import revalue
+
+    payload = job.payload
+    run = revalue(
+        as_of=date.fromisoformat(payload['as_of']) if payload.get('as_of') else None,
+        user=User.objects.filter(pk=payload.get('user')).first(),
+        progress=lambda done, total: context.progress(
+            100 * done // max(total, 1), f'{done} of {total} properties valued'
+        ),
+    )
+    return {
+        'run': run.pk,
+        'as_of': run.as_of.isoformat(),
+        'properties_valued': run.properties_valued,
+        'properties_changed': run.properties_changed,
+        'value_before': str(run.value_before),
+        'value_after': str(run.value_after),
+    }
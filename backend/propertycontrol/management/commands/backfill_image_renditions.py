@@ -0,0 +1,41 @@
+# backend/propertycontrol/management/commands/backfill_image_renditions.py
+from django.core.management.base import BaseCommand
+from propertycontrol import images
+from propertycontrol.models import Property
+from propertycontrol.storage import get_image_storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Hash property images that have no image_hash yet (uploaded before '
+        'hashing existed) and generate every missing thumbnail/medium '
+        'rendition, so list responses can link the renditions directly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hashes-only', action='store_true', help='Do not generate renditions.')
+
+    def handle(self, *args, **options):
+        storage = get_image_storage()
+        hashed = generated = failed = 0
+        done = set()
+        rows = Property.objects.exclude(image='').exclude(image__isnull=True).order_by('id')
+        for pk, name, image_hash in rows.values_list('id', 'image', 'image_hash').iterator():
+            try:
+                if not image_hash:
+                    with storage.open(name, 'rb') as original:
+                        image_hash = images.content_hash(original)
+                    Property.objects.filter(pk=pk, image=name).update(image_hash=image_hash)
+                    hashed += 1
+                if not options['hashes_only'] and image_hash not in done:
+                    images.generate_renditions(name, image_hash, storage)
+                    done.add(image_hash)
+                    generated += 1
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f'Property {pk} ({name}): {exc}')
+
+        self.stdout.write(f'{hashed} image(s) hashed, renditions checked for {generated} image(s)')
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} image(s) could not be read'))
+        self.stdout.write(self.style.SUCCESS('Image backfill complete'))
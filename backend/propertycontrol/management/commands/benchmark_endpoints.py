@@ -0,0 +1,83 @@
+# backend/propertycontrol/management/commands/benchmark_endpoints.py
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from propertycontrol.benchmarking import percentile, seed_dataset, time_requests
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large dataset and report p50/p95 latency of the list and filter '
+        'endpoints. Run it before and after "migrate" to compare index changes; '
+        'the seeded rows are rolled back unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=10000)
+        parser.add_argument('--departments', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--transfers', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded rows')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                results = self.run(options)
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            pass
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"endpoint":<45} {"p50 ms":>10} {"p95 ms":>10}')
+        for name, row in results.items():
+            self.stdout.write(f'{name:<45} {row["p50_ms"]:>10.2f} {row["p95_ms"]:>10.2f}')
+
+    def run(self, options):
+        self.stdout.write('Seeding benchmark data...')
+        data = seed_dataset(
+            properties=options['properties'],
+            departments=options['departments'],
+            categories=options['categories'],
+            transfers=options['transfers'],
+        )
+        department = data['departments'][0].pk
+        category = data['categories'][0].pk
+        property_id = data['user'].created_properties.values_list('id', flat=True).first()
+
+        endpoints = [
+            '/api/properties/',
+            '/api/properties/?page=50',
+            f'/api/properties/?department={department}',
+            f'/api/properties/?category={category}',
+            f'/api/properties/?department={department}&category={category}',
+            '/api/properties/?search=lenovo',
+            '/api/properties/?pagination=cursor',
+            '/api/transfers/',
+            f'/api/transfers/?property={property_id}',
+            '/api/transfers/recent/',
+            '/api/dashboard/stats/',
+        ]
+
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(data['user'])
+        results = {}
+        for path in endpoints:
+            time_requests(client, path, 2)  # warm-up
+            timings = time_requests(client, path, options['repeat'])
+            results[path] = {
+                'p50_ms': percentile(timings, 50),
+                'p95_ms': percentile(timings, 95),
+            }
+        return results
@@ -0,0 +1,85 @@
+# backend/propertycontrol/management/commands/benchmark_fieldsets.py
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from propertycontrol.benchmarking import percentile, seed_dataset, time_requests, time_serialization
+from propertycontrol.models import Property, PropertyTransfer
+from propertycontrol.serializers import PropertySerializer, PropertyTransferSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+# (endpoint, queryset, serializer, the columns a typical table shows)
+CASES = [
+    (
+        '/api/properties/?pagination=cursor&page_size=100',
+        lambda: Property.objects.for_api().order_by('-created_at', '-id'), PropertySerializer,
+        'id,code,name,status,current_department_name',
+    ),
+    (
+        '/api/transfers/?pagination=cursor&page_size=100',
+        lambda: PropertyTransfer.objects.for_api().order_by('-transfer_date', '-id'), PropertyTransferSerializer,
+        'id,property_name,from_department_name,to_department_name,transfer_date',
+    ),
+    ('/api/departments/', None, None, 'id,name'),
+    ('/api/admin/users/', None, None, 'id,username'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare full list responses with ?fields= sparse fieldsets: payload '
+        'bytes, request latency, and the fetch/serialize split for 100 rows. '
+        'The seeded rows are rolled back unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=10000)
+        parser.add_argument('--transfers', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded rows')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                results = self.run(options)
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            pass
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f'{"request":<95} {"bytes":>8} {"p50 ms":>8} {"fetch ms":>9} {"serialize ms":>13}'
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:<95} {row["bytes"]:>8} {row["p50_ms"]:>8.2f} '
+                f'{row.get("fetch_ms", 0):>9.2f} {row.get("serialize_ms", 0):>13.2f}'
+            )
+
+    def run(self, options):
+        self.stdout.write('Seeding benchmark data...')
+        data = seed_dataset(properties=options['properties'], transfers=options['transfers'])
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(data['user'])
+
+        results = {}
+        for path, queryset, serializer_class, fields in CASES:
+            separator = '&' if '?' in path else '?'
+            for url, selection in ((path, None), (f'{path}{separator}fields={fields}', fields.split(','))):
+                response = client.get(url)
+                timings = time_requests(client, url, options['repeat'])
+                row = {'bytes': len(response.content), 'p50_ms': percentile(timings, 50)}
+                if queryset is not None:
+                    row.update(time_serialization(queryset(), serializer_class, selection, repeat=options['repeat']))
+                results[url] = row
+        return results
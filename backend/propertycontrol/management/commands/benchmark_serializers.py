@@ -0,0 +1,76 @@
+# backend/propertycontrol/management/commands/benchmark_serializers.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from propertycontrol.benchmarking import seed_dataset, time_read_paths
+from propertycontrol.models import Property, PropertyTransfer
+from propertycontrol.serializers import PropertySerializer, PropertyTransferSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+CASES = {
+    'properties': (lambda: Property.objects.for_api().order_by('-created_at', '-id'), PropertySerializer),
+    'transfers': (lambda: PropertyTransfer.objects.for_api().order_by('-transfer_date', '-id'),
+                  PropertyTransferSerializer),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare list serialization through DRF with the fastread path (and '
+        'orjson rendering) at several page sizes: fetch/serialize/render '
+        'times and rows per second. Fails if the outputs differ. The seeded '
+        'rows are rolled back unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='100,1000,10000', help='Comma-separated row counts')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded rows')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['rows'].split(',')]
+        except ValueError:
+            raise CommandError('--rows must be comma-separated integers')
+
+        try:
+            with transaction.atomic():
+                results = self.run(sizes, options['repeat'])
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            pass
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.stdout.write(
+                f'{"case":<12} {"rows":>6} {"path":<12} {"fetch ms":>9} {"serialize ms":>13} '
+                f'{"render ms":>10} {"rows/s":>10}'
+            )
+            for case, runs in results.items():
+                for run in runs:
+                    for path, row in run['paths'].items():
+                        self.stdout.write(
+                            f'{case:<12} {run["rows"]:>6} {path:<12} {row["fetch_ms"]:>9.2f} '
+                            f'{row["serialize_ms"]:>13.2f} {row["render_ms"]:>10.2f} '
+                            f'{row["rows_per_second"]:>10.0f}'
+                        )
+        if not all(run['identical'] for runs in results.values() for run in runs):
+            raise CommandError('The fast path produced different output')
+        self.stdout.write(self.style.SUCCESS('All paths produced identical output.'))
+
+    def run(self, sizes, repeat):
+        self.stdout.write('Seeding benchmark data...')
+        seed_dataset(properties=max(sizes), transfers=max(sizes))
+        return {
+            case: [time_read_paths(queryset(), serializer_class, rows, repeat) for rows in sizes]
+            for case, (queryset, serializer_class) in CASES.items()
+        }
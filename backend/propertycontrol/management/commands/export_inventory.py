@@ -0,0 +1,43 @@
+# backend/propertycontrol/management/commands/export_inventory.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from propertycontrol.exports import export_rows, iter_csv, write_xlsx
+from propertycontrol.filters import filter_properties
+from propertycontrol.models import Property, PropertyTransfer
+
+
+class Command(BaseCommand):
+    help = 'Stream the property inventory or the transfer log to a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['properties', 'transfers'])
+        parser.add_argument('--output', help='Output path (defaults to CSV on stdout)')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--search')
+        parser.add_argument('--department')
+        parser.add_argument('--category')
+        parser.add_argument('--property', help='Only transfers of this property id')
+
+    def handle(self, *args, **options):
+        if options['kind'] == 'properties':
+            queryset = filter_properties(Property.objects.all(), options)
+        else:
+            queryset = PropertyTransfer.objects.all()
+            if options['property']:
+                queryset = queryset.filter(property__id=options['property'])
+        header, rows = export_rows(options['kind'], queryset)
+
+        if options['format'] == 'xlsx':
+            if not options['output']:
+                raise CommandError('--output is required for XLSX exports')
+            write_xlsx(options['output'], header, rows)
+            return
+
+        out = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for line in iter_csv(header, rows):
+                out.write(line)
+        finally:
+            if out is not sys.stdout:
+                out.close()
@@ -0,0 +1,58 @@
+# backend/propertycontrol/management/commands/gc_media.py
+from django.core.management.base import BaseCommand
+from propertycontrol import images
+from propertycontrol.models import MediaBlob, Property
+from propertycontrol.storage import get_image_storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete property images no Property references any more: blobs whose '
+        'refcount dropped to zero and, with --sweep, files under the image '
+        'directory that have no MediaBlob row at all.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sweep', action='store_true', help='Also walk the storage for untracked files.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        orphans = MediaBlob.objects.filter(refcount__lte=0)
+        if dry_run:
+            self.stdout.write(f'{orphans.count()} unreferenced blob(s) would be deleted')
+        else:
+            self.stdout.write(f'{MediaBlob.objects.collect()} unreferenced blob(s) deleted')
+
+        if options['sweep']:
+            untracked = self.untracked_files()
+            for name in untracked:
+                if not dry_run:
+                    get_image_storage().delete(name)
+            verb = 'would be deleted' if dry_run else 'deleted'
+            self.stdout.write(f'{len(untracked)} untracked file(s) {verb}')
+
+        self.stdout.write(self.style.SUCCESS('Media garbage collection complete'))
+
+    def untracked_files(self):
+        storage = get_image_storage()
+        root = Property._meta.get_field('image').upload_to.rstrip('/')
+        if not storage.exists(root):
+            return []
+        known = set(MediaBlob.objects.values_list('name', flat=True))
+        known.update(Property.objects.exclude(image='').values_list('image', flat=True))
+
+        untracked = []
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            subdirs, files = storage.listdir(directory)
+            for subdir in subdirs:
+                path = f'{directory}/{subdir}'
+                if path != images.RENDITION_DIR:
+                    pending.append(path)
+            for filename in files:
+                name = f'{directory}/{filename}'
+                if name not in known and not filename.startswith('.upload-'):
+                    untracked.append(name)
+        return untracked
@@ -0,0 +1,39 @@
+# backend/propertycontrol/management/commands/import_properties.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from propertycontrol.imports import ImportFormatError, PropertyImporter, iter_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import properties from a CSV or XLSX file in streamed chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to a .csv or .xlsx file')
+        parser.add_argument('--user', required=True, help='Username recorded as created_by')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--max-errors', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" does not exist')
+
+        importer = PropertyImporter(
+            user, chunk_size=options['chunk_size'], max_errors=options['max_errors']
+        )
+        with open(options['path'], 'rb') as fileobj:
+            try:
+                result = importer.run(iter_rows(fileobj, options['path']))
+            except ImportFormatError as exc:
+                raise CommandError(str(exc))
+
+        for error in result['errors']:
+            self.stdout.write(self.style.ERROR(f'Row {error["row"]}: {error["errors"]}'))
+        if result['errors_truncated']:
+            self.stdout.write(self.style.WARNING('Further row errors were not reported'))
+        self.stdout.write(self.style.SUCCESS(
+            f'{result["created"]} properties imported, {result["failed"]} rows rejected'
+        ))
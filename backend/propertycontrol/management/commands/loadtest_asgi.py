@@ -0,0 +1,66 @@
+# backend/propertycontrol/management/commands/loadtest_asgi.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from propertycontrol.benchmarking import http_load, http_request, login
+
+ENDPOINTS = [
+    ('dashboard', 'dashboard/stats/'),
+    ('recent transfers', 'transfers/recent/'),
+    ('property list', 'properties/'),
+    ('property detail', 'properties/{property_id}/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/sec and tail latency of the sync (WSGI) read endpoints '
+        'with their async counterparts under /api/async/ on an ASGI server. '
+        'Start both deployments first, e.g. "gunicorn config.wsgi -w 4 -b :8000" '
+        'and "uvicorn config.asgi:application --workers 4 --port 8001".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001')
+        parser.add_argument('--username', default='admin')
+        parser.add_argument('--password', default='admin123')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        results = {}
+        for deployment, base_url, prefix in (
+            ('wsgi', options['wsgi_url'].rstrip('/'), '/api/'),
+            ('asgi', options['asgi_url'].rstrip('/'), '/api/async/'),
+        ):
+            try:
+                token = login(base_url, options['username'], options['password'])
+            except OSError as exc:
+                raise CommandError(f'Cannot reach the {deployment} server at {base_url}: {exc}')
+            status, body = http_request(f'{base_url}/api/properties/', token=token)
+            rows = json.loads(body).get('results') if status == 200 else None
+            if not rows:
+                raise CommandError(f'No properties to benchmark on {base_url}')
+
+            for name, path in ENDPOINTS:
+                url = base_url + prefix + path.format(property_id=rows[0]['id'])
+                results.setdefault(name, {})[deployment] = http_load(
+                    url, token, options['concurrency'], options['requests']
+                )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f'{"endpoint":<18} {"server":<6} {"req/s":>9} {"p50 ms":>9} '
+            f'{"p95 ms":>9} {"p99 ms":>9} {"errors":>7}'
+        )
+        for name, by_deployment in results.items():
+            for deployment, row in by_deployment.items():
+                self.stdout.write(
+                    f'{name:<18} {deployment:<6} {row["requests_per_second"]:>9.1f} '
+                    f'{row["p50_ms"]:>9.2f} {row["p95_ms"]:>9.2f} {row["p99_ms"]:>9.2f} '
+                    f'{row["errors"]:>7}'
+                )
@@ -0,0 +1,37 @@
+# backend/propertycontrol/management/commands/rebuild_inventory_counters.py
+from django.core.management.base import BaseCommand, CommandError
+from propertycontrol.models import InventoryCounter
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the inventory counter table from Property rows, or check it for drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report drift between the counters and the Property table',
+        )
+
+    def handle(self, *args, **options):
+        drift = InventoryCounter.objects.drift()
+
+        for (department_id, category_id, status), (expected, stored) in sorted(
+            drift.items(), key=lambda item: tuple(str(part) for part in item[0])
+        ):
+            self.stdout.write(
+                f'department={department_id} category={category_id} status={status}: '
+                f'expected count={expected[0]} value={expected[1]}, '
+                f'stored count={stored[0]} value={stored[1]}'
+            )
+
+        if options['check']:
+            if drift:
+                raise CommandError(f'{len(drift)} inventory counter bucket(s) drifted')
+            self.stdout.write(self.style.SUCCESS('Inventory counters are consistent'))
+            return
+
+        InventoryCounter.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Inventory counters rebuilt ({len(drift)} bucket(s) corrected)'
+        ))
@@ -0,0 +1,26 @@
+# backend/propertycontrol/management/commands/renumber_property_codes.py
+from django.core.management.base import BaseCommand
+
+from propertycontrol.codes import legacy_properties, renumber_legacy_codes
+
+
+class Command(BaseCommand):
+    help = (
+        'Give properties that still carry a legacy random code (e.g. 3F9A01BC) '
+        'a per-category sequential code (e.g. COMP-000123). The old code is '
+        'kept in legacy_code and stays searchable. Safe to re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the legacy codes.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f'{legacy_properties().count()} propert(ies) would be renumbered')
+            return
+        renumbered = renumber_legacy_codes(
+            options['batch_size'],
+            progress=lambda done: self.stdout.write(f'{done} renumbered...'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'{renumbered} propert(ies) renumbered'))
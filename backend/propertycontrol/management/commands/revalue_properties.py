@@ -0,0 +1,48 @@
+# backend/propertycontrol/management/commands/revalue_properties.py
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from propertycontrol.models import Category, Property
+from propertycontrol.valuation import REVALUATION_CHUNK_SIZE, revalue
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute current_value of every property whose category has a '
+        'depreciation policy, recording a valuation run and snapshots.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help='Valuation date (YYYY-MM-DD), default today')
+        parser.add_argument('--category', help='Only this category code')
+        parser.add_argument('--chunk-size', type=int, default=REVALUATION_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Compute and report without writing.')
+
+    def handle(self, *args, **options):
+        try:
+            as_of = date.fromisoformat(options['as_of']) if options['as_of'] else None
+        except ValueError:
+            raise CommandError('--as-of must be a YYYY-MM-DD date')
+
+        queryset = Property.objects.all()
+        if options['category']:
+            try:
+                queryset = queryset.filter(category=Category.objects.get(code=options['category']))
+            except Category.DoesNotExist:
+                raise CommandError(f'Category "{options["category"]}" does not exist')
+
+        started = time.perf_counter()
+        run = revalue(
+            queryset, as_of=as_of, chunk_size=options['chunk_size'], dry_run=options['dry_run']
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{run.properties_valued} valued, {run.properties_changed} changed '
+            f'in {elapsed:.2f}s; total {run.value_before} -> {run.value_after}'
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing written'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Valuation run #{run.pk} as of {run.as_of} recorded'))
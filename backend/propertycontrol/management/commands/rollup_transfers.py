@@ -0,0 +1,28 @@
+# backend/propertycontrol/management/commands/rollup_transfers.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from propertycontrol.analytics import roll_up_closed_days
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarize every closed day of transfers that has not been rolled up '
+        'yet into TransferRollup. Meant to run periodically (e.g. nightly). '
+        'Days of the last week are re-counted on each run and redone if a '
+        'transfer committed after they were rolled up; older late commits '
+        'need --rebuild --since=<day>.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day to consider (YYYY-MM-DD); default the first transfer')
+        parser.add_argument('--rebuild', action='store_true', help='Redo days that are already rolled up.')
+
+    def handle(self, *args, **options):
+        try:
+            since = date.fromisoformat(options['since']) if options['since'] else None
+        except ValueError:
+            raise CommandError('--since must be a YYYY-MM-DD date')
+
+        rolled = roll_up_closed_days(since=since, rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS(f'{rolled} day(s) rolled up'))
@@ -0,0 +1,175 @@
+# backend/propertycontrol/management/commands/run_benchmarks.py
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from propertycontrol import metrics
+from propertycontrol.benchmarking import http_load, login, serve_in_background
+from propertycontrol.models import Category, Department, Property, PropertyTransfer, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the main API endpoints (login, list, search, filter, detail, '
+        'transfer, dashboard) at a fixed concurrency against a threaded WSGI '
+        'server started in this process on the configured database, and write '
+        'the results to a JSON file that can be diffed between versions '
+        '(--compare prints the changes). Seed the data first with '
+        'seed_benchmark_data; the transfer endpoint writes real transfers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='benchmark')
+        parser.add_argument('--password', required=True, help='As printed by seed_benchmark_data.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per endpoint.')
+        parser.add_argument('--endpoints', help='Comma-separated subset of the endpoint names.')
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--compare', help='A previous results file to compare with.')
+
+    def handle(self, *args, **options):
+        property_ids = list(
+            Property.objects.filter(current_department__isnull=False)
+            .order_by('id').values_list('id', flat=True)[:500]
+        )
+        department_ids = list(Department.objects.order_by('id').values_list('id', flat=True)[:20])
+        if not property_ids or len(department_ids) < 2:
+            raise CommandError('Not enough data to benchmark; run seed_benchmark_data first.')
+
+        endpoints = self.endpoints(options, property_ids, department_ids)
+        if options['endpoints']:
+            wanted = [name.strip() for name in options['endpoints'].split(',')]
+            unknown = sorted(set(wanted) - set(endpoints))
+            if unknown:
+                raise CommandError(f'Unknown endpoint(s): {", ".join(unknown)}. Known: {", ".join(endpoints)}')
+            endpoints = {name: endpoints[name] for name in wanted}
+
+        server, base_url = serve_in_background()
+        try:
+            try:
+                token = login(base_url, options['username'], options['password'])
+            except RuntimeError as exc:
+                raise CommandError(f'{exc}; seed_benchmark_data creates the benchmark user.')
+            results = {}
+            for name, (method, path, data, url_name) in endpoints.items():
+                self.stdout.write(f'Benchmarking {name}...')
+                url = (lambda n, path=path: base_url + path(n)) if callable(path) else base_url + path
+                request_token = None if name == 'login' else token
+                if options['warmup']:
+                    http_load(url, request_token, options['concurrency'], options['warmup'], method, data)
+                metrics.registry.reset()
+                row = http_load(url, request_token, options['concurrency'], options['requests'], method, data)
+                server_side = metrics.registry.snapshot().get(url_name)
+                if server_side:
+                    row['queries_per_request'] = server_side['queries_per_request']
+                    row['serializer_ms_per_request'] = (
+                        server_side['serializer_seconds_total'] * 1000 / server_side['requests']
+                    )
+                    row['response_bytes_per_request'] = (
+                        server_side['response_bytes_total'] // server_side['requests']
+                    )
+                results[name] = row
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        report = {'meta': self.meta(options), 'endpoints': results}
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    previous = json.load(f)['endpoints']
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f'Cannot read {options["compare"]}: {exc}')
+        self.print_table(results, previous)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def endpoints(self, options, property_ids, department_ids):
+        """``{name: (method, path or path(n), data or data(n), URL name)}``."""
+        department = department_ids[0]
+        category = Category.objects.order_by('id').values_list('id', flat=True).first()
+        credentials = {'username': options['username'], 'password': options['password']}
+
+        def detail(n):
+            return f'/api/properties/{property_ids[n % len(property_ids)]}/'
+
+        def transfer(n):
+            return f'/api/properties/{property_ids[n % len(property_ids)]}/transfer/'
+
+        def destination(n):
+            # Consecutive moves of one property go to different departments.
+            return {'department': department_ids[(n // len(property_ids)) % len(department_ids)]}
+
+        return {
+            'login': ('POST', '/api/auth/login/', credentials, 'login'),
+            'list': ('GET', '/api/properties/', None, 'property-list'),
+            'list_cursor_100': ('GET', '/api/properties/?pagination=cursor&page_size=100', None, 'property-list'),
+            'search': ('GET', '/api/properties/?search=lenovo', None, 'property-list'),
+            'filter': ('GET', f'/api/properties/?department={department}&category={category}', None,
+                       'property-list'),
+            'detail': ('GET', detail, None, 'property-detail'),
+            'transfer_list': ('GET', '/api/transfers/', None, 'transfer-list'),
+            'transfer': ('PUT', transfer, destination, 'property-transfer'),
+            'dashboard': ('GET', '/api/dashboard/stats/', None, 'dashboard_stats'),
+        }
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=10,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit': commit,
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'concurrency': options['concurrency'],
+            'requests_per_endpoint': options['requests'],
+            'dataset': {
+                'properties': Property.objects.count(),
+                'transfers': PropertyTransfer.objects.count(),
+                'departments': Department.objects.count(),
+                'categories': Category.objects.count(),
+                'users': User.objects.count(),
+            },
+        }
+
+    def print_table(self, results, previous=None):
+        header = f'{"endpoint":<16} {"req/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"queries":>8} {"errors":>7}'
+        if previous:
+            header += f' {"req/s vs prev":>14} {"p95 vs prev":>12}'
+        self.stdout.write(header)
+        for name, row in results.items():
+            line = (
+                f'{name:<16} {row["requests_per_second"]:>9.1f} {row["p50_ms"]:>9.2f} '
+                f'{row["p95_ms"]:>9.2f} {row["p99_ms"]:>9.2f} '
+                f'{row.get("queries_per_request", 0):>8.1f} {row["errors"]:>7}'
+            )
+            before = (previous or {}).get(name)
+            if before:
+                line += (
+                    f' {change(row["requests_per_second"], before["requests_per_second"]):>14}'
+                    f' {change(row["p95_ms"], before["p95_ms"]):>12}'
+                )
+            self.stdout.write(line)
+
+
+def change(now, before):
+    if not before:
+        return 'n/a'
+    return f'{(now - before) / before * 100:+.1f}%'
@@ -0,0 +1,139 @@
+# backend/propertycontrol/management/commands/run_jobs.py
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+STALE_CHECK_INTERVAL = 60  # seconds
+
+
+def setup_process():
+    # Pool processes are spawned, not forked: they start clean and open their
+    # own database connections.
+    import django
+    django.setup()
+
+
+def execute(job_id):
+    from django.db import close_old_connections, connections
+    from propertycontrol.jobs import run_job
+
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued background jobs (imports, exports, bulk transfers, image '
+        'renditions, revaluations) on a pool of worker processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 2,
+            help='Pool size; 0 runs jobs one at a time in this process.'
+        )
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between queue polls.')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained.')
+
+    def handle(self, *args, **options):
+        from propertycontrol import jobs
+
+        self.stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop.set())
+
+        self.worker = jobs.worker_id()
+        self.processes = options['processes']
+        self.poll_interval = options['poll_interval']
+        self.once = options['once']
+        self.completed = 0
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'{requeued} stale job(s) re-queued'))
+
+        if self.processes <= 0:
+            self.run_inline()
+        else:
+            while not self.run_pool():
+                self.stdout.write(self.style.WARNING('Worker pool broke; restarting it'))
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped after {self.completed} job(s)'))
+
+    def run_inline(self):
+        from propertycontrol import jobs
+
+        while not self.stop.is_set():
+            claimed = jobs.claim_jobs(self.worker, 1)
+            if claimed:
+                self.report(claimed[0], jobs.run_job(claimed[0]))
+            elif self.once:
+                return
+            else:
+                self.stop.wait(self.poll_interval)
+
+    def run_pool(self):
+        """Return True on a clean stop, False if the pool broke and must be rebuilt."""
+        from propertycontrol import jobs
+
+        context = multiprocessing.get_context('spawn')
+        inflight = {}
+        idle = 0.0
+        with ProcessPoolExecutor(self.processes, mp_context=context, initializer=setup_process) as pool:
+            while True:
+                if not self.stop.is_set() and len(inflight) < self.processes:
+                    for job_id in jobs.claim_jobs(self.worker, self.processes - len(inflight)):
+                        inflight[pool.submit(execute, job_id)] = job_id
+
+                if not inflight:
+                    if self.stop.is_set() or self.once:
+                        return True
+                    self.stop.wait(self.poll_interval)
+                    idle += self.poll_interval
+                    if idle >= STALE_CHECK_INTERVAL:
+                        jobs.requeue_stale()
+                        idle = 0.0
+                    continue
+
+                done, _ = wait(inflight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = inflight.pop(future)
+                    try:
+                        self.report(job_id, future.result())
+                    except BrokenProcessPool:
+                        self.fail(job_id, 'Worker process died')
+                        for other in inflight.values():
+                            self.fail(other, 'Worker process died')
+                        return False
+                    except Exception as exc:
+                        self.fail(job_id, str(exc))
+
+    def fail(self, job_id, message):
+        from django.utils import timezone
+        from propertycontrol.jobs import retry_delay
+        from propertycontrol.models import Job
+
+        job = Job.objects.filter(pk=job_id, status='running').first()
+        if job is None:
+            return
+        if job.attempts < job.max_attempts:
+            Job.objects.filter(pk=job_id).update(
+                status='queued', error=message, locked_by='',
+                run_after=timezone.now() + retry_delay(job.attempts),
+            )
+        else:
+            Job.objects.filter(pk=job_id).update(
+                status='failed', error=message, locked_by='', finished_at=timezone.now()
+            )
+        self.stdout.write(self.style.ERROR(f'Job {job_id}: {message}'))
+
+    def report(self, job_id, status):
+        self.completed += 1
+        style = self.style.SUCCESS if status == 'succeeded' else self.style.WARNING
+        self.stdout.write(style(f'Job {job_id}: {status}'))
@@ -0,0 +1,87 @@
+# backend/propertycontrol/management/commands/seed_benchmark_data.py
+import json
+import secrets
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from propertycontrol.benchmarking import seed_dataset
+from propertycontrol.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-generate a production-sized synthetic inventory (departments, '
+        'categories, users, properties and a consistent transfer history) '
+        'in the configured database, for run_benchmarks and manual testing. '
+        'The same --seed gives the same sizes, prices and transfer walks; codes '
+        'and usernames carry a random run tag and dates count back from today. '
+        'Refuses to run with DEBUG off unless --force is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--properties', type=int, default=100000)
+        parser.add_argument('--transfers', type=int, default=200000)
+        parser.add_argument('--history-days', type=int, default=365, help='Spread transfers over this many days.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--username', default='benchmark', help='Admin account to create for the benchmarks.')
+        parser.add_argument('--password', help='Password for --username; generated and printed if omitted.')
+        parser.add_argument('--force', action='store_true', help='Seed even though DEBUG is off.')
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError(
+                'DEBUG is off, so this may be a production database; pass --force to seed it anyway.'
+            )
+        for name in ('departments', 'categories', 'users'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be at least 1')
+        if User.objects.filter(username=options['username']).exists():
+            raise CommandError(
+                f'User "{options["username"]}" already exists; pass another --username.'
+            )
+
+        password = options['password'] or secrets.token_urlsafe(12)
+        started = time.perf_counter()
+        with transaction.atomic():
+            data = seed_dataset(
+                properties=options['properties'],
+                departments=options['departments'],
+                categories=options['categories'],
+                transfers=options['transfers'],
+                users=options['users'],
+                history_days=options['history_days'],
+                batch_size=options['batch_size'],
+                seed=options['seed'],
+                username=options['username'],
+                password=password,
+            )
+        summary = {
+            'departments': len(data['departments']),
+            'categories': len(data['categories']),
+            'users': len(data['users']),
+            'properties': options['properties'],
+            'transfers': options['transfers'],
+            'seconds': round(time.perf_counter() - started, 2),
+            'username': options['username'],
+        }
+        if not options['password']:
+            summary['password'] = password
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {summary["properties"]} properties, {summary["transfers"]} transfers, '
+            f'{summary["users"]} users, {summary["departments"]} departments and '
+            f'{summary["categories"]} categories in {summary["seconds"]}s. '
+            f'Benchmark login: {summary["username"]}'
+            + (f' / {summary["password"]}.' if 'password' in summary else '.')
+        ))
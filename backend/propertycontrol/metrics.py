@@ -0,0 +1,288 @@
+# backend/propertycontrol/metrics.py
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-endpoint request metrics, kept in memory by each worker process (so
+# each worker is scraped separately, like the in-process revocation store).
+# MetricsMiddleware times every request; queries are counted by an execute
+# wrapper installed on every connection (see signals.py) and serializers
+# report their own time through SerializerTimingMixin. Both find the
+# request's RequestMetrics in a context variable, which also follows async
+# views' ORM calls onto worker threads.
+
+UNRESOLVED = '<unresolved>'
+QUANTILES = (50, 95, 99)
+
+
+def get_window():
+    return getattr(settings, 'PROPERTYCONTROL_METRICS_WINDOW', 1000)
+
+
+def get_n_plus_one_threshold():
+    return getattr(settings, 'PROPERTYCONTROL_N_PLUS_ONE_THRESHOLD', 10)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def normalize_sql(sql):
+    """Reduce a statement to its shape: literals and IN (...) lists collapsed."""
+    return LITERAL.sub('?', IN_LIST.sub('(...)', sql))
+
+
+class RequestMetrics:
+    """What one request spent on the database and in serializers."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.statements = Counter()
+        self.lock = threading.Lock()
+
+    def add_query(self, sql, duration):
+        with self.lock:
+            self.queries += 1
+            self.query_time += duration
+            self.statements[sql] += 1
+
+    def repeated_selects(self, threshold):
+        """``[(count, statement)]`` for SELECTs of one shape run ``threshold`` times or more."""
+        shapes = Counter()
+        for sql, count in self.statements.items():
+            if sql.lstrip()[:6].upper() == 'SELECT':
+                shapes[normalize_sql(sql)] += count
+        return [(count, sql) for sql, count in shapes.most_common() if count >= threshold]
+
+
+current = ContextVar('propertycontrol_request_metrics', default=None)
+
+
+@contextmanager
+def collect():
+    """Collect the queries and serializer time of the block into a new RequestMetrics."""
+    metrics = RequestMetrics()
+    token = current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def install(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serializer_timer():
+    """Add the time spent in the block to the request's serializer time (outermost block only)."""
+    metrics = current.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - started
+        metrics.serializing = False
+
+
+class SerializerTimingMixin:
+    """Serializer mixin: count ``to_representation`` towards the request's serializer time."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class EndpointStats:
+    def __init__(self, window):
+        self.requests = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.response_bytes = 0
+        self.n_plus_one = 0
+        self.recent = deque(maxlen=window)
+
+    def summary(self):
+        summary = {
+            'requests': self.requests,
+            'errors': self.errors,
+            **{f'p{pct}_ms': percentile(self.recent, pct) * 1000 for pct in QUANTILES},
+            'duration_seconds_total': self.duration,
+            'queries_total': self.queries,
+            'query_seconds_total': self.query_time,
+            'serializer_seconds_total': self.serializer_time,
+            'response_bytes_total': self.response_bytes,
+            'n_plus_one_total': self.n_plus_one,
+        }
+        summary['queries_per_request'] = self.queries / self.requests if self.requests else 0.0
+        return summary
+
+
+class MetricsRegistry:
+    """
+    Totals per endpoint since the process started, plus the latencies of
+    the last ``window`` requests of each for the p50/p95/p99 summary.
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, status, duration, metrics, response_bytes, n_plus_one):
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats(self.window or get_window())
+            stats.requests += 1
+            stats.errors += status >= 500
+            stats.duration += duration
+            stats.queries += metrics.queries
+            stats.query_time += metrics.query_time
+            stats.serializer_time += metrics.serializer_time
+            stats.response_bytes += response_bytes
+            stats.n_plus_one += n_plus_one
+            stats.recent.append(duration)
+
+    def snapshot(self):
+        """``{endpoint: summary}``, sorted by endpoint."""
+        with self.lock:
+            return {endpoint: self.endpoints[endpoint].summary() for endpoint in sorted(self.endpoints)}
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+registry = MetricsRegistry()
+
+
+# (metric, type, help, summary key) for the Prometheus exposition.
+PROMETHEUS_METRICS = [
+    ('requests_total', 'counter', 'Requests handled.', 'requests'),
+    ('request_errors_total', 'counter', 'Requests answered with a 5xx status.', 'errors'),
+    ('db_queries_total', 'counter', 'Database queries run.', 'queries_total'),
+    ('db_query_seconds_total', 'counter', 'Time spent in database queries.', 'query_seconds_total'),
+    ('serializer_seconds_total', 'counter', 'Time spent serializing responses.', 'serializer_seconds_total'),
+    ('response_bytes_total', 'counter', 'Response body bytes (streamed bodies not counted).',
+     'response_bytes_total'),
+    ('n_plus_one_total', 'counter', 'Requests that repeated one SELECT shape past the threshold.',
+     'n_plus_one_total'),
+]
+
+
+def prometheus_text(snapshot, prefix='propertycontrol'):
+    """Render a ``registry.snapshot()`` in the Prometheus text exposition format."""
+    def label(endpoint):
+        return endpoint.replace('\\', '\\\\').replace('"', '\\"')
+
+    lines = [
+        f'# HELP {prefix}_request_duration_seconds Request wall time (quantiles over the recent window).',
+        f'# TYPE {prefix}_request_duration_seconds summary',
+    ]
+    for endpoint, summary in snapshot.items():
+        for pct in QUANTILES:
+            lines.append(
+                f'{prefix}_request_duration_seconds{{endpoint="{label(endpoint)}",quantile="{pct / 100}"}} '
+                f'{summary[f"p{pct}_ms"] / 1000!r}'
+            )
+        lines.append(
+            f'{prefix}_request_duration_seconds_sum{{endpoint="{label(endpoint)}"}} '
+            f'{summary["duration_seconds_total"]!r}'
+        )
+        lines.append(f'{prefix}_request_duration_seconds_count{{endpoint="{label(endpoint)}"}} {summary["requests"]}')
+    for name, kind, help_text, key in PROMETHEUS_METRICS:
+        lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} {kind}']
+        lines += [
+            f'{prefix}_{name}{{endpoint="{label(endpoint)}"}} {summary[key]!r}'
+            for endpoint, summary in snapshot.items()
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else UNRESOLVED
+
+
+class MetricsMiddleware:
+    """
+    Record wall time, query count and time, serializer time and response
+    size per URL name, and log a warning when a request runs one SELECT
+    shape PROPERTYCONTROL_N_PLUS_ONE_THRESHOLD times or more, which
+    usually means a relation is loaded per row.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with collect() as metrics:
+            response = self.get_response(request)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with collect() as metrics:
+            response = await self.get_response(request)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, metrics, duration):
+        endpoint = endpoint_name(request)
+        repeated = metrics.repeated_selects(get_n_plus_one_threshold())
+        for count, sql in repeated:
+            logger.warning(
+                'Possible N+1 on %s %s (%s): %d x %s',
+                request.method, request.path, endpoint, count, sql[:300],
+            )
+        size = 0 if response.streaming else len(response.content)
+        registry.record(endpoint, response.status_code, duration, metrics, size, int(bool(repeated)))
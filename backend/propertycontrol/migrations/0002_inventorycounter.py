@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_counters(apps, schema_editor):
+    Property = apps.get_model('propertycontrol', 'Property')
+    InventoryCounter = apps.get_model('propertycontrol', 'InventoryCounter')
+    rows = Property.objects.order_by().values(
+        'current_department', 'category', 'status'
+    ).annotate(count=Count('id'), total_value=Sum('current_value'))
+    InventoryCounter.objects.bulk_create([
+        InventoryCounter(
+            current_department_id=row['current_department'],
+            category_id=row['category'],
+            status=row['status'],
+            count=row['count'],
+            total_value=row['total_value'],
+        )
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive'), ('under_maintenance', 'Under Maintenance'), ('disposed', 'Disposed')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('category', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='inventory_counters', to='propertycontrol.category')),
+                ('current_department', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='inventory_counters', to='propertycontrol.department')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('current_department', 'category', 'status'), name='unique_inventory_counter_bucket')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0002_inventorycounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['created_at', 'id'], name='property_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertytransfer',
+            index=models.Index(fields=['transfer_date', 'id'], name='transfer_date_id_idx'),
+        ),
+    ]
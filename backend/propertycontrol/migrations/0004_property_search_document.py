@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:51
+
+from django.db import migrations, models
+
+SEARCH_FIELDS = (
+    'name', 'code', 'description', 'serial_number',
+    'property_code', 'brand', 'model',
+)
+
+
+def backfill_search_document(apps, schema_editor):
+    Property = apps.get_model('propertycontrol', 'Property')
+    batch = []
+    for prop in Property.objects.only('id', *SEARCH_FIELDS).iterator(chunk_size=2000):
+        prop.search_document = ' '.join(
+            value for value in (getattr(prop, field) for field in SEARCH_FIELDS)
+            if value
+        ).lower()
+        batch.append(prop)
+        if len(batch) == 2000:
+            Property.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Property.objects.bulk_update(batch, ['search_document'])
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'CREATE FULLTEXT INDEX property_search_document_ft '
+            'ON propertycontrol_property (search_document)'
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'DROP INDEX property_search_document_ft ON propertycontrol_property'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
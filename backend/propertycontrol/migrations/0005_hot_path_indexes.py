@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0004_property_search_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['status'], name='property_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['current_department', 'status'], name='property_curdept_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['category', 'current_department'], name='property_cat_curdept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertytransfer',
+            index=models.Index(fields=['property', 'transfer_date'], name='transfer_property_date_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:05
+
+import propertycontrol.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_media_blobs(apps, schema_editor):
+    # Existing uploads keep their names; they are counted like any other blob.
+    Property = apps.get_model('propertycontrol', 'Property')
+    MediaBlob = apps.get_model('propertycontrol', 'MediaBlob')
+    counts = (
+        Property.objects.exclude(image='').exclude(image__isnull=True)
+        .values('image').annotate(refcount=Count('id'))
+    )
+    MediaBlob.objects.bulk_create(
+        [MediaBlob(name=row['image'], refcount=row['refcount']) for row in counts],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0006_property_image_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('refcount', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=propertycontrol.storage.get_image_storage, upload_to='properties/'),
+        ),
+        migrations.RunPython(backfill_media_blobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0008_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepreciationPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('straight_line', 'Straight Line'), ('declining_balance', 'Declining Balance')], default='straight_line', max_length=20)),
+                ('useful_life_years', models.PositiveSmallIntegerField()),
+                ('salvage_rate', models.DecimalField(decimal_places=4, default=0, max_digits=5)),
+                ('declining_rate', models.DecimalField(blank=True, decimal_places=4, max_digits=5, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='depreciation_policy', to='propertycontrol.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Depreciation policies',
+            },
+        ),
+        migrations.CreateModel(
+            name='ValuationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('properties_valued', models.PositiveIntegerField(default=0)),
+                ('properties_changed', models.PositiveIntegerField(default=0)),
+                ('value_before', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('value_after', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-started_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ValuationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('previous_value', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='valuations', to='propertycontrol.property')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='propertycontrol.valuationrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'property'), name='unique_valuation_snapshot')],
+            },
+        ),
+    ]
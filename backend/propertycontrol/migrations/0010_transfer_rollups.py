@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_transfer_value(apps, schema_editor):
+    # The value at transfer time was never stored; the current value is the
+    # best estimate for past transfers.
+    Property = apps.get_model('propertycontrol', 'Property')
+    PropertyTransfer = apps.get_model('propertycontrol', 'PropertyTransfer')
+    PropertyTransfer.objects.filter(value__isnull=True).update(value=Subquery(
+        Property.objects.filter(pk=OuterRef('property_id')).values('current_value')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0009_depreciation_and_valuation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransferRollupDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('rolled_up_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='propertytransfer',
+            name='value',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.CreateModel(
+            name='TransferRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('week', models.DateField()),
+                ('month', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('category', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='propertycontrol.category')),
+                ('from_department', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='propertycontrol.department')),
+                ('to_department', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='propertycontrol.department')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='transfer_rollup_day_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_transfer_value, migrations.RunPython.noop),
+    ]
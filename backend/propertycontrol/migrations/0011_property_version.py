@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0010_transfer_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:31
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    # Buckets with a NULL key could be created twice under the old constraint.
+    InventoryCounter = apps.get_model('propertycontrol', 'InventoryCounter')
+    seen = {}
+    for counter in InventoryCounter.objects.order_by('id'):
+        key = (counter.current_department_id, counter.category_id, counter.status)
+        first = seen.setdefault(key, counter)
+        if first is not counter:
+            first.count += counter.count
+            first.total_value += counter.total_value
+            first.save(update_fields=['count', 'total_value'])
+            counter.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0012_code_sequences'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='inventorycounter',
+            name='unique_inventory_counter_bucket',
+        ),
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='inventorycounter',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('current_department', 0, output_field=models.BigIntegerField()), django.db.models.functions.comparison.Coalesce('category', 0, output_field=models.BigIntegerField()), models.F('status'), name='unique_inventory_counter_bucket_nulls'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_transfer_category(apps, schema_editor):
+    # As with value: the current category is the best estimate for past
+    # transfers, and it is what the existing rollups were built from.
+    Property = apps.get_model('propertycontrol', 'Property')
+    PropertyTransfer = apps.get_model('propertycontrol', 'PropertyTransfer')
+    PropertyTransfer.objects.update(category=Subquery(
+        Property.objects.filter(pk=OuterRef('property_id')).values('category')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertycontrol', '0013_inventory_counter_null_buckets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertytransfer',
+            name='category',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transfers', to='propertycontrol.category'),
+        ),
+        migrations.RunPython(backfill_transfer_category, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,13 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-import uuid
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Length
+import os
+import re
+
+from . import codes, images
+from .storage import get_image_storage
 
 class User(AbstractUser):
     ROLE_CHOICES = [
@@ -23,6 +30,11 @@ class User(AbstractUser):
         return f"{self.username} - {self.get_role_display()}"
 
 
+class DepartmentQuerySet(models.QuerySet):
+    def for_api(self):
+        return self.select_related('manager')
+
+
 class Department(models.Model):
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=10, unique=True)
@@ -37,6 +49,8 @@ class Department(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DepartmentQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -55,6 +69,83 @@ class Category(models.Model):
         return self.name
 
 
+class DepreciationPolicy(models.Model):
+    """How the revaluation engine depreciates the properties of a category."""
+    METHOD_CHOICES = [
+        ('straight_line', 'Straight Line'),
+        ('declining_balance', 'Declining Balance'),
+    ]
+
+    category = models.OneToOneField(
+        Category, on_delete=models.CASCADE, related_name='depreciation_policy'
+    )
+    method = models.CharField(max_length=20, choices=METHOD_CHOICES, default='straight_line')
+    useful_life_years = models.PositiveSmallIntegerField()
+    # Residual value as a fraction of the purchase price; values never drop below it.
+    salvage_rate = models.DecimalField(max_digits=5, decimal_places=4, default=0)
+    # Yearly rate for declining balance; blank means double declining (2 / useful life).
+    declining_rate = models.DecimalField(max_digits=5, decimal_places=4, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Depreciation policies"
+
+    @property
+    def yearly_rate(self):
+        if self.declining_rate is not None:
+            return float(self.declining_rate)
+        return 2.0 / self.useful_life_years
+
+    def __str__(self):
+        return f"{self.category}: {self.get_method_display()} over {self.useful_life_years}y"
+
+
+class VersionConflict(Exception):
+    """A property changed since the version the caller read."""
+
+    def __init__(self, expected, current=None):
+        super().__init__(
+            f'Property was modified concurrently (expected version {expected}'
+            + (f', found {current}).' if current is not None else ').')
+        )
+        self.expected = expected
+        self.current = current
+
+
+class PropertyQuerySet(models.QuerySet):
+    def for_api(self):
+        """Join every relation read by ``PropertySerializer``."""
+        return self.select_related(
+            'category', 'department', 'current_department', 'created_by'
+        )
+
+    def as_of(self, moment):
+        """
+        Properties that existed before ``moment``, annotated with
+        ``department_as_of``: the destination of their last transfer before
+        it, else the source of their first transfer after it, else their
+        current department. Both lookups are single-row probes of the
+        (property, transfer_date) index, so the cost does not grow with the
+        length of the transfer history.
+        """
+        transfers = PropertyTransfer.objects.filter(property=OuterRef('pk'))
+        return self.filter(created_at__lt=moment).annotate(
+            department_as_of=Coalesce(
+                Subquery(
+                    transfers.filter(transfer_date__lt=moment)
+                    .order_by('-transfer_date', '-id').values('to_department')[:1]
+                ),
+                Subquery(
+                    transfers.filter(transfer_date__gte=moment)
+                    .order_by('transfer_date', 'id').values('from_department')[:1]
+                ),
+                F('current_department'),
+                output_field=models.BigIntegerField(),
+            )
+        )
+
+
 class Property(models.Model):
     STATUS_CHOICES = [
         ('active', 'Active'),
@@ -97,7 +188,17 @@ class Property(models.Model):
     property_code = models.CharField(max_length=100, blank=True)
     brand = models.CharField(max_length=100, blank=True)
     model = models.CharField(max_length=100, blank=True)
-    image = models.ImageField(upload_to='properties/', blank=True, null=True)
+    image = models.ImageField(
+        upload_to='properties/', storage=get_image_storage, blank=True, null=True
+    )
+    # SHA-256 of the image; names its thumbnail/medium renditions.
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
+    # Lower-cased text of SEARCH_FIELDS, FULLTEXT-indexed on MySQL.
+    search_document = models.TextField(blank=True, editable=False)
+    # The random code a property had before renumber_property_codes.
+    legacy_code = models.CharField(max_length=50, blank=True, db_index=True, editable=False)
+    # Bumped by every write; a save from a stale copy raises VersionConflict.
+    version = models.PositiveIntegerField(default=1, editable=False)
 
     created_by = models.ForeignKey(
         User,
@@ -108,20 +209,153 @@ class Property(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PropertyQuerySet.as_manager()
+
+    SEARCH_FIELDS = (
+        'name', 'code', 'description', 'serial_number',
+        'property_code', 'brand', 'model', 'legacy_code',
+    )
+
     class Meta:
         verbose_name_plural = "Properties"
+        indexes = [
+            # Keyset pagination order (see PropertyCursorPagination).
+            models.Index(fields=['created_at', 'id'], name='property_created_id_idx'),
+            models.Index(fields=['status'], name='property_status_idx'),
+            models.Index(
+                fields=['current_department', 'status'], name='property_curdept_status_idx'
+            ),
+            models.Index(
+                fields=['category', 'current_department'], name='property_cat_curdept_idx'
+            ),
+        ]
 
-    def save(self, *args, **kwargs):
+    def prepare_for_insert(self):
+        """Fill the derived columns ``save()`` would set; used by bulk_create paths."""
         if not self.code:
-            self.code = str(uuid.uuid4())[:8].upper()
-        if not self.current_department and self.department:
-            self.current_department = self.department
-        super().save(*args, **kwargs)
+            codes.assign_codes([self])
+        if not self.current_department_id and self.department_id:
+            self.current_department_id = self.department_id
+        self.search_document = self.build_search_document()
+
+    def save(self, *args, **kwargs):
+        self.prepare_for_insert()
+        new_image = bool(self.image) and not self.image._committed
+        upload = None
+        if new_image:
+            upload = self.image.file
+            # Hashing streams the uploaded temp file; nothing is buffered.
+            self.image_hash = images.content_hash(self.image)
+        elif not self.image:
+            self.image_hash = ''
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            derived = {'version'}
+            if set(update_fields) & set(self.SEARCH_FIELDS):
+                derived.add('search_document')
+            if 'image' in update_fields:
+                derived.add('image_hash')
+            kwargs['update_fields'] = {*update_fields, *derived}
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Property.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values(*InventoryCounter.TRACKED_FIELDS, 'image', 'version').first()
+            if previous is not None:
+                if previous['version'] != self.version:
+                    raise VersionConflict(self.version, previous['version'])
+                self.version += 1
+            try:
+                super().save(*args, **kwargs)
+            except Exception:
+                if previous is not None:
+                    self.version = previous['version']
+                raise
+            InventoryCounter.objects.record_save(
+                previous, self, kwargs.get('update_fields')
+            )
+
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or 'image' in update_fields:
+                old_image = previous['image'] if previous else ''
+                if (self.image.name or '') != (old_image or ''):
+                    MediaBlob.objects.retain(self.image.name)
+                    if upload is not None:
+                        # The storage skips writing content it already has; a
+                        # collect() between that check and retain() deleted it.
+                        self.image.storage.restore(self.image.name, upload)
+                    MediaBlob.objects.release(old_image)
+            if new_image:
+                image_name, image_hash = self.image.name, self.image_hash
+                storage = self.image.storage
+                transaction.on_commit(
+                    lambda: images.schedule_renditions(image_name, image_hash, storage)
+                )
+
+    def rendition_url(self, rendition):
+        if not self.image:
+            return None
+        return images.rendition_url(self.pk, self.image_hash, rendition)
+
+    def build_search_document(self):
+        return ' '.join(
+            value for value in (getattr(self, field) for field in self.SEARCH_FIELDS)
+            if value
+        ).lower()
 
     def __str__(self):
         return f"{self.name} ({self.code})"
 
 
+class CodeSequenceManager(models.Manager):
+    def reserve(self, prefix, count):
+        """
+        Reserve ``count`` consecutive numbers of ``prefix`` and return the
+        first. The increment is a single UPDATE, so concurrent reservations
+        serialize on the row lock it takes and never overlap.
+        """
+        with transaction.atomic():
+            if not self.filter(prefix=prefix).update(next_value=F('next_value') + count):
+                first = self.highest_number(prefix) + 1
+                try:
+                    with transaction.atomic():
+                        self.create(prefix=prefix, next_value=first + count)
+                    return first
+                except IntegrityError:
+                    # Created concurrently; take a block from that row instead.
+                    self.filter(prefix=prefix).update(next_value=F('next_value') + count)
+            return self.filter(prefix=prefix).values_list('next_value', flat=True).get() - count
+
+    def highest_number(self, prefix):
+        """Largest number already used in a ``<prefix>-<digits>`` code, else 0."""
+        used = Property.objects.filter(
+            code__startswith=f'{prefix}-', code__regex=rf'^{re.escape(prefix)}-[0-9]+$'
+        ).order_by(Length('code').desc(), '-code').values_list('code', flat=True).first()
+        return int(used.rsplit('-', 1)[1]) if used else 0
+
+
+class CodeSequence(models.Model):
+    """Next free number of the ``<prefix>-000123`` property codes of one prefix."""
+    prefix = models.CharField(max_length=20, unique=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CodeSequenceManager()
+
+    def __str__(self):
+        return f"{self.prefix}: {self.next_value}"
+
+
+class PropertyTransferQuerySet(models.QuerySet):
+    def for_api(self):
+        """Join every relation read by ``PropertyTransferSerializer``."""
+        return self.select_related(
+            'property', 'from_department', 'to_department', 'transferred_by'
+        )
+
+
 class PropertyTransfer(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE)
     from_department = models.ForeignKey(
@@ -141,7 +375,403 @@ class PropertyTransfer(models.Model):
         on_delete=models.CASCADE,
         related_name='initiated_transfers'
     )
+    # The property's current_value and category when it moved; default on
+    # save. Analytics group by these, so later edits leave history alone.
+    value = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+        related_name='transfers'
+    )
+
+    objects = PropertyTransferQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order (see PropertyTransferCursorPagination);
+            # also serves the plain transfer_date ordering of recent transfers.
+            models.Index(fields=['transfer_date', 'id'], name='transfer_date_id_idx'),
+            models.Index(fields=['property', 'transfer_date'], name='transfer_property_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.value is None and self.property_id:
+            self.value = self.property.current_value
+        if self._state.adding and self.category_id is None and self.property_id:
+            self.category_id = self.property.category_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.property.name} from {self.from_department.name} to {self.to_department.name}"
-    
\ No newline at end of file
+    
+
+class InventoryCounterManager(models.Manager):
+    def apply_deltas(self, deltas):
+        """Add ``{(department_id, category_id, status): (count, value)}``."""
+        for (department_id, category_id, status), (count, value) in deltas.items():
+            if not count and not value:
+                continue
+            bucket = {
+                'current_department_id': department_id,
+                'category_id': category_id,
+                'status': status,
+            }
+            if self._bump(bucket, count, value):
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(**bucket, count=count, total_value=value)
+            except IntegrityError:
+                # A concurrent transaction created the bucket first.
+                self._bump(bucket, count, value)
+
+    def _bump(self, bucket, count, value):
+        return self.filter(**bucket).update(count=F('count') + count, total_value=F('total_value') + value)
+
+    def record_save(self, previous, prop, update_fields=None):
+        current = self._row(prop)
+        if previous is not None and update_fields is not None:
+            saved = {Property._meta.get_field(name).attname for name in update_fields}
+            current = {
+                field: current[field] if field in saved else previous[field]
+                for field in self.model.TRACKED_FIELDS
+            }
+
+        deltas = {}
+        if previous is not None:
+            self._add(deltas, previous, -1)
+        self._add(deltas, current, 1)
+        self.apply_deltas(deltas)
+
+    def record_delete(self, prop):
+        deltas = {}
+        self._add(deltas, self._row(prop), -1)
+        self.apply_deltas(deltas)
+
+    def record_bulk_insert(self, props):
+        deltas = {}
+        for prop in props:
+            self._add(deltas, self._row(prop), 1)
+        self.apply_deltas(deltas)
+
+    def record_move(self, rows, to_department_id):
+        """Move ``TRACKED_FIELDS`` dicts to another department's buckets."""
+        deltas = {}
+        for row in rows:
+            self._add(deltas, row, -1)
+            self._add(deltas, {**row, 'current_department_id': to_department_id}, 1)
+        self.apply_deltas(deltas)
+
+    def _row(self, prop):
+        return {field: getattr(prop, field) for field in self.model.TRACKED_FIELDS}
+
+    def _add(self, deltas, row, sign):
+        key = (row['current_department_id'], row['category_id'], row['status'])
+        count, value = deltas.get(key, (0, 0))
+        deltas[key] = (count + sign, value + sign * row['current_value'])
+
+    def buckets_of(self, field, pk):
+        """
+        Return the keys of the buckets holding ``field`` = ``pk`` together with
+        the keys their rows fall into once ``field`` is nulled.
+        """
+        keys = set(self.filter(**{field: pk}).values_list('current_department', 'category', 'status'))
+        position = 0 if field == 'current_department' else 1
+        return keys | {
+            key[:position] + (None,) + key[position + 1:] for key in keys
+        }
+
+    def recompute(self, keys):
+        """Recount just the ``(department_id, category_id, status)`` buckets in ``keys``."""
+        match = Q()
+        for department_id, category_id, status in keys:
+            match |= Q(current_department=department_id, category=category_id, status=status)
+        if not match:
+            return
+        rows = Property.objects.filter(match).order_by().values(
+            'current_department', 'category', 'status'
+        ).annotate(count=Count('id'), total_value=Sum('current_value'))
+        with transaction.atomic():
+            self.filter(match).delete()
+            self.bulk_create([
+                self.model(
+                    current_department_id=row['current_department'],
+                    category_id=row['category'],
+                    status=row['status'],
+                    count=row['count'],
+                    total_value=row['total_value'],
+                )
+                for row in rows
+            ])
+
+    def expected(self):
+        rows = Property.objects.order_by().values(
+            'current_department', 'category', 'status'
+        ).annotate(count=Count('id'), total_value=Sum('current_value'))
+        return {
+            (row['current_department'], row['category'], row['status']):
+                (row['count'], row['total_value'])
+            for row in rows
+        }
+
+    def drift(self):
+        """Return ``{key: (expected, stored)}`` for every mismatching bucket."""
+        expected = self.expected()
+        stored = {
+            (row['current_department'], row['category'], row['status']):
+                (row['count'], row['total_value'])
+            for row in self.values(
+                'current_department', 'category', 'status', 'count', 'total_value'
+            )
+            if row['count'] or row['total_value']
+        }
+        return {
+            key: (expected.get(key, (0, 0)), stored.get(key, (0, 0)))
+            for key in expected.keys() | stored.keys()
+            if expected.get(key) != stored.get(key)
+        }
+
+    def rebuild(self):
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create([
+                self.model(
+                    current_department_id=department_id,
+                    category_id=category_id,
+                    status=status,
+                    count=count,
+                    total_value=total_value,
+                )
+                for (department_id, category_id, status), (count, total_value)
+                in self.expected().items()
+            ])
+
+
+class InventoryCounter(models.Model):
+    """Denormalized property totals per (current_department, category, status)."""
+
+    TRACKED_FIELDS = ('current_department_id', 'category_id', 'status', 'current_value')
+
+    current_department = models.ForeignKey(
+        Department,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='inventory_counters'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='inventory_counters'
+    )
+    status = models.CharField(max_length=20, choices=Property.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    objects = InventoryCounterManager()
+
+    class Meta:
+        constraints = [
+            # Coalesce so that buckets without a department or category
+            # are unique too (NULLs never collide in a plain unique index).
+            models.UniqueConstraint(
+                Coalesce('current_department', 0, output_field=models.BigIntegerField()),
+                Coalesce('category', 0, output_field=models.BigIntegerField()),
+                'status',
+                name='unique_inventory_counter_bucket_nulls',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.current_department_id}/{self.category_id}/{self.status}: {self.count}"
+
+
+class MediaBlobManager(models.Manager):
+    def retain(self, name):
+        """
+        Add one reference. The UPDATE keeps the row locked until the
+        transaction ends, so collect() can no longer delete the file; it may
+        have done so already, which the caller checks afterwards.
+        """
+        if not name:
+            return
+        if self.filter(name=name).update(refcount=F('refcount') + 1):
+            return
+        try:
+            with transaction.atomic():
+                self.create(name=name, refcount=1)
+        except IntegrityError:
+            # A concurrent retain() created the row first.
+            self.filter(name=name).update(refcount=F('refcount') + 1)
+
+    def release(self, name):
+        """Drop one reference; delete the file once the transaction commits if none remain."""
+        if not name:
+            return
+        self.filter(name=name).update(refcount=F('refcount') - 1)
+        transaction.on_commit(lambda: self.collect([name]))
+
+    def collect(self, names=None):
+        """Delete unreferenced blobs (and their renditions); return how many went."""
+        orphans = self.filter(refcount__lte=0)
+        if names is not None:
+            orphans = orphans.filter(name__in=names)
+        storage = get_image_storage()
+        removed = 0
+        for blob in orphans:
+            with transaction.atomic():
+                # Re-check under lock: an upload may have re-used the file.
+                locked = self.select_for_update().filter(pk=blob.pk, refcount__lte=0).first()
+                if locked is None:
+                    continue
+                locked.delete()
+                storage.delete(blob.name)
+                image_hash = os.path.splitext(os.path.basename(blob.name))[0]
+                for rendition in images.RENDITIONS:
+                    images.default_storage.delete(images.rendition_name(image_hash, rendition))
+            removed += 1
+        return removed
+
+
+class MediaBlob(models.Model):
+    """Reference count of a content-addressed media file."""
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = MediaBlobManager()
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class Job(models.Model):
+    """A unit of background work, picked up by ``manage.py run_jobs``."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    payload = models.JSONField(default=dict)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    progress_message = models.CharField(max_length=255, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Bumped on claim and on every progress report or checkpoint; a running
+    # job that stops heartbeating is taken to have lost its worker.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['created_by', 'idempotency_key'], name='unique_job_idempotency_key'
+            ),
+        ]
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ValuationRun(models.Model):
+    """One pass of the revaluation engine; ``ValuationSnapshot`` keeps what it changed."""
+    as_of = models.DateField()
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    properties_valued = models.PositiveIntegerField(default=0)
+    properties_changed = models.PositiveIntegerField(default=0)
+    value_before = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    value_after = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['-started_at', '-id']
+
+    def __str__(self):
+        return f"Valuation as of {self.as_of} (#{self.pk})"
+
+
+class ValuationSnapshot(models.Model):
+    run = models.ForeignKey(ValuationRun, on_delete=models.CASCADE, related_name='snapshots')
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='valuations')
+    previous_value = models.DecimalField(max_digits=12, decimal_places=2)
+    value = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'property'], name='unique_valuation_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.property_id}: {self.previous_value} -> {self.value}"
+
+
+class TransferRollupManager(models.Manager):
+    def invalidate(self, **filters):
+        """Forget the rolled-up days that have rows matching ``filters``; the next rollup redoes them."""
+        days = list(self.filter(**filters).values_list('day', flat=True).distinct())
+        self.filter(day__in=days).delete()
+        TransferRollupDay.objects.filter(day__in=days).delete()
+
+
+class TransferRollup(models.Model):
+    """Transfers of one closed day per (from, to, category); see analytics.py."""
+    day = models.DateField()
+    # First day of the day's week (Monday) and month, so bucketing is a
+    # plain GROUP BY instead of a date function per row.
+    week = models.DateField()
+    month = models.DateField()
+    from_department = models.ForeignKey(
+        Department, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    to_department = models.ForeignKey(
+        Department, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.DO_NOTHING, db_constraint=False,
+        null=True, blank=True, related_name='+'
+    )
+    count = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    objects = TransferRollupManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['day'], name='transfer_rollup_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.from_department_id}->{self.to_department_id}/{self.category_id}: {self.count}"
+
+
+class TransferRollupDay(models.Model):
+    """Marks a closed day whose transfers are fully summarized in TransferRollup."""
+    day = models.DateField(unique=True)
+    rolled_up_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.day)
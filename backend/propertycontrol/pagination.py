@@ -0,0 +1,138 @@
+# backend/propertycontrol/pagination.py
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination on the whole ordering key, not just its first field.
+
+    DRF's cursor holds only the first ordering field and steps over rows
+    sharing it with an OFFSET, which turns deep pages into offset scans when
+    many rows tie (seeded data has thousands of properties per created_at)
+    and loops once a tie outgrows ``offset_cutoff``. Here the cursor holds
+    every ordering field and a page starts with ``(a, b) < (x, y)`` spelled
+    out as ``a <= x AND (a < x OR (a = x AND b < y))``, the form MySQL's
+    range optimizer serves from the composite index. The ordering must end
+    in a unique field so that positions never tie and the offset stays 0.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self.after(current_position, reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def after(self, position, reverse):
+        """Rows strictly past ``position`` in the (possibly reversed) ordering."""
+        values = json.loads(position)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValueError('Cursor position does not match the ordering')
+
+        condition, equal = Q(), {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        # The redundant bound on the first field lets every backend turn the
+        # OR into an index range instead of filtering a full index scan.
+        first = self.ordering[0]
+        lookup = 'lte' if first.startswith('-') != reverse else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{lookup}': values[0]}) & condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        get = super()._get_position_from_instance
+        return json.dumps([get(instance, [field]) for field in ordering])
+
+
+class PropertyCursorPagination(KeysetCursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PropertyTransferCursorPagination(KeysetCursorPagination):
+    ordering = ('-transfer_date', '-id')
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class OptionalCursorPaginationMixin:
+    """
+    Keep the default page-number pagination, but switch to keyset pagination
+    when the client asks for it with ``?pagination=cursor`` (or follows a
+    ``cursor`` link). Cursor pages skip the COUNT(*) and the deep OFFSET.
+    """
+    cursor_pagination_class = None
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or 'cursor' in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.cursor_pagination_class and self.use_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
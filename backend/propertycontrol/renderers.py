@@ -0,0 +1,50 @@
+# backend/propertycontrol/renderers.py
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .metrics import prometheus_text
+
+try:
+    import orjson
+except ImportError:  # optional: without it FastJSONRenderer is plain JSONRenderer
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that encodes with orjson when it is installed, giving
+    the same bytes for the compact, non-ASCII-escaping output DRF produces
+    by default. Anything else (an ``indent`` request, ``UNICODE_JSON`` or
+    ``COMPACT_JSON`` turned off, a type orjson rejects) goes through the
+    stock encoder. orjson writes floats differently (``1e+16`` vs
+    ``1e16``), so this is only meant for views whose output holds none;
+    decimals are strings.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same as JSONRenderer: these are valid JSON but not valid JavaScript.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Render a ``metrics.registry.snapshot()`` in the Prometheus text format."""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.status_code >= 400:
+            # Errors (401/403) carry a {'detail': ...} body, not a snapshot.
+            return '\n'.join(f'# {key}: {value}' for key, value in data.items()).encode() + b'\n'
+        return prometheus_text(data).encode()
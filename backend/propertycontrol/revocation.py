@@ -0,0 +1,121 @@
+# backend/propertycontrol/revocation.py
+import heapq
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE = {
+    'BACKEND': 'propertycontrol.revocation.InMemoryRevocationStore',
+    'OPTIONS': {},
+}
+
+
+class RevocationStoreFull(Exception):
+    """No room to remember another revocation without forgetting a live one."""
+
+
+class RevocationStore:
+    """Revoked token JTIs, each remembered only until the token would expire."""
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke ``jti`` and return True, or return False if it was already
+        revoked. The check and the write are atomic, so of two concurrent
+        calls for one JTI exactly one succeeds. Raises RevocationStoreFull
+        when the revocation cannot be recorded.
+        """
+        raise NotImplementedError
+
+    def is_revoked(self, jti):
+        raise NotImplementedError
+
+
+class InMemoryRevocationStore(RevocationStore):
+    """
+    Per-process store. Expired JTIs are evicted as new ones arrive. Live
+    ones never are, since that would make their tokens usable again: once
+    ``max_entries`` unexpired JTIs are held, ``revoke`` raises
+    RevocationStoreFull. Use RedisRevocationStore if that can happen.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._expiry = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            now = time.time()
+            self._purge(now)
+            if self._expiry.get(jti, 0) > now:
+                return False
+            if len(self._expiry) >= self.max_entries:
+                logger.error(
+                    'Revocation store is full (%d live entries); switch to RedisRevocationStore '
+                    'or raise max_entries', len(self._expiry),
+                )
+                raise RevocationStoreFull(f'{len(self._expiry)} unexpired revocations')
+            self._expiry[jti] = expires_at
+            heapq.heappush(self._heap, (expires_at, jti))
+            return True
+
+    def is_revoked(self, jti):
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def _purge(self, now):
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            self._pop()
+            removed += 1
+        return removed
+
+    def _pop(self):
+        expires_at, jti = heapq.heappop(self._heap)
+        if self._expiry.get(jti) == expires_at:
+            del self._expiry[jti]
+
+
+class RedisRevocationStore(RevocationStore):
+    """
+    Shared store for any client speaking the redis-py ``set``/``exists``
+    interface (a local Redis, or a stand-in such as fakeredis). Revocation
+    is a ``SET NX``, and keys carry the token's remaining lifetime as their
+    TTL, so Redis evicts them itself.
+    """
+
+    def __init__(self, client=None, url='redis://localhost:6379/0', prefix='revoked-jti:'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def revoke(self, jti, expires_at):
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return False  # already expired, so unusable anyway
+        return bool(self.client.set(self.prefix + jti, 1, ex=ttl, nx=True))
+
+    def is_revoked(self, jti):
+        return bool(self.client.exists(self.prefix + jti))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_revocation_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = getattr(settings, 'PROPERTYCONTROL_REVOCATION_STORE', DEFAULT_STORE)
+                _store = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _store
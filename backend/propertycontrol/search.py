@@ -0,0 +1,52 @@
+# backend/propertycontrol/search.py
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+
+# MySQL ignores tokens shorter than innodb_ft_min_token_size (3 by default),
+# and boolean-mode operators must not leak in from user input.
+MIN_FULLTEXT_TOKEN = 3
+BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+def tokenize(term):
+    return BOOLEAN_OPERATORS.sub(' ', term).lower().split()
+
+
+def search_properties(queryset, term):
+    """
+    Filter ``queryset`` to properties matching ``term`` and annotate a
+    ``search_rank`` to order them by.
+
+    On MySQL this is a boolean-mode MATCH against the FULLTEXT index on
+    ``Property.search_document``; other databases (SQLite in the tests)
+    fall back to substring matches on the same column.
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return queryset
+
+    if connection.vendor == 'mysql' and all(len(t) >= MIN_FULLTEXT_TOKEN for t in tokens):
+        query = ' '.join(f'+{token}*' for token in tokens)
+        return queryset.annotate(
+            search_rank=RawSQL(
+                'MATCH (propertycontrol_property.search_document) '
+                'AGAINST (%s IN BOOLEAN MODE)',
+                (query,),
+            )
+        ).filter(search_rank__gt=0).order_by('-search_rank', '-id')
+
+    for token in tokens:
+        queryset = queryset.filter(search_document__contains=token)
+    phrase = ' '.join(tokens)
+    return queryset.annotate(
+        search_rank=Case(
+            When(code__iexact=phrase, then=Value(4)),
+            When(name__icontains=phrase, then=Value(3)),
+            When(code__icontains=phrase, then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    ).order_by('-search_rank', '-id')
@@ -1,10 +1,17 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.urls import reverse
+
+from . import images
+from .fieldsets import SparseFieldsMixin
+from .metrics import SerializerTimingMixin
 from .models import (
-    User, Department, Category, Property, PropertyTransfer
+    User, Department, Category, Property, PropertyTransfer, Job,
+    DepreciationPolicy, ValuationRun
 )
+from .transfers import transfer_property
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SerializerTimingMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -30,7 +37,7 @@ class LoginSerializer(serializers.Serializer):
         return data
 
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(SerializerTimingMixin, SparseFieldsMixin, serializers.ModelSerializer):
     manager_name = serializers.CharField(
         source='manager.get_full_name', read_only=True
     )
@@ -41,15 +48,16 @@ class DepartmentSerializer(serializers.ModelSerializer):
             'id', 'name', 'code', 'manager',
             'manager_name', 'description', 'created_at'
         ]
+        field_sources = {'manager_name': ('manager__first_name', 'manager__last_name')}
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SerializerTimingMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'code', 'description']
 
 
-class PropertySerializer(serializers.ModelSerializer):
+class PropertySerializer(SerializerTimingMixin, SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(
         source='category.name', read_only=True
     )
@@ -62,6 +70,9 @@ class PropertySerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(
         source='created_by.get_full_name', read_only=True
     )
+    image_renditions = serializers.SerializerMethodField()
+    # Echo the version you read on PUT/PATCH; a stale one is answered with 409.
+    version = serializers.IntegerField(required=False, min_value=1)
 
     class Meta:
         model = Property
@@ -70,19 +81,100 @@ class PropertySerializer(serializers.ModelSerializer):
             'category', 'department', 'current_department',
             'status', 'purchase_date', 'purchase_price',
             'current_value', 'serial_number','property_code', 'brand', 'model',
-            'image', 'category_name', 'department_name',
+            'image', 'image_renditions', 'category_name', 'department_name',
             'current_department_name', 'created_by',
-            'created_by_name', 'created_at', 'updated_at',
+            'created_by_name', 'created_at', 'updated_at', 'version',
         ]
         read_only_fields = ['code', 'created_by', 'created_at', 'updated_at']
+        field_sources = {
+            'image_renditions': ('image', 'image_hash'),
+            'created_by_name': ('created_by__first_name', 'created_by__last_name'),
+        }
 
     def create(self, validated_data):
         # auto-set the creator
         validated_data['created_by'] = self.context['request'].user
+        validated_data.pop('version', None)
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        # Only the submitted columns are written, so an edit cannot undo a
+        # concurrent transfer; Property.save checks the version under a lock.
+        instance.version = validated_data.pop('version', instance.version)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+    def get_image_renditions(self, obj):
+        if not obj.image:
+            return None
+        request = self.context.get('request')
+        urls = {}
+        for rendition in images.RENDITIONS:
+            url = obj.rendition_url(rendition)
+            urls[rendition] = request.build_absolute_uri(url) if request is not None else url
+        return urls
+
+
+class PropertyAsOfSerializer(PropertySerializer):
+    """``PropertySerializer`` plus where the property was at the ``as_of`` moment."""
+    department_as_of = serializers.IntegerField(read_only=True)
+    department_as_of_name = serializers.SerializerMethodField()
+
+    class Meta(PropertySerializer.Meta):
+        fields = PropertySerializer.Meta.fields + ['department_as_of', 'department_as_of_name']
+        # Both come from the as_of() annotation, not from a column.
+        field_sources = {
+            **PropertySerializer.Meta.field_sources,
+            'department_as_of': (),
+            'department_as_of_name': (),
+        }
+
+    def get_department_as_of_name(self, obj):
+        return self.context.get('department_names', {}).get(obj.department_as_of)
+
+
+class CodeLookupField(serializers.Field):
+    """
+    Resolve a department/category ``code`` through a ``{code: instance}``
+    table passed in the serializer context, so validating a batch of rows
+    costs one lookup query per batch rather than one per row.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Unknown code "{code}".',
+    }
+
+    def __init__(self, lookup, **kwargs):
+        self.lookup = lookup
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        code = str(data).strip()
+        try:
+            return self.context[self.lookup][code]
+        except KeyError:
+            self.fail('does_not_exist', code=code)
+
+    def to_representation(self, value):
+        return value.code
+
+
+class PropertyImportSerializer(PropertySerializer):
+    """Validates one imported row with the PropertySerializer field rules."""
+    category = CodeLookupField('categories', required=False, allow_null=True)
+    department = CodeLookupField('departments')
+    current_department = CodeLookupField('departments', required=False, allow_null=True)
 
-class PropertyTransferSerializer(serializers.ModelSerializer):
+    class Meta(PropertySerializer.Meta):
+        fields = [
+            'name', 'description', 'category', 'department', 'current_department',
+            'status', 'purchase_date', 'purchase_price', 'current_value',
+            'serial_number', 'property_code', 'brand', 'model',
+        ]
+
+
+class PropertyTransferSerializer(SerializerTimingMixin, SparseFieldsMixin, serializers.ModelSerializer):
     property_name = serializers.CharField(
         source='property.name', read_only=True
     )
@@ -115,18 +207,106 @@ class PropertyTransferSerializer(serializers.ModelSerializer):
             'transferred_by',
             'transferred_by_name'
         ]
+        field_sources = {
+            'transferred_by_name': ('transferred_by__first_name', 'transferred_by__last_name'),
+        }
+
+class PropertyTransferCreateSerializer(SerializerTimingMixin, serializers.ModelSerializer):
+    version = serializers.IntegerField(required=False, min_value=1, write_only=True)
 
-class PropertyTransferCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = PropertyTransfer
-        fields = ['property', 'to_department', 'notes']
+        fields = ['property', 'to_department', 'notes', 'version']
 
     def create(self, validated_data):
-        prop = validated_data['property']
-        validated_data['from_department'] = prop.current_department
-        validated_data['transferred_by'] = self.context['request'].user
-        transfer = super().create(validated_data)
-        # update the property's department
-        prop.current_department = validated_data['to_department']
-        prop.save()
-        return transfer
\ No newline at end of file
+        return transfer_property(
+            validated_data['property'].pk,
+            validated_data['to_department'],
+            self.context['request'].user,
+            notes=validated_data.get('notes', ''),
+            expected_version=validated_data.get('version'),
+        )
+
+
+class BulkTransferSerializer(serializers.Serializer):
+    properties = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    filter = serializers.DictField(
+        child=serializers.CharField(), required=False, allow_empty=False
+    )
+    from_department = serializers.PrimaryKeyRelatedField(
+        queryset=Department.objects.all(), required=False
+    )
+    to_department = serializers.PrimaryKeyRelatedField(queryset=Department.objects.all())
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate_filter(self, value):
+        unknown = set(value) - {'search', 'department', 'category'}
+        if unknown:
+            raise serializers.ValidationError(f"Unsupported filter keys: {', '.join(sorted(unknown))}")
+        return value
+
+    def validate(self, data):
+        if ('properties' in data) == ('filter' in data):
+            raise serializers.ValidationError("Pass either 'properties' or 'filter'.")
+        return data
+
+
+class JobSerializer(SerializerTimingMixin, serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'url', 'kind', 'status', 'progress', 'progress_message',
+            'result', 'error', 'attempts', 'max_attempts', 'run_after',
+            'created_at', 'started_at', 'finished_at', 'download_url'
+        ]
+        read_only_fields = fields
+
+    def absolute(self, path):
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+
+    def get_url(self, obj):
+        return self.absolute(reverse('job-detail', args=[obj.pk]))
+
+    def get_download_url(self, obj):
+        if obj.status != 'succeeded' or not (obj.result or {}).get('file'):
+            return None
+        return self.absolute(reverse('job-download', args=[obj.pk]))
+
+
+class DepreciationPolicySerializer(SerializerTimingMixin, serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = DepreciationPolicy
+        fields = [
+            'id', 'category', 'category_name', 'method', 'useful_life_years',
+            'salvage_rate', 'declining_rate', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['created_at', 'updated_at']
+
+    def validate_useful_life_years(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Useful life must be at least one year.")
+        return value
+
+    def validate(self, data):
+        for field in ('salvage_rate', 'declining_rate'):
+            value = data.get(field)
+            if value is not None and not 0 <= value <= 1:
+                raise serializers.ValidationError({field: "Must be between 0 and 1."})
+        return data
+
+
+class ValuationRunSerializer(SerializerTimingMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ValuationRun
+        fields = [
+            'id', 'as_of', 'created_by', 'started_at', 'finished_at',
+            'properties_valued', 'properties_changed', 'value_before', 'value_after'
+        ]
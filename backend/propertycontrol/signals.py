@@ -0,0 +1,86 @@
+# backend/propertycontrol/signals.py
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import metrics
+from .authentication import invalidate_cached_user
+from .caching import invalidate
+from .models import (
+    User, Department, Category, Property, PropertyTransfer, InventoryCounter,
+    MediaBlob, TransferRollup, TransferRollupDay
+)
+
+
+@receiver(post_delete, sender=Property)
+def property_deleted(sender, instance, **kwargs):
+    InventoryCounter.objects.record_delete(instance)
+    MediaBlob.objects.release(instance.image.name)
+
+
+@receiver(pre_delete, sender=Department)
+@receiver(pre_delete, sender=Category)
+def reference_deleting(sender, instance, **kwargs):
+    # Deleting a department or category nulls property rows with plain
+    # UPDATEs that bypass the counters, so note the buckets that will move.
+    field = 'current_department' if sender is Department else 'category'
+    instance._counter_buckets = InventoryCounter.objects.buckets_of(field, instance.pk)
+
+
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=Category)
+def reference_deleted(sender, instance, **kwargs):
+    InventoryCounter.objects.recompute(getattr(instance, '_counter_buckets', ()))
+
+
+@receiver(post_delete, sender=PropertyTransfer)
+def transfer_deleted(sender, instance, **kwargs):
+    # The day's rollup no longer matches the log; it is redone on the next run.
+    day = timezone.localtime(instance.transfer_date).date()
+    TransferRollup.objects.invalidate(day=day)
+    TransferRollupDay.objects.filter(day=day).delete()
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    TransferRollup.objects.invalidate(category_id=instance.pk)
+
+
+def invalidate_on_commit(resource):
+    # Bumping the version before commit would let a request in between
+    # cache the old rows under the new version until the timeout.
+    transaction.on_commit(lambda: invalidate(resource))
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def department_changed(sender, **kwargs):
+    invalidate_on_commit('departments')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    invalidate_on_commit('categories')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Department responses embed the manager's full name.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_on_commit('departments')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_cache_changed(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    metrics.install(connection)
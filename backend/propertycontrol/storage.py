@@ -0,0 +1,69 @@
+# backend/propertycontrol/storage.py
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names every file after the SHA-256 of its content,
+    e.g. ``properties/3f/3f9a...c1.jpg``. Identical uploads share one file on
+    disk; ``MediaBlob`` counts the rows pointing at it so orphans can be
+    collected.
+    """
+
+    def hashed_name(self, name, digest):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension).replace('\\', '/')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        name = self.hashed_name(self.generate_filename(name), digest.hexdigest())
+
+        if not self.exists(name):
+            self._write(name, content)
+        return name
+
+    def restore(self, name, content):
+        """Write ``content`` to ``name`` again if it was deleted after ``save()`` skipped writing it."""
+        if not self.exists(name):
+            self._write(name, content)
+
+    def _write(self, name, content):
+        # Write beside the target and rename into place: concurrent uploads of
+        # the same content race harmlessly, and readers never see partial files.
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    temp.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            else:
+                os.chmod(temp_path, 0o644)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+image_storage = ContentAddressedStorage()
+
+
+def get_image_storage():
+    return image_storage
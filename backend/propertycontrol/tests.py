@@ -1,3 +1,1657 @@
-from django.test import TestCase
+import copy
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .models import (
+    User, Department, Category, Property, PropertyTransfer, InventoryCounter, CodeSequence
+)
+
+
+def make_property(department, user, category=None, **extra):
+    fields = {
+        'name': 'Laptop',
+        'department': department,
+        'category': category,
+        'purchase_date': date(2024, 1, 1),
+        'purchase_price': Decimal('1000.00'),
+        'current_value': Decimal('800.00'),
+        'created_by': user,
+    }
+    fields.update(extra)
+    return Property.objects.create(**fields)
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='admin', password='admin123', role='admin'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name='Computers', code='COMP')
+
+    def add_departments(self, count, start=0):
+        departments = []
+        for i in range(start, start + count):
+            dept = Department.objects.create(name=f'Dept {i}', code=f'D{i}')
+            make_property(dept, self.user, self.category)
+            make_property(dept, self.user, self.category, status='inactive')
+            departments.append(dept)
+        return departments
+
+    def test_response_shape(self):
+        first, second = self.add_departments(2)
+        Department.objects.create(name='Empty', code='EMPTY')
+        PropertyTransfer.objects.create(
+            property=Property.objects.filter(current_department=first).first(),
+            from_department=first,
+            to_department=second,
+            transferred_by=self.user,
+        )
+
+        response = self.client.get('/api/dashboard/stats/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_properties'], 4)
+        self.assertEqual(response.data['active_properties'], 2)
+        self.assertEqual(response.data['total_departments'], 3)
+        self.assertEqual(response.data['total_categories'], 1)
+        self.assertEqual(len(response.data['recent_transfers']), 1)
+        self.assertEqual(
+            response.data['properties_by_department'],
+            {'Dept 0': 2, 'Dept 1': 2, 'Empty': 0},
+        )
+
+    def test_query_count_is_constant(self):
+        departments = self.add_departments(2)
+        for dept in departments:
+            PropertyTransfer.objects.create(
+                property=Property.objects.filter(current_department=dept).first(),
+                from_department=dept,
+                to_department=departments[0],
+                transferred_by=self.user,
+            )
+
+        with self.assertNumQueries(4):
+            self.client.get('/api/dashboard/stats/')
+
+        self.add_departments(20, start=2)
+        with self.assertNumQueries(4):
+            self.client.get('/api/dashboard/stats/')
+
+
+class InventoryCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR', code='HR')
+        self.category = Category.objects.create(name='Computers', code='COMP')
+
+    def test_counters_follow_saves_transfers_and_deletes(self):
+        laptop = make_property(self.it, self.user, self.category)
+        make_property(self.it, self.user, self.category, status='inactive')
+
+        laptop.status = 'under_maintenance'
+        laptop.save()
+        self.client.put(
+            f'/api/properties/{laptop.pk}/transfer/', {'department': self.hr.pk}
+        )
+        self.client.post('/api/transfers/', {
+            'property': laptop.pk, 'to_department': self.it.pk,
+        })
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+        laptop.delete()
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+        self.category.delete()
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+    def test_reference_deletes_recount_only_the_affected_buckets(self):
+        make_property(self.it, self.user, self.category)
+        chair = make_property(self.hr, self.user, self.category)
+        chair.current_department = self.it
+        chair.save()
+        make_property(self.hr, self.user)
+        untouched = InventoryCounter.objects.get(current_department=self.hr, category=None)
+        InventoryCounter.objects.filter(pk=untouched.pk).update(count=10)
+
+        self.it.delete()
+
+        # The HR bucket was never read, so its planted drift is still there.
+        self.assertEqual(list(InventoryCounter.objects.drift()), [(self.hr.pk, None, 'active')])
+        moved = InventoryCounter.objects.get(current_department=None, category=self.category)
+        self.assertEqual(moved.count, 1)
+
+    def test_rebuild_corrects_drift(self):
+        make_property(self.it, self.user, self.category)
+        InventoryCounter.objects.update(count=10)
+        self.assertEqual(len(InventoryCounter.objects.drift()), 1)
+
+        InventoryCounter.objects.rebuild()
+
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+
+    def test_bucket_created_concurrently_is_retried_as_an_update(self):
+        bucket = {'current_department_id': self.it.pk, 'category_id': None, 'status': 'active'}
+        manager = InventoryCounter.objects
+        original_filter = manager.filter
+        raced = []
+
+        def racing_filter(**kwargs):
+            if not raced:
+                # Another transaction creates the bucket after our UPDATE missed it.
+                raced.append(True)
+                manager.create(**bucket, count=1, total_value=Decimal('5'))
+                return manager.none()
+            return original_filter(**kwargs)
+
+        with mock.patch.object(manager, 'filter', side_effect=racing_filter):
+            manager.apply_deltas({(self.it.pk, None, 'active'): (1, Decimal('5'))})
+
+        counter = InventoryCounter.objects.get(**bucket)
+        self.assertEqual((counter.count, counter.total_value), (2, Decimal('10')))
+
+    def test_null_buckets_are_unique(self):
+        from django.db import IntegrityError, transaction
+        InventoryCounter.objects.create(current_department=self.it, category=None, status='active')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            InventoryCounter.objects.create(current_department=self.it, category=None, status='active')
+
+class ListQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='user1', password='user123', first_name='Test', last_name='User'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT', manager=self.user)
+        self.hr = Department.objects.create(name='HR', code='HR', manager=self.user)
+        self.category = Category.objects.create(name='Computers', code='COMP')
+
+    def add_transfers(self, count):
+        for _ in range(count):
+            prop = make_property(self.it, self.user, self.category)
+            PropertyTransfer.objects.create(
+                property=prop,
+                from_department=self.it,
+                to_department=self.hr,
+                transferred_by=self.user,
+            )
+
+    def assertFlatQueryCount(self, url, expected):
+        self.add_transfers(1)
+        with self.assertNumQueries(expected):
+            self.client.get(url)
+        self.add_transfers(5)
+        with self.assertNumQueries(expected):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_property_list(self):
+        self.assertFlatQueryCount('/api/properties/', 2)
+
+    def test_property_detail(self):
+        self.add_transfers(1)
+        prop = Property.objects.first()
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/properties/{prop.pk}/')
+
+    def test_transfer_list(self):
+        self.assertFlatQueryCount('/api/transfers/', 2)
+
+    def test_recent_transfers(self):
+        self.assertFlatQueryCount('/api/transfers/recent/?limit=10', 1)
+
+    def test_department_list(self):
+        Department.objects.bulk_create([
+            Department(name=f'Dept {i}', code=f'D{i}', manager=self.user)
+            for i in range(5)
+        ])
+        with self.assertNumQueries(2):
+            self.client.get('/api/departments/')
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        for _ in range(7):
+            make_property(self.it, self.user)
+
+    def test_walks_every_row_without_count(self):
+        seen = []
+        url = '/api/properties/?pagination=cursor&page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertNotIn('count', response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(
+            seen, list(Property.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        )
+
+    def test_tied_timestamps_page_by_key_without_offset(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.utils import timezone
+        Property.objects.update(created_at=timezone.now())
+        expected = list(Property.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        seen, url = [], '/api/properties/?pagination=cursor&page_size=2'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertFalse(any('OFFSET' in query['sql'] for query in queries))
+            seen.extend(row['id'] for row in response.data['results'])
+            last, url = response, response.data['next']
+        self.assertEqual(seen, expected)
+
+        seen, url = [], last.data['previous']
+        while url:
+            response = self.client.get(url)
+            seen[:0] = [row['id'] for row in response.data['results']]
+            url = response.data['previous']
+        self.assertEqual(seen, expected[:len(seen)])
+        self.assertEqual(len(seen), 6)
+
+    def test_malformed_cursor_is_not_found(self):
+        from base64 import b64encode
+        for position in ('nope', '["1"]', '["yesterday", "x"]'):
+            cursor = b64encode(f'p={position}'.encode()).decode()
+            response = self.client.get('/api/properties/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def test_page_size_is_capped(self):
+        for _ in range(100):
+            make_property(self.it, self.user)
+        response = self.client.get('/api/properties/?pagination=cursor&page_size=1000')
+        self.assertEqual(len(response.data['results']), 100)
+
+    def test_page_number_remains_default(self):
+        response = self.client.get('/api/properties/')
+        self.assertEqual(response.data['count'], 7)
+
+
+class PropertySearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+
+    def search(self, term):
+        response = self.client.get('/api/properties/', {'search': term})
+        return [row['id'] for row in response.data['results']]
+
+    def test_matches_every_indexed_field(self):
+        printer = make_property(self.it, self.user, name='Printer', brand='Canon')
+        laptop = make_property(
+            self.it, self.user, name='Laptop', serial_number='SN-4411', model='ThinkPad'
+        )
+
+        self.assertEqual(self.search('canon'), [printer.pk])
+        self.assertEqual(self.search('sn-4411'), [laptop.pk])
+        self.assertEqual(self.search('thinkpad laptop'), [laptop.pk])
+
+    def test_search_document_follows_updates(self):
+        prop = make_property(self.it, self.user, name='Desk')
+        prop.brand = 'Ikea'
+        prop.save(update_fields=['brand'])
+
+        self.assertEqual(self.search('ikea'), [prop.pk])
+
+    def test_name_matches_rank_first(self):
+        by_description = make_property(self.it, self.user, name='Cable', description='monitor cable')
+        by_name = make_property(self.it, self.user, name='Monitor')
+
+        self.assertEqual(self.search('monitor'), [by_name.pk, by_description.pk])
+
+
+class PropertyImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Department.objects.create(name='IT', code='IT')
+        Category.objects.create(name='Computers', code='COMP')
+
+    def upload(self, content, name='assets.csv'):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        return self.client.post(
+            '/api/properties/import/',
+            {'file': SimpleUploadedFile(name, content.encode('utf-8'))},
+            format='multipart',
+        )
+
+    def test_imports_valid_rows_and_reports_errors(self):
+        response = self.upload(
+            'name,department,category,purchase_date,purchase_price,current_value,brand\n'
+            'Laptop,IT,COMP,2024-01-01,1000,900,Dell\n'
+            'Printer,NOPE,,2024-01-01,200,150,\n'
+            'Desk,IT,,not-a-date,50,50,Ikea\n'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4])
+        self.assertIn('department', response.data['errors'][0]['errors'])
+        self.assertIn('purchase_date', response.data['errors'][1]['errors'])
+
+        laptop = Property.objects.get()
+        self.assertEqual(laptop.current_department.code, 'IT')
+        self.assertEqual(laptop.created_by, self.user)
+        self.assertIn('dell', laptop.search_document)
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+    def test_rejects_unknown_file_type(self):
+        response = self.upload('name\n', name='assets.txt')
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkTransferTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR', code='HR')
+        self.ops = Department.objects.create(name='OPS', code='OPS')
+        self.category = Category.objects.create(name='Computers', code='COMP')
+
+    def test_moves_properties_in_one_batch(self):
+        ids = [make_property(self.it, self.user, self.category).pk for _ in range(20)]
+
+        # 11: the HR bucket is new, so its insert runs in a savepoint.
+        with self.assertNumQueries(11):
+            response = self.client.post('/api/transfers/bulk/', {
+                'properties': ids, 'to_department': self.hr.pk, 'notes': 'Floor 3',
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'transferred': 20, 'skipped': 0,
+            'from_department': self.it.pk, 'to_department': self.hr.pk,
+        })
+        self.assertEqual(Property.objects.filter(current_department=self.hr).count(), 20)
+        self.assertEqual(PropertyTransfer.objects.filter(notes='Floor 3').count(), 20)
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+    def test_filter_selection(self):
+        make_property(self.it, self.user, self.category)
+        make_property(self.it, self.user)
+
+        response = self.client.post('/api/transfers/bulk/', {
+            'filter': {'department': str(self.it.pk), 'category': str(self.category.pk)},
+            'to_department': self.hr.pk,
+        }, format='json')
+
+        self.assertEqual(response.data['transferred'], 1)
+
+    def test_rejects_mixed_sources(self):
+        first = make_property(self.it, self.user)
+        second = make_property(self.ops, self.user)
+
+        response = self.client.post('/api/transfers/bulk/', {
+            'properties': [first.pk, second.pk], 'to_department': self.hr.pk,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PropertyTransfer.objects.exists())
+
+        response = self.client.post('/api/transfers/bulk/', {
+            'properties': [first.pk, second.pk],
+            'from_department': self.it.pk,
+            'to_department': self.hr.pk,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['properties'], [second.pk])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR', code='HR')
+
+    def test_property_export_honours_filters(self):
+        for _ in range(5):
+            make_property(self.it, self.user)
+        make_property(self.hr, self.user, name='Chair')
+
+        with mock.patch('propertycontrol.exports.EXPORT_CHUNK_SIZE', 2):
+            response = self.client.get('/api/properties/export/', {'department': self.it.pk})
+            lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+
+        self.assertTrue(lines[0].startswith('id,code,name,'))
+        self.assertEqual(len(lines), 6)
+        self.assertNotIn('Chair', ''.join(lines))
+
+
+class ReferenceDataCacheTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='user1', password='user123', first_name='Sara'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Department.objects.create(name='IT', code='IT', manager=self.user)
+
+    def test_revalidation_and_invalidation(self):
+        first = self.client.get('/api/departments/')
+        etag = first['ETag']
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/departments/')
+        self.assertEqual(cached.data, first.data)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get('/api/departments/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Sarah'
+            self.user.save()
+        changed = self.client.get('/api/departments/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.data['results'][0]['manager_name'], 'Sarah')
+
+    def test_category_writes_invalidate(self):
+        self.client.get('/api/categories/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Computers', code='COMP')
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_last_modified_advances_for_writes_in_the_same_second(self):
+        first = self.client.get('/api/categories/')
+        since = first['Last-Modified']
+        with self.assertNumQueries(0):
+            not_modified = self.client.get('/api/categories/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(not_modified.status_code, 304)
+
+        with mock.patch('propertycontrol.caching.time.time', return_value=1_700_000_000.5):
+            for code in ('COMP', 'VEH'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    Category.objects.create(name=code, code=code)
+                changed = self.client.get('/api/categories/', HTTP_IF_MODIFIED_SINCE=since)
+                self.assertEqual(changed.status_code, 200)
+                self.assertNotEqual(changed['Last-Modified'], since)
+                since = changed['Last-Modified']
+        self.assertEqual(changed.data['count'], 2)
+
+    def test_invalidation_waits_for_commit(self):
+        from propertycontrol.caching import resource_version
+        before = resource_version('categories')
+        with self.captureOnCommitCallbacks() as callbacks:
+            Category.objects.create(name='Computers', code='COMP')
+        self.assertEqual(resource_version('categories'), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(resource_version('categories'), before)
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.admin = User.objects.create_user(
+            username='admin', password='admin123', role='admin', department=self.it
+        )
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/auth/login/', {'username': 'admin', 'password': 'admin123'}
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def test_permission_checks_use_claims(self):
+        self.client.get('/api/categories/')  # warm the reference-data cache
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_full_user_is_cached_and_invalidated(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/auth/profile/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.data['username'], 'admin')
+
+        self.admin.first_name = 'Ali'
+        self.admin.save()
+        response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.data['first_name'], 'Ali')
+
+    def test_request_user_can_be_assigned_to_foreign_keys(self):
+        response = self.client.post('/api/properties/', {
+            'name': 'Laptop', 'department': self.it.pk,
+            'purchase_date': '2024-01-01', 'purchase_price': '10.00',
+            'current_value': '10.00',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Property.objects.get().created_by, self.admin)
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.tokens = self.client.post(
+            '/api/auth/login/', {'username': 'user1', 'password': 'user123'}
+        ).data
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': token})
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        response = self.refresh(self.tokens['refresh'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('refresh', response.data)
+
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+
+    def test_logout_revokes_both_tokens(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+        response = self.client.post('/api/auth/logout/', {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+
+    def test_refresh_reads_current_role(self):
+        admin = User.objects.create_user(username='admin1', password='admin123', role='admin')
+        tokens = self.client.post('/api/auth/login/', {'username': 'admin1', 'password': 'admin123'}).data
+        admin.role = 'user'
+        admin.save()
+
+        response = self.refresh(tokens['refresh'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'user')
+        self.assertEqual(RefreshToken(response.data['refresh'])['role'], 'user')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.assertEqual(self.client.get('/api/admin/metrics/').status_code, 403)
+
+    def test_inactive_user_cannot_refresh(self):
+        User.objects.filter(username='user1').update(is_active=False)
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+
+    def test_concurrent_refreshes_with_one_token_revoke_it_once(self):
+        from propertycontrol.revocation import get_revocation_store
+        # Both requests pass the is_revoked() check before either revokes.
+        with mock.patch.object(get_revocation_store(), 'is_revoked', return_value=False):
+            self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 200)
+            self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+
+    def test_in_memory_store_evicts_only_expired_entries(self):
+        from propertycontrol.revocation import InMemoryRevocationStore, RevocationStoreFull
+        store = InMemoryRevocationStore(max_entries=2)
+        store.revoke('expired', 0)
+        store.revoke('a', 4102444800)
+        self.assertTrue(store.revoke('b', 4102444800))
+        self.assertFalse(store.revoke('b', 4102444800))
+
+        self.assertFalse(store.is_revoked('expired'))
+        with self.assertRaises(RevocationStoreFull), self.assertLogs('propertycontrol.revocation', 'ERROR'):
+            store.revoke('c', 4102444800)
+        self.assertTrue(store.is_revoked('a'))
+        self.assertTrue(store.is_revoked('b'))
+
+    def test_refresh_fails_closed_when_the_store_is_full(self):
+        from propertycontrol.revocation import RevocationStoreFull, get_revocation_store
+        with mock.patch.object(get_revocation_store(), 'revoke', side_effect=RevocationStoreFull):
+            self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+
+
+class AsyncReadEndpointTests(TransactionTestCase):
+    # Concurrent reads run on worker threads with their own connections,
+    # so the fixtures have to be committed.
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='user123', role='admin')
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR', code='HR')
+        for _ in range(8):
+            prop = make_property(self.it, self.user)
+        PropertyTransfer.objects.create(
+            property=prop, from_department=self.it, to_department=self.hr,
+            transferred_by=self.user,
+        )
+        token = self.client.post(
+            '/api/auth/login/', {'username': 'user1', 'password': 'user123'}
+        ).json()['access']
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def assertSameResponse(self, path, query=''):
+        sync = self.client.get(f'/api/{path}{query}', **self.auth)
+        async_ = self.client.get(f'/api/async/{path}{query}', **self.auth)
+        self.assertEqual(async_.status_code, sync.status_code)
+        self.assertEqual(
+            async_.content.replace(b'/async/', b'/'), sync.content
+        )
+
+    def test_matches_sync_endpoints(self):
+        self.assertSameResponse('dashboard/stats/')
+        self.assertSameResponse('transfers/recent/', '?limit=3')
+        self.assertSameResponse('properties/')
+        self.assertSameResponse('properties/', '?page=2')
+        self.assertSameResponse('properties/', '?page=abc')
+        self.assertSameResponse('properties/', '?page=999')
+        self.assertSameResponse('properties/', '?page=last')
+        self.assertSameResponse('properties/', f'?department={self.it.pk}&search=laptop')
+        self.assertSameResponse('properties/', '?fields=id,name,current_department_name&page=2')
+        self.assertSameResponse('properties/', '?omit=nope')
+        self.assertSameResponse('properties/', '?pagination=cursor&page_size=3&fields=id,name')
+        self.assertSameResponse('properties/', '?cursor=bogus')
+        self.assertSameResponse(f'properties/{Property.objects.first().pk}/')
+        self.assertSameResponse('properties/999/')
+
+    def test_follows_cursor_links(self):
+        page = self.client.get('/api/async/properties/?pagination=cursor&page_size=3', **self.auth).json()
+        self.assertNotIn('count', page)
+        cursor = page['next'].split('?', 1)[1]
+        self.assertSameResponse('properties/', f'?{cursor}')
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get('/api/async/properties/').status_code, 401)
+
+
+def make_png(size=(1200, 800), color='red'):
+    from io import BytesIO
+    from PIL import Image
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+
+
+class ImageRenditionTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.settings_override = self.settings(MEDIA_ROOT=media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+
+    def upload(self):
+        return self.client.post('/api/properties/', {
+            'name': 'Laptop', 'department': self.it.pk, 'purchase_date': '2024-01-01',
+            'purchase_price': '10.00', 'current_value': '10.00', 'image': make_png(),
+        }, format='multipart')
+
+    def test_renditions_generated_on_upload(self):
+        from PIL import Image
+        from propertycontrol import images
+        with self.settings(PROPERTYCONTROL_IMAGE_RENDITIONS='sync'):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.upload()
+
+        prop = Property.objects.get()
+        self.assertEqual(len(prop.image_hash), 64)
+        with images.default_storage.open(images.rendition_name(prop.image_hash, 'thumbnail')) as f:
+            self.assertEqual(Image.open(f).size, (150, 100))
+
+        detail = self.client.get(f'/api/properties/{prop.pk}/')
+        self.assertIn('/media/properties/renditions/', detail.data['image_renditions']['medium'])
+        self.assertIn('image_renditions', response.data)
+
+    def test_list_builds_rendition_urls_without_touching_storage(self):
+        from propertycontrol import images
+        self.upload()
+        with mock.patch.object(images.default_storage, 'exists') as exists:
+            response = self.client.get('/api/properties/')
+        exists.assert_not_called()
+        prop = Property.objects.get()
+        self.assertTrue(response.data['results'][0]['image_renditions']['thumbnail'].endswith(
+            images.default_storage.url(images.rendition_name(prop.image_hash, 'thumbnail'))
+        ))
+
+    def test_lazy_rendition_endpoint(self):
+        with self.settings(PROPERTYCONTROL_IMAGE_RENDITIONS='lazy'):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.upload()
+
+        url = response.data['image_renditions']['thumbnail']
+        self.assertIn('/image/thumbnail/', url)
+        redirect = self.client.get(url)
+        self.assertEqual(redirect.status_code, 302)
+        self.assertIn('/media/properties/renditions/', redirect['Location'])
+
+        # An <img> tag sends no token: the signed URL still works, a bare
+        # or tampered one does not.
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        bare = url.split('?')[0]
+        self.assertEqual(self.client.get(bare).status_code, 403)
+        self.assertEqual(self.client.get(bare + '?signature=forged').status_code, 403)
+        other = url.replace('/thumbnail/', '/medium/')
+        self.assertEqual(self.client.get(other).status_code, 403)
+
+    def test_backfill_hashes_and_renditions(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from propertycontrol import images
+        with self.settings(PROPERTYCONTROL_IMAGE_RENDITIONS='lazy'):
+            self.upload()
+        prop = Property.objects.get()
+        image_hash = prop.image_hash
+        Property.objects.filter(pk=prop.pk).update(image_hash='')
+
+        call_command('backfill_image_renditions', stdout=StringIO())
+
+        self.assertEqual(Property.objects.get().image_hash, image_hash)
+        for rendition in images.RENDITIONS:
+            self.assertTrue(images.default_storage.exists(images.rendition_name(image_hash, rendition)))
+
+
+class ContentAddressedMediaTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.settings_override = self.settings(
+            MEDIA_ROOT=media_root, PROPERTYCONTROL_IMAGE_RENDITIONS='lazy'
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.it = Department.objects.create(name='IT', code='IT')
+
+    def make_with_image(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        image = SimpleUploadedFile('photo.png', make_png().read(), content_type='image/png')
+        return make_property(self.it, self.user, image=image)
+
+    def test_identical_uploads_share_one_file_until_last_reference_goes(self):
+        from propertycontrol.models import MediaBlob
+        from propertycontrol.storage import get_image_storage
+        first = self.make_with_image()
+        second = self.make_with_image()
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertIn(first.image_hash, first.image.name)
+        self.assertEqual(MediaBlob.objects.get(name=first.image.name).refcount, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(get_image_storage().exists(second.image.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(get_image_storage().exists(second.image.name))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_upload_restores_a_file_collected_before_retain(self):
+        from propertycontrol.models import MediaBlob
+        from propertycontrol.storage import get_image_storage
+        first = self.make_with_image()
+        name = first.image.name
+        first.delete()  # refcount 0; collect() not run yet
+        self.assertTrue(get_image_storage().exists(name))
+
+        retain = MediaBlob.objects.retain
+
+        def collect_then_retain(blob_name):
+            # The upload skipped its write because the file existed; a
+            # concurrent collect() now deletes it before the reference lands.
+            MediaBlob.objects.collect([blob_name])
+            retain(blob_name)
+
+        with mock.patch.object(MediaBlob.objects, 'retain', collect_then_retain):
+            second = self.make_with_image()
+
+        self.assertEqual(second.image.name, name)
+        self.assertTrue(get_image_storage().exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 1)
+
+    def test_media_view_supports_etag_and_ranges(self):
+        prop = self.make_with_image()
+        url = f'/media/{prop.image.name}'
+        size = prop.image.size
+
+        full = self.client.get(url)
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(full['ETag'], f'"{prop.image_hash}"')
+        self.assertIn('immutable', full['Cache-Control'])
+        body = b''.join(full.streaming_content)
+        self.assertEqual(len(body), size)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=full['ETag']).status_code, 304)
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], f'bytes 10-19/{size}')
+        self.assertEqual(b''.join(partial.streaming_content), body[10:20])
+
+        suffix = self.client.get(url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(suffix.streaming_content), body[-5:])
+
+        stale = self.client.get(url, HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"other"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={size}-').status_code, 416)
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        job_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, job_root)
+        self.settings_override = self.settings(PROPERTYCONTROL_JOB_FILES_ROOT=job_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR', code='HR')
+
+    def run_queue(self):
+        from django.core.management import call_command
+        from io import StringIO
+        call_command('run_jobs', processes=0, once=True, stdout=StringIO())
+
+    def test_async_export_is_downloadable_once_done(self):
+        for _ in range(3):
+            make_property(self.it, self.user)
+        response = self.client.get('/api/properties/export/', {'async': '1'})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+
+        self.run_queue()
+        job = self.client.get(response['Location']).data
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['progress'], 100)
+
+        download = self.client.get(job['download_url'])
+        lines = b''.join(download.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 4)
+
+    def test_async_import_and_bulk_transfer(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        csv = (
+            'name,department,purchase_date,purchase_price,current_value\n'
+            'Laptop,IT,2024-01-01,1000,900\n'
+            'Desk,IT,2024-01-01,50,50\n'
+        )
+        response = self.client.post(
+            '/api/properties/import/?async=1',
+            {'file': SimpleUploadedFile('assets.csv', csv.encode('utf-8'))},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 202)
+        self.run_queue()
+        self.assertEqual(Property.objects.filter(current_department=self.it).count(), 2)
+
+        response = self.client.post('/api/transfers/bulk/?async=1', {
+            'filter': {'department': str(self.it.pk)}, 'to_department': self.hr.pk,
+        }, format='json')
+        self.run_queue()
+        job = self.client.get(response['Location']).data
+        self.assertEqual(job['result']['transferred'], 2)
+        self.assertEqual(Property.objects.filter(current_department=self.hr).count(), 2)
+
+    def test_idempotency_key_returns_the_same_job(self):
+        first = self.client.get('/api/transfers/export/?async=1', HTTP_IDEMPOTENCY_KEY='abc')
+        second = self.client.get('/api/transfers/export/?async=1', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(first.data['id'], second.data['id'])
+
+        other = User.objects.create_user(username='user2', password='user123')
+        self.client.force_authenticate(other)
+        third = self.client.get('/api/transfers/export/?async=1', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertNotEqual(first.data['id'], third.data['id'])
+        self.assertEqual(self.client.get(first['Location']).status_code, 404)
+
+    def test_failures_are_retried_with_backoff(self):
+        from django.utils import timezone
+        from propertycontrol import jobs
+        from propertycontrol.models import Job
+
+        calls = []
+
+        def flaky(job, context):
+            calls.append(job.attempts)
+            raise RuntimeError('database went away')
+
+        with mock.patch.dict(jobs.HANDLERS, {'flaky': flaky}), \
+                self.assertLogs('propertycontrol.jobs', level='ERROR'):
+            job, _ = jobs.enqueue('flaky', {}, max_attempts=2)
+            self.run_queue()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('queued', 1))
+            self.assertGreater(job.run_after, timezone.now())
+
+            self.run_queue()  # not due yet
+            self.assertEqual(calls, [1])
+
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            self.run_queue()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.error), ('failed', 'database went away'))
+            self.assertEqual(calls, [1, 2])
+
+
+    def test_retried_import_resumes_after_the_last_committed_chunk(self):
+        from propertycontrol.imports import PropertyImporter
+        rows = [
+            {'name': f'Chair {n}', 'department': 'IT', 'purchase_date': '2024-01-01',
+             'purchase_price': '10', 'current_value': '10'}
+            for n in range(3)
+        ]
+        saved = {}
+
+        def crash_after_two():
+            yield from rows[:2]
+            raise RuntimeError('worker killed')
+
+        def checkpoint(result):
+            saved.update(copy.deepcopy(result))
+
+        importer = PropertyImporter(self.user, chunk_size=1)
+        with self.assertRaises(RuntimeError):
+            importer.run(crash_after_two(), checkpoint=checkpoint)
+        self.assertEqual(saved['rows'], 2)
+
+        result = PropertyImporter(self.user, chunk_size=1).run(iter(rows), resume=saved)
+        self.assertEqual((result['rows'], result['created']), (3, 3))
+        self.assertEqual(Property.objects.filter(name__startswith='Chair').count(), 3)
+
+    def test_stale_jobs_fail_once_out_of_attempts(self):
+        from datetime import timedelta
+        from django.core.files.base import ContentFile
+        from django.utils import timezone
+        from propertycontrol import jobs
+        from propertycontrol.models import Job
+
+        long_ago = timezone.now() - timedelta(days=1)
+        storage = jobs.job_storage()
+        upload = storage.save('imports/assets.csv', ContentFile(b'name\n'))
+        retry, _ = jobs.enqueue('export', {'kind': 'transfers'}, max_attempts=2)
+        last, _ = jobs.enqueue('import_properties', {'file': upload, 'user': self.user.pk}, max_attempts=2)
+        busy, _ = jobs.enqueue('export', {'kind': 'transfers'}, max_attempts=2)
+        Job.objects.filter(pk=retry.pk).update(
+            status='running', attempts=1, started_at=long_ago, heartbeat_at=long_ago,
+        )
+        Job.objects.filter(pk=last.pk).update(status='running', attempts=2, started_at=long_ago)
+        # Long-running but still reporting progress: not stale.
+        Job.objects.filter(pk=busy.pk).update(
+            status='running', attempts=1, started_at=long_ago, heartbeat_at=timezone.now(),
+        )
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        retry.refresh_from_db()
+        last.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual(retry.status, 'queued')
+        self.assertEqual(last.status, 'failed')
+        self.assertEqual(busy.status, 'running')
+        self.assertFalse(storage.exists(upload))
+
+    def test_progress_keeps_a_running_job_alive(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from propertycontrol import jobs
+        from propertycontrol.models import Job
+
+        job, _ = jobs.enqueue('export', {'kind': 'transfers'})
+        jobs.claim_jobs('worker-1', 1)
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(days=1))
+        jobs.JobContext(job).progress(50, 'halfway')
+        self.assertEqual(jobs.requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress), ('running', 50))
+
+class RevaluationTests(TestCase):
+    def setUp(self):
+        from propertycontrol.models import DepreciationPolicy
+        self.user = User.objects.create_user(username='admin', password='admin123', role='admin')
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.computers = Category.objects.create(name='Computers', code='COMP')
+        self.vehicles = Category.objects.create(name='Vehicles', code='VEH')
+        self.furniture = Category.objects.create(name='Furniture', code='FURN')
+        DepreciationPolicy.objects.create(
+            category=self.computers, useful_life_years=5, salvage_rate=Decimal('0.1')
+        )
+        DepreciationPolicy.objects.create(
+            category=self.vehicles, method='declining_balance', useful_life_years=8,
+            declining_rate=Decimal('0.5'), salvage_rate=Decimal('0.2'),
+        )
+
+    def test_revalues_by_category_policy(self):
+        from propertycontrol.models import ValuationSnapshot
+        from propertycontrol.valuation import revalue
+        laptop = make_property(self.it, self.user, self.computers, purchase_date=date(2022, 1, 1))
+        van = make_property(self.it, self.user, self.vehicles, purchase_date=date(2023, 1, 1))
+        old_van = make_property(self.it, self.user, self.vehicles, purchase_date=date(2014, 1, 1))
+        desk = make_property(self.it, self.user, self.furniture, purchase_date=date(2022, 1, 1))
+        scrapped = make_property(self.it, self.user, self.computers, status='disposed')
+
+        run = revalue(as_of=date(2024, 1, 1), chunk_size=2)
+
+        values = dict(Property.objects.values_list('id', 'current_value'))
+        # Straight line: 1000 - 900 * (730 / 1826.25); declining: 1000 * 0.5 ** (365 / 365.25).
+        self.assertEqual(values[laptop.pk], Decimal('640.25'))
+        self.assertEqual(values[van.pk], Decimal('500.24'))
+        self.assertEqual(values[old_van.pk], Decimal('200.00'))
+        self.assertEqual(values[desk.pk], Decimal('800.00'))
+        self.assertEqual(values[scrapped.pk], Decimal('800.00'))
+
+        self.assertEqual((run.properties_valued, run.properties_changed), (3, 3))
+        self.assertEqual(run.value_after, Decimal('1340.49'))
+        self.assertEqual(ValuationSnapshot.objects.get(property=laptop).previous_value, Decimal('800.00'))
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+        again = revalue(as_of=date(2024, 1, 1))
+        self.assertEqual(again.properties_changed, 0)
+
+    def test_failed_revaluation_leaves_counters_matching_committed_chunks(self):
+        from propertycontrol.valuation import revalue
+        for year in (2020, 2021, 2022):
+            make_property(self.it, self.user, self.computers, purchase_date=date(year, 1, 1))
+
+        def fail_after_first_chunk(done, total):
+            raise RuntimeError('worker killed')
+
+        with self.assertRaises(RuntimeError):
+            revalue(as_of=date(2024, 1, 1), chunk_size=2, progress=fail_after_first_chunk)
+        self.assertEqual(Property.objects.exclude(current_value=Decimal('800.00')).count(), 2)
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+    def test_revalue_endpoint_queues_a_job(self):
+        from django.core.management import call_command
+        from io import StringIO
+        make_property(self.it, self.user, self.computers, purchase_date=date(2020, 1, 1))
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post('/api/valuations/revalue/', {'as_of': '2030-01-01'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        call_command('run_jobs', processes=0, once=True, stdout=StringIO())
+
+        job = client.get(response['Location']).data
+        self.assertEqual(job['result']['value_after'], '100.00')
+        self.assertEqual(client.get('/api/valuations/').data['count'], 1)
+
+
+class AsOfTests(TestCase):
+    def setUp(self):
+        from datetime import datetime, timezone as dt_timezone
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR', code='HR')
+        self.ops = Department.objects.create(name='Ops', code='OPS')
+
+        def at(day):
+            return datetime(2024, 1, day, 12, tzinfo=dt_timezone.utc)
+
+        # Laptop: IT from Jan 1, HR from Jan 10, Ops from Jan 20.
+        self.laptop = make_property(self.it, self.user, name='Laptop')
+        for day, source, target in ((10, self.it, self.hr), (20, self.hr, self.ops)):
+            transfer = PropertyTransfer.objects.create(
+                property=self.laptop, from_department=source, to_department=target,
+                transferred_by=self.user,
+            )
+            PropertyTransfer.objects.filter(pk=transfer.pk).update(transfer_date=at(day))
+        Property.objects.filter(pk=self.laptop.pk).update(current_department=self.ops, created_at=at(1))
+        # Desk: created on Jan 15, never moved.
+        self.desk = make_property(self.it, self.user, name='Desk')
+        Property.objects.filter(pk=self.desk.pk).update(created_at=at(15))
+        InventoryCounter.objects.rebuild()
+
+    def test_property_list_as_of(self):
+        def locations(as_of, **params):
+            response = self.client.get('/api/properties/', {'as_of': as_of, **params})
+            return {row['name']: row['department_as_of_name'] for row in response.data['results']}
+
+        self.assertEqual(locations('2024-01-05'), {'Laptop': 'IT'})
+        self.assertEqual(locations('2024-01-15'), {'Laptop': 'HR', 'Desk': 'IT'})
+        self.assertEqual(locations('2024-01-25'), {'Laptop': 'Ops', 'Desk': 'IT'})
+        self.assertEqual(locations('2024-01-15', department=self.it.pk), {'Desk': 'IT'})
+        self.assertEqual(locations('2024-01-10T12:00:01Z'), {'Laptop': 'HR'})
+
+        response = self.client.get('/api/properties/', {'as_of': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('as_of', response.data)
+
+    def test_dashboard_as_of(self):
+        stats = self.client.get('/api/dashboard/stats/', {'as_of': '2024-01-15'}).data
+        self.assertEqual(stats['total_properties'], 2)
+        self.assertEqual(stats['properties_by_department'], {'IT': 1, 'HR': 1, 'Ops': 0})
+        self.assertEqual(len(stats['recent_transfers']), 1)
+
+        current = self.client.get('/api/dashboard/stats/').data
+        self.assertNotIn('as_of', current)
+        self.assertEqual(current['properties_by_department'], {'IT': 1, 'HR': 0, 'Ops': 1})
+
+
+class TransferAnalyticsTests(TestCase):
+    def setUp(self):
+        from datetime import datetime, timezone as dt_timezone
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR', code='HR')
+        self.computers = Category.objects.create(name='Computers', code='COMP')
+        laptop = make_property(self.it, self.user, self.computers)
+        desk = make_property(self.it, self.user, current_value=Decimal('50.00'))
+
+        def transfer(prop, day, month=1):
+            row = PropertyTransfer.objects.create(
+                property=prop, from_department=self.it, to_department=self.hr,
+                transferred_by=self.user,
+            )
+            PropertyTransfer.objects.filter(pk=row.pk).update(
+                transfer_date=datetime(2024, month, day, 9, tzinfo=dt_timezone.utc)
+            )
+            row.refresh_from_db()
+            return row
+
+        transfer(laptop, 2)
+        transfer(desk, 2)
+        transfer(laptop, 20)
+        self.late = transfer(desk, 5, month=2)
+        # Today's transfer is never rolled up.
+        PropertyTransfer.objects.create(
+            property=desk, from_department=self.hr, to_department=self.it, transferred_by=self.user
+        )
+
+    def get(self, **params):
+        response = self.client.get('/api/transfers/analytics/', {'start': '2024-01-01', 'end': '2030-01-01', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_buckets_and_groups(self):
+        monthly = self.get(group_by='category')
+        self.assertEqual(monthly[:3], [
+            {'period': '2024-01-01', 'category': self.computers.pk, 'count': 2, 'value': '1600.00'},
+            {'period': '2024-01-01', 'category': None, 'count': 1, 'value': '50.00'},
+            {'period': '2024-02-01', 'category': None, 'count': 1, 'value': '50.00'},
+        ])
+        self.assertEqual(sum(row['count'] for row in monthly), 5)
+
+        weekly = self.get(bucket='week', start='2024-01-01', end='2024-02-01')
+        self.assertEqual([(row['period'], row['count']) for row in weekly], [('2024-01-01', 2), ('2024-01-15', 1)])
+
+    def test_rollups_give_the_same_answer(self):
+        from propertycontrol.analytics import roll_up_closed_days
+        from propertycontrol.models import TransferRollupDay
+        params = {'bucket': 'day', 'group_by': 'from_department,to_department,category'}
+        live = self.get(**params)
+
+        self.assertGreater(roll_up_closed_days(), 0)
+        self.assertEqual(roll_up_closed_days(), 0)
+        self.assertEqual(self.get(**params), live)
+
+        with self.assertNumQueries(3):  # rolled-up days, rollup rows, the live remainder
+            self.client.get('/api/transfers/analytics/', {'start': '2024-01-01', 'end': '2024-03-01'})
+
+        self.late.delete()
+        self.assertFalse(TransferRollupDay.objects.filter(day=date(2024, 2, 5)).exists())
+        self.assertEqual(sum(row['count'] for row in self.get(**params)), 4)
+
+    def test_history_keeps_the_category_at_move_time(self):
+        from propertycontrol.analytics import roll_up_closed_days
+        before = self.get(group_by='category')
+        roll_up_closed_days()
+        Property.objects.filter(category=self.computers).update(category=None)
+        self.assertEqual(self.get(group_by='category'), before)
+
+    def test_late_commits_redo_recent_days(self):
+        from datetime import timedelta
+        from propertycontrol.analytics import closed_before, day_start, roll_up_closed_days
+        day = closed_before() - timedelta(days=1)
+        noon = day_start(day) + timedelta(hours=12)
+        for _ in range(2):
+            row = PropertyTransfer.objects.create(
+                property=Property.objects.first(), from_department=self.it, to_department=self.hr,
+                transferred_by=self.user,
+            )
+            PropertyTransfer.objects.filter(pk=row.pk).update(transfer_date=noon)
+            # The first run rolls the day up; the second transfer commits after that.
+            self.assertGreater(roll_up_closed_days(), 0)
+
+        self.assertEqual(roll_up_closed_days(), 0)
+        daily = self.get(bucket='day', start=day.isoformat(), end=(day + timedelta(days=1)).isoformat())
+        self.assertEqual(daily[0]['count'], 2)
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'bucket': 'year'}, {'group_by': 'status'}, {'start': 'soon'}):
+            response = self.client.get('/api/transfers/analytics/', params)
+            self.assertEqual(response.status_code, 400)
+
+
+class TransferVersioningTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR', code='HR')
+        self.laptop = make_property(self.it, self.user)
+
+    def test_stale_version_is_a_conflict(self):
+        url = f'/api/properties/{self.laptop.pk}/transfer/'
+        first = self.client.put(url, {'department': self.hr.pk, 'version': 1})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['version'], 2)
+
+        second = self.client.put(url, {'department': self.it.pk, 'version': 1})
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(second.data['version'], 2)
+        response = self.client.post('/api/transfers/', {
+            'property': self.laptop.pk, 'to_department': self.it.pk, 'version': 1,
+        })
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(PropertyTransfer.objects.count(), 1)
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+    def test_edit_does_not_undo_a_concurrent_transfer(self):
+        url = f'/api/properties/{self.laptop.pk}/'
+        read = self.client.get(url).data
+        self.client.put(f'/api/properties/{self.laptop.pk}/transfer/', {'department': self.hr.pk})
+
+        stale = self.client.patch(url, {'name': 'Renamed', 'version': read['version']})
+        self.assertEqual(stale.status_code, 409)
+        response = self.client.patch(url, {'name': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['current_department'], self.hr.pk)
+        self.assertEqual(response.data['version'], 3)
+
+    def test_saving_a_stale_instance_raises(self):
+        from .models import VersionConflict
+        from .transfers import transfer_property
+
+        transfer_property(self.laptop.pk, self.hr, self.user)
+        self.laptop.name = 'Renamed'
+        with self.assertRaises(VersionConflict):
+            self.laptop.save()
+        self.assertEqual(Property.objects.get(pk=self.laptop.pk).current_department, self.hr)
+
+
+class TransferStressTests(TransactionTestCase):
+    # The worker threads open their own connections, so the fixtures have
+    # to be committed.
+
+    def test_concurrent_transfers_lose_no_updates(self):
+        from .benchmarking import stress_transfers, transfer_history_errors
+
+        user = User.objects.create_user(username='user1', password='user123')
+        departments = [
+            Department.objects.create(name=f'D{i}', code=f'D{i}') for i in range(4)
+        ]
+        ids = [make_property(departments[0], user).pk for _ in range(3)]
+
+        results = stress_transfers(ids, [d.pk for d in departments], user, threads=6, transfers=120)
+
+        self.assertEqual(results['failed'], 0)
+        self.assertEqual(PropertyTransfer.objects.count(), 120)
+        self.assertEqual(sum(Property.objects.filter(pk__in=ids).values_list('version', flat=True)), 3 + 120)
+        self.assertEqual(transfer_history_errors(ids), {})
+        self.assertEqual(InventoryCounter.objects.drift(), {})
+
+
+class PropertyCodeTests(TestCase):
+    def setUp(self):
+        from . import codes
+        codes.allocator.clear()
+        self.user = User.objects.create_user(username='user1', password='user123')
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.category = Category.objects.create(name='Computers', code='comp')
+
+    def test_codes_are_sequential_per_category(self):
+        first = make_property(self.it, self.user, self.category)
+        second = make_property(self.it, self.user, self.category)
+        loose = make_property(self.it, self.user)
+
+        self.assertEqual([first.code, second.code], ['COMP-000001', 'COMP-000002'])
+        self.assertEqual(loose.code, 'PROP-000001')
+
+    def test_new_sequence_continues_after_existing_codes(self):
+        Property.objects.bulk_create([
+            Property(
+                name='Old', code=code, department=self.it, created_by=self.user,
+                purchase_date=date(2024, 1, 1), purchase_price=1, current_value=1,
+            )
+            for code in ('COMP-000009', 'COMP-000041', 'COMP-X-000100')
+        ])
+        self.assertEqual(make_property(self.it, self.user, self.category).code, 'COMP-000042')
+
+    def test_bulk_batch_reserves_once(self):
+        from .codes import assign_codes
+
+        make_property(self.it, self.user, self.category)
+        batch = [Property(category=self.category) for _ in range(50)]
+        with self.assertNumQueries(4):  # savepoint, UPDATE, SELECT, release
+            assign_codes(batch)
+        self.assertEqual(batch[-1].code, 'COMP-000051')
+        self.assertEqual(len({prop.code for prop in batch}), 50)
+
+    def test_renumbers_legacy_codes(self):
+        from django.core.management import call_command
+
+        laptop = make_property(self.it, self.user, self.category, code='3F9A01BC')
+        desk = make_property(self.it, self.user, code='00AA11BB')
+        call_command('renumber_property_codes', stdout=mock.MagicMock())
+
+        laptop.refresh_from_db()
+        desk.refresh_from_db()
+        self.assertEqual((laptop.code, laptop.legacy_code), ('COMP-000001', '3F9A01BC'))
+        self.assertEqual((desk.code, desk.legacy_code), ('PROP-000001', '00AA11BB'))
+        self.assertEqual(laptop.version, 2)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/properties/?search=3f9a01bc')
+        self.assertEqual([row['code'] for row in response.data['results']], ['COMP-000001'])
+
+
+class PropertyCodeBlockTests(TransactionTestCase):
+    def test_reserved_block_serves_later_creates(self):
+        from . import codes
+        codes.allocator.clear()
+        user = User.objects.create_user(username='user1', password='user123')
+        it = Department.objects.create(name='IT', code='IT')
+
+        self.assertEqual(make_property(it, user).code, 'PROP-000001')
+        with self.assertNumQueries(0):
+            self.assertEqual(codes.allocator.allocate('PROP', 99)[-1], 'PROP-000100')
+        self.assertEqual(codes.allocator.allocate('PROP', 1), ['PROP-000101'])
+        self.assertEqual(CodeSequence.objects.get(prefix='PROP').next_value, 201)
+        codes.allocator.clear()
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='user1', password='user123', first_name='Test', last_name='User', role='admin'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT', manager=self.user)
+        self.hr = Department.objects.create(name='HR', code='HR')
+        self.category = Category.objects.create(name='Computers', code='COMP')
+        for _ in range(3):
+            prop = make_property(self.it, self.user, self.category, description='x' * 500)
+        self.client.put(f'/api/properties/{prop.pk}/transfer/', {'department': self.hr.pk})
+
+    def get(self, path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response, ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_fields_trim_output_columns_and_joins(self):
+        response, sql = self.get('/api/properties/?fields=id,code,name,category_name')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'code', 'name', 'category_name'])
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('propertycontrol_user', sql)
+        self.assertNotIn('propertycontrol_department', sql)
+        self.assertIn('propertycontrol_category', sql)
+
+    def test_omit_and_cursor_pages(self):
+        response, sql = self.get('/api/properties/?pagination=cursor&page_size=2&omit=description,created_by_name')
+        self.assertNotIn('description', response.data['results'][0])
+        self.assertIn('current_department_name', response.data['results'][0])
+        self.assertNotIn('propertycontrol_user', sql)
+        following, _ = self.get(response.data['next'])
+        self.assertEqual(len(following.data['results']), 1)
+
+        response, _ = self.get('/api/transfers/?pagination=cursor&fields=id,to_department_name')
+        self.assertEqual(response.data['results'], [
+            {'id': PropertyTransfer.objects.get().pk, 'to_department_name': 'HR'}
+        ])
+
+    def test_department_and_user_lists(self):
+        response, sql = self.get('/api/departments/?fields=id,name,manager_name')
+        self.assertEqual(response.data['results'][0], {'id': self.it.pk, 'name': 'IT', 'manager_name': 'Test User'})
+        self.assertNotIn('"email"', sql)
+        response, _ = self.get('/api/admin/users/?omit=email,phone,department')
+        self.assertEqual(
+            list(response.data['results'][0]), ['id', 'username', 'first_name', 'last_name', 'role']
+        )
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/properties/?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.data)
+
+
+class FastReadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='user1', password='user123', first_name='Test', last_name='User', role='admin'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.it = Department.objects.create(name='IT', code='IT')
+        self.hr = Department.objects.create(name='HR \u2028 دفتر', code='HR')
+        category = Category.objects.create(name='Computers', code='COMP')
+        self.plain = make_property(self.it, self.user, category, purchase_price=Decimal('1000.5'))
+        pictured = make_property(self.it, self.user, description='tab\t"quote"\n\u2029')
+        Property.objects.filter(pk=pictured.pk).update(image='properties/a.png', image_hash='ab' * 32)
+        self.client.put(f'/api/properties/{pictured.pk}/transfer/', {'department': self.hr.pk})
+
+    def assertSameResponse(self, path):
+        with self.settings(PROPERTYCONTROL_FAST_READS=False):
+            expected = self.client.get(path)
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    def test_lists_match_the_serializers_byte_for_byte(self):
+        response = self.assertSameResponse('/api/properties/')
+        rows = {row['id']: row for row in response.data['results']}
+        plain, pictured = rows.pop(self.plain.pk), rows.popitem()[1]
+        self.assertEqual(plain['purchase_price'], '1000.50')
+        self.assertIsNone(plain['image_renditions'])
+        self.assertNotIn('category_name', pictured)
+        self.assertIn('/media/properties/renditions/ab/', pictured['image_renditions']['thumbnail'])
+        for path in [
+            '/api/properties/?fields=id,category_name,image,created_by_name',
+            '/api/properties/?pagination=cursor&page_size=1&omit=description',
+            f'/api/properties/?as_of=2999-01-01&department={self.hr.pk}',
+            '/api/transfers/',
+            '/api/transfers/?pagination=cursor&fields=id,to_department_name,transfer_date',
+        ]:
+            with self.subTest(path=path):
+                self.assertSameResponse(path)
+
+    def test_compiled_selections_are_bounded(self):
+        from itertools import combinations
+        from propertycontrol.fastread import PropertyFastSerializer, compile_serializer
+        names = list(PropertyFastSerializer.serializer_class().fields)[:9]
+        for size in range(1, len(names) + 1):
+            for selected in combinations(names, size):
+                compile_serializer(PropertyFastSerializer, selected)
+        info = compile_serializer.cache_info()
+        self.assertEqual(info.currsize, info.maxsize)
+
+    def test_unsupported_field_is_rejected(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from propertycontrol.fastread import FastSerializer, compile_serializer
+        from propertycontrol.serializers import PropertySerializer
+
+        class Incomplete(FastSerializer):
+            serializer_class = PropertySerializer
+
+        with self.assertRaises(ImproperlyConfigured):
+            compile_serializer(Incomplete)
+
+    def test_renderer_falls_back_for_indented_output(self):
+        from rest_framework.renderers import JSONRenderer
+        from propertycontrol.renderers import FastJSONRenderer
+
+        data = {'name': 'دفتر\u2028', 'price': Decimal('1.50'), 'day': date(2024, 1, 1), 'none': None}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render(data, renderer_context=context),
+            JSONRenderer().render(data, renderer_context=context),
+        )
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        from propertycontrol import metrics
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+        self.admin = User.objects.create_user(username='admin1', password='admin123', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.it = Department.objects.create(name='IT', code='IT')
+        for _ in range(3):
+            make_property(self.it, self.admin)
+
+    def test_records_per_endpoint(self):
+        listing = self.client.get('/api/properties/')
+        self.client.get('/api/properties/')
+        self.client.get('/api/dashboard/stats/')
+
+        summary = self.client.get('/api/admin/metrics/').json()
+        properties = summary['property-list']
+        self.assertEqual(properties['requests'], 2)
+        self.assertEqual(properties['response_bytes_total'], 2 * len(listing.content))
+        self.assertGreater(properties['queries_per_request'], 0)
+        self.assertGreater(properties['serializer_seconds_total'], 0)
+        self.assertLessEqual(properties['p50_ms'], properties['p99_ms'])
+        self.assertEqual(summary['dashboard_stats']['requests'], 1)
+
+    def test_prometheus_output_is_admin_only(self):
+        self.client.get('/api/properties/')
+        response = self.client.get('/api/admin/metrics/', HTTP_ACCEPT='text/plain;version=0.0.4')
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        self.assertIn('# TYPE propertycontrol_request_duration_seconds summary', text)
+        self.assertIn('propertycontrol_requests_total{endpoint="property-list"} 1', text)
+        self.assertIn('propertycontrol_request_duration_seconds{endpoint="property-list",quantile="0.99"}', text)
+
+        viewer = User.objects.create_user(username='viewer', password='viewer123', role='user')
+        self.client.force_authenticate(viewer)
+        self.assertEqual(self.client.get('/api/admin/metrics/?format=prometheus').status_code, 403)
+
+    def test_repeated_selects_are_flagged(self):
+        from propertycontrol.metrics import collect
+
+        with collect() as metrics:
+            for prop in Property.objects.all():
+                Department.objects.get(pk=prop.department_id)
+            list(Department.objects.filter(pk__in=[self.it.pk, self.it.pk + 1]))
+        self.assertEqual(metrics.queries, 5)
+        [(count, sql)] = metrics.repeated_selects(threshold=3)
+        self.assertEqual(count, 3)
+        self.assertIn('propertycontrol_department', sql)
+        self.assertEqual(metrics.repeated_selects(threshold=4), [])
+
+    def test_n_plus_one_warning(self):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from propertycontrol.metrics import MetricsMiddleware, registry
+
+        def view(request):
+            for prop in Property.objects.all():
+                prop.department.name
+            return HttpResponse(b'ok')
+
+        with self.assertLogs('propertycontrol.metrics', 'WARNING') as logs:
+            with self.settings(PROPERTYCONTROL_N_PLUS_ONE_THRESHOLD=3):
+                MetricsMiddleware(view)(RequestFactory().get('/api/slow/'))
+        self.assertIn('Possible N+1 on GET /api/slow/', logs.output[0])
+        self.assertEqual(registry.snapshot()['<unresolved>']['n_plus_one_total'], 1)
+
+
+class SeedBenchmarkDataTests(TestCase):
+    def test_seeds_a_consistent_history(self):
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+        from propertycontrol.benchmarking import transfer_history_errors
+
+        out = StringIO()
+        call_command(
+            'seed_benchmark_data', '--departments=5', '--categories=3', '--users=4',
+            '--properties=200', '--transfers=500', '--history-days=30', '--batch-size=64', '--json',
+            '--force', stdout=out,
+        )
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary['users'], 4)
+        self.assertEqual(Property.objects.count(), 200)
+        self.assertEqual(PropertyTransfer.objects.count(), 500)
+        self.assertTrue(User.objects.get(username='benchmark').check_password(summary['password']))
+
+        self.assertEqual(transfer_history_errors(list(Property.objects.values_list('id', flat=True))), {})
+        transfers = PropertyTransfer.objects.select_related('property')
+        self.assertFalse([t for t in transfers if t.transfer_date < t.property.created_at])
+        self.assertEqual(len(set(Property.objects.values_list('code', flat=True))), 200)
+
+        from django.core.management.base import CommandError
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark_data', '--properties=1', '--transfers=0', '--force', stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, 'DEBUG is off'):
+            call_command('seed_benchmark_data', '--username=other', stdout=StringIO())
+
+
+class RunBenchmarksTests(TransactionTestCase):
+    # The benchmark server answers from its own threads and connections.
+
+    def test_writes_results_file(self):
+        import json
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        call_command(
+            'seed_benchmark_data', '--departments=3', '--categories=2', '--users=2',
+            '--properties=20', '--transfers=20', '--password=secret-pass', '--force', stdout=StringIO(),
+        )
+        output = os.path.join(tempfile.mkdtemp(), 'results.json')
+        self.addCleanup(os.remove, output)
+        call_command(
+            'run_benchmarks', '--password=secret-pass', '--concurrency=1', '--requests=3', '--warmup=0',
+            '--endpoints=list,detail,transfer', f'--output={output}', stdout=StringIO(),
+        )
+        with open(output) as f:
+            report = json.load(f)
+        self.assertEqual(list(report['endpoints']), ['detail', 'list', 'transfer'])
+        self.assertEqual(report['meta']['dataset']['properties'], 20)
+        for row in report['endpoints'].values():
+            self.assertEqual(row['errors'], 0)
+            self.assertEqual(row['requests'], 3)
+            self.assertGreater(row['queries_per_request'], 0)
+        self.assertEqual(PropertyTransfer.objects.count(), 23)
@@ -0,0 +1,127 @@
+# backend/propertycontrol/transfers.py
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Property, PropertyTransfer, InventoryCounter, VersionConflict
+
+MAX_BULK_TRANSFER = 5000
+
+
+class TransferError(Exception):
+    def __init__(self, message, property_ids=None):
+        super().__init__(message)
+        self.property_ids = property_ids or []
+
+
+def transfer_property(property_id, to_department, user, notes='', expected_version=None):
+    """
+    Move one property to ``to_department`` and log the transfer.
+
+    The row is locked first, so concurrent transfers of one property queue
+    up and each logs the department the previous one left it in. The move
+    is a targeted UPDATE of the department and version, guarded by the
+    version read under the lock; on backends without row locks the guard
+    alone turns a race into VersionConflict instead of a lost update.
+    ``expected_version`` is the version the client last saw. Returns the
+    PropertyTransfer.
+    """
+    with transaction.atomic():
+        row = Property.objects.select_for_update().filter(pk=property_id).values(
+            'id', 'version', *InventoryCounter.TRACKED_FIELDS
+        ).first()
+        if row is None:
+            raise Property.DoesNotExist('Property not found.')
+        if expected_version is not None and expected_version != row['version']:
+            raise VersionConflict(expected_version, row['version'])
+
+        moved = Property.objects.filter(pk=property_id, version=row['version']).update(
+            current_department=to_department, version=F('version') + 1, updated_at=timezone.now()
+        )
+        if not moved:
+            raise VersionConflict(row['version'])
+        transfer = PropertyTransfer.objects.create(
+            property_id=property_id,
+            from_department_id=row['current_department_id'],
+            to_department=to_department,
+            transferred_by=user,
+            notes=notes,
+            value=row['current_value'],
+            category_id=row['category_id'],
+        )
+        InventoryCounter.objects.record_move([row], to_department.pk)
+    return transfer
+
+
+def bulk_transfer(queryset, to_department, user, from_department=None, notes='',
+                  property_ids=None):
+    """
+    Move every property in ``queryset`` to ``to_department`` atomically.
+
+    The rows are locked, checked to share a single source department (or to
+    all sit in ``from_department`` when given), then recorded with one
+    ``bulk_create`` of PropertyTransfer rows and moved with one UPDATE.
+    Properties already in ``to_department`` are skipped. When the caller
+    named explicit ``property_ids``, every one of them must exist.
+    """
+    with transaction.atomic():
+        rows = list(
+            queryset.order_by('id').select_for_update()
+            .values('id', *InventoryCounter.TRACKED_FIELDS)[:MAX_BULK_TRANSFER + 1]
+        )
+        if not rows:
+            raise TransferError('No properties matched.')
+        if len(rows) > MAX_BULK_TRANSFER:
+            raise TransferError(f'At most {MAX_BULK_TRANSFER} properties can be moved at once.')
+        if property_ids is not None:
+            missing = set(property_ids) - {row['id'] for row in rows}
+            if missing:
+                raise TransferError('Some properties do not exist.', sorted(missing))
+
+        if from_department is not None:
+            misplaced = [
+                row['id'] for row in rows
+                if row['current_department_id'] != from_department.pk
+            ]
+            if misplaced:
+                raise TransferError(
+                    f'Some properties are not in department {from_department.pk}.', misplaced
+                )
+        else:
+            sources = {row['current_department_id'] for row in rows}
+            if None in sources:
+                raise TransferError(
+                    'Some properties have no current department; pass from_department.',
+                    [row['id'] for row in rows if row['current_department_id'] is None],
+                )
+            if len(sources) > 1:
+                raise TransferError(
+                    'Properties come from more than one department; pass from_department.',
+                    [row['id'] for row in rows],
+                )
+
+        moving = [row for row in rows if row['current_department_id'] != to_department.pk]
+        PropertyTransfer.objects.bulk_create([
+            PropertyTransfer(
+                property_id=row['id'],
+                from_department_id=row['current_department_id'],
+                to_department=to_department,
+                transferred_by=user,
+                notes=notes,
+                value=row['current_value'],
+                category_id=row['category_id'],
+            )
+            for row in moving
+        ])
+        Property.objects.filter(pk__in=[row['id'] for row in moving]).update(
+            current_department=to_department, version=F('version') + 1, updated_at=timezone.now()
+        )
+        InventoryCounter.objects.record_move(moving, to_department.pk)
+
+    return {
+        'transferred': len(moving),
+        'skipped': len(rows) - len(moving),
+        'from_department': rows[0]['current_department_id'] if from_department is None
+        else from_department.pk,
+        'to_department': to_department.pk,
+    }
@@ -1,13 +1,15 @@
 # backend/propertycontrol/urls.py
 
 from django.urls import path
-from . import views
+from rest_framework_simplejwt.views import TokenRefreshView
+from . import async_views, views
 from .views import DepartmentListCreateView, DepartmentDetailView, CategoryListCreateView, CategoryDetailView
 
 urlpatterns = [
     # Auth
     path('auth/login/', views.login_view, name='login'),
     path('auth/logout/', views.logout_view, name='logout'),
+    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
     path('auth/profile/', views.profile_view, name='profile'),
 
     # Dashboard
@@ -21,15 +23,40 @@ urlpatterns = [
 
     # Properties
     path('properties/', views.PropertyListCreateView.as_view(), name='property-list'),
+    path('properties/export/', views.property_export_view, name='property-export'),
+    path('properties/import/', views.PropertyImportView.as_view(), name='property-import'),
     path('properties/<int:pk>/', views.PropertyDetailView.as_view(), name='property-detail'),
+    path('properties/<int:pk>/image/<str:rendition>/', views.property_image_rendition, name='property-image-rendition'),
     path('properties/<int:pk>/transfer/', views.property_transfer_view, name='property-transfer'),  # ✅ New route
 
 
     # Transfers
     path('transfers/', views.PropertyTransferListCreateView.as_view(), name='transfer-list'),
+    path('transfers/export/', views.transfer_export_view, name='transfer-export'),
+    path('transfers/bulk/', views.bulk_transfer_view, name='transfer-bulk'),
+    path('transfers/recent/', views.recent_transfers, name='recent-transfers'),
+    path('transfers/analytics/', views.transfer_analytics_view, name='transfer-analytics'),
+
+    # Depreciation & valuation
+    path('depreciation-policies/', views.DepreciationPolicyListCreateView.as_view(), name='depreciation-policy-list'),
+    path('depreciation-policies/<int:pk>/', views.DepreciationPolicyDetailView.as_view(), name='depreciation-policy-detail'),
+    path('valuations/', views.ValuationRunListView.as_view(), name='valuation-list'),
+    path('valuations/revalue/', views.revalue_view, name='valuation-revalue'),
+
+    # Background jobs
+    path('jobs/', views.JobListView.as_view(), name='job-list'),
+    path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job-detail'),
+    path('jobs/<int:pk>/download/', views.job_download, name='job-download'),
+
+    # Async (ASGI) read endpoints
+    path('async/dashboard/stats/', async_views.dashboard_stats, name='async-dashboard-stats'),
+    path('async/transfers/recent/', async_views.recent_transfers, name='async-recent-transfers'),
+    path('async/properties/', async_views.property_list, name='async-property-list'),
+    path('async/properties/<int:pk>/', async_views.property_detail, name='async-property-detail'),
 
     # Admin
     path('admin/users/', views.UserListCreateView.as_view(), name='user-list'),
+    path('admin/metrics/', views.metrics_view, name='admin-metrics'),
     path('departments/', DepartmentListCreateView.as_view(), name='department-list'),
     path('departments/<int:pk>/', DepartmentDetailView.as_view(), name='department-detail'),
     path('categories/', CategoryListCreateView.as_view(), name='category-list'),
@@ -2,18 +2,47 @@
 
 from rest_framework.exceptions import ValidationError
 from rest_framework import generics, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import authenticate
-from django.db.models import Q
-
-from .models import User, Department, Category, Property, PropertyTransfer
+from django.http import FileResponse, Http404, HttpResponseRedirect, StreamingHttpResponse
+from datetime import date, timedelta
+import logging
+import os
+import uuid
+
+from .models import (
+    User, Department, Category, Property, PropertyTransfer, Job,
+    DepreciationPolicy, ValuationRun, VersionConflict
+)
+from . import analytics, dashboard, images, metrics
+from .authentication import RevocableRefreshToken, revoke_token, token_for_user
+from .caching import CachedListMixin
+from .exports import export_rows, iter_csv
+from .fastread import FastListMixin
+from .fieldsets import SparseFieldsetViewMixin
+from .filters import filter_properties, parse_as_of
+from .imports import ImportFormatError, PropertyImporter, iter_rows
+from .jobs import enqueue, existing_job, job_storage
+from .pagination import (
+    OptionalCursorPaginationMixin, PropertyCursorPagination,
+    PropertyTransferCursorPagination
+)
+from .renderers import FastJSONRenderer, PrometheusRenderer
+from .revocation import RevocationStoreFull
 from .serializers import (
     UserSerializer, LoginSerializer, DepartmentSerializer,
-    CategorySerializer, PropertySerializer, PropertyTransferSerializer,
-    PropertyTransferCreateSerializer
+    CategorySerializer, PropertySerializer, PropertyAsOfSerializer, PropertyTransferSerializer,
+    PropertyTransferCreateSerializer, BulkTransferSerializer, JobSerializer,
+    DepreciationPolicySerializer, ValuationRunSerializer
 )
+from .transfers import TransferError, bulk_transfer, transfer_property
+
+logger = logging.getLogger(__name__)
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -21,6 +50,32 @@ class IsAdminUser(permissions.BasePermission):
         return request.user and request.user.role == 'admin'
 
 
+def wants_async(request):
+    """``?async=1`` queues the work as a background job instead."""
+    return request.query_params.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def get_as_of(request):
+    """The ``?as_of=`` moment, or None; malformed values are a 400."""
+    try:
+        return parse_as_of(request.query_params.get('as_of'))
+    except ValueError as e:
+        raise ValidationError({'as_of': [str(e)]})
+
+
+def job_accepted(request, job):
+    data = JobSerializer(job, context={'request': request}).data
+    return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': data['url']})
+
+
+def queue_job(request, kind, payload):
+    job, _ = enqueue(
+        kind, payload, user=request.user,
+        idempotency_key=request.headers.get('Idempotency-Key'),
+    )
+    return job_accepted(request, job)
+
+
 # --------------------
 # Authentication Views
 # --------------------
@@ -31,7 +86,7 @@ def login_view(request):
     serializer = LoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
+        refresh = token_for_user(user)
         return Response({
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -45,12 +100,20 @@ def login_view(request):
 def logout_view(request):
     try:
         refresh_token = request.data["refresh"]
-        token = RefreshToken(refresh_token)
-        token.blacklist()
-        return Response({"message": "Logout successful"})
-    except Exception:
+        token = RevocableRefreshToken(refresh_token)
+    except (KeyError, TokenError):
         return Response({"error": "Invalid token"}, status=status.HTTP_400_BAD_REQUEST)
 
+    try:
+        revoke_token(token)
+        if request.auth is not None:
+            revoke_token(request.auth)
+    except RevocationStoreFull:
+        return Response(
+            {"error": "Logout is temporarily unavailable."}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    return Response({"message": "Logout successful"})
+
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -62,30 +125,35 @@ def profile_view(request):
 # Departments
 # --------------------
 
-class DepartmentListCreateView(generics.ListCreateAPIView):
-    queryset = Department.objects.all()
+class DepartmentListCreateView(CachedListMixin, SparseFieldsetViewMixin, generics.ListCreateAPIView):
+    queryset = Department.objects.for_api()
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_resource = 'departments'
 
 
 # --------------------
 # Categories
 # --------------------
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+class CategoryListCreateView(CachedListMixin, generics.ListCreateAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_resource = 'categories'
 
 
 # --------------------
 # Properties
 # --------------------
 
-class PropertyListCreateView(generics.ListCreateAPIView):
-    queryset = Property.objects.all()
+class PropertyListCreateView(FastListMixin, OptionalCursorPaginationMixin, SparseFieldsetViewMixin,
+                             generics.ListCreateAPIView):
+    queryset = Property.objects.for_api()
     serializer_class = PropertySerializer
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    cursor_pagination_class = PropertyCursorPagination
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -95,47 +163,139 @@ class PropertyListCreateView(generics.ListCreateAPIView):
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
         except ValidationError as e:
-            print("🔴 Property validation error:", e.detail)
+            logger.info('Property validation error: %s', e.detail)
             return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
     def get_queryset(self):
-        queryset = Property.objects.all()
-        search = self.request.query_params.get('search', None)
-        department = self.request.query_params.get('department', None)
-        category = self.request.query_params.get('category', None)
+        return filter_properties(
+            Property.objects.for_api(), self.request.query_params, as_of=self.as_of
+        )
+
+    @property
+    def as_of(self):
+        if not hasattr(self, '_as_of'):
+            self._as_of = get_as_of(self.request) if self.request.method == 'GET' else None
+        return self._as_of
 
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(code__icontains=search) |
-                Q(description__icontains=search)
-            )
+    def get_serializer_class(self):
+        if self.as_of is not None:
+            return PropertyAsOfSerializer
+        return PropertySerializer
 
-        if department:
-            queryset = queryset.filter(current_department__id=department)
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.as_of is not None:
+            context['department_names'] = dict(dashboard.department_names())
+        return context
 
-        if category:
-            queryset = queryset.filter(category__id=category)
 
-        return queryset
+class PropertyImportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "A CSV or XLSX file is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows = iter_rows(upload, upload.name)
+        except ImportFormatError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if wants_async(request):
+            job = existing_job(request.user, request.headers.get('Idempotency-Key'))
+            if job is not None:
+                return job_accepted(request, job)
+            extension = os.path.splitext(upload.name)[1].lower()
+            name = job_storage().save(f'uploads/{uuid.uuid4().hex}{extension}', upload)
+            return queue_job(request, 'import_properties', {'file': name, 'user': request.user.pk})
+
+        try:
+            result = PropertyImporter(request.user).run(rows)
+        except ImportFormatError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+def queue_export(request, kind, param_names):
+    file_format = request.query_params.get('format', 'csv')
+    if file_format not in ('csv', 'xlsx'):
+        return Response({"error": "format must be csv or xlsx."}, status=status.HTTP_400_BAD_REQUEST)
+    params = {
+        name: request.query_params[name] for name in param_names
+        if request.query_params.get(name)
+    }
+    return queue_job(request, 'export', {'kind': kind, 'format': file_format, 'params': params})
+
+
+def csv_download(filename, header, rows):
+    response = StreamingHttpResponse(iter_csv(header, rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def property_export_view(request):
+    if wants_async(request):
+        return queue_export(request, 'properties', ['search', 'department', 'category'])
+    queryset = filter_properties(Property.objects.all(), request.query_params)
+    return csv_download('properties.csv', *export_rows('properties', queryset))
+
+
+def version_conflict(exc):
+    return Response(
+        {"error": str(exc), "version": exc.current}, status=status.HTTP_409_CONFLICT
+    )
 
 
 class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Property.objects.all()
+    queryset = Property.objects.for_api()
     serializer_class = PropertySerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except VersionConflict as exc:
+            return version_conflict(exc)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def property_image_rendition(request, pk, rendition):
+    # Lazy path: renditions missing on disk are generated on first request.
+    # Hashing and resizing are costly, so a request needs either a signed-in
+    # user or the signature API responses put in the URL (<img> tags send no
+    # token); anonymous clients cannot walk the PKs.
+    if rendition not in images.RENDITIONS:
+        raise Http404
+    if not request.user.is_authenticated and not images.valid_rendition_signature(
+            pk, rendition, request.query_params.get('signature')):
+        return Response({"error": "A valid signature is required."}, status=status.HTTP_403_FORBIDDEN)
+
+    prop = Property.objects.filter(pk=pk).only('id', 'image', 'image_hash').first()
+    if prop is None or not prop.image:
+        raise Http404
+
+    if not prop.image_hash:
+        prop.image_hash = images.content_hash(prop.image)
+        Property.objects.filter(pk=pk).update(image_hash=prop.image_hash)
+    images.generate_renditions(prop.image.name, prop.image_hash, prop.image.storage)
+    return HttpResponseRedirect(
+        images.default_storage.url(images.rendition_name(prop.image_hash, rendition))
+    )
+
 
 # ✅ Property Transfer via PUT /properties/<pk>/transfer/
 @api_view(['PUT'])
 @permission_classes([permissions.IsAuthenticated])
 def property_transfer_view(request, pk):
-    try:
-        property = Property.objects.get(pk=pk)
-    except Property.DoesNotExist:
+    if not Property.objects.filter(pk=pk).exists():
         return Response({"error": "Property not found."}, status=status.HTTP_404_NOT_FOUND)
 
     new_department_id = request.data.get("department")
@@ -147,18 +307,22 @@ def property_transfer_view(request, pk):
     except Department.DoesNotExist:
         return Response({"error": "Target department does not exist."}, status=status.HTTP_404_NOT_FOUND)
 
-    # Create the transfer record
-    PropertyTransfer.objects.create(
-        property=property,
-        from_department=property.current_department,
-        to_department=new_department,
-        transferred_by=request.user
-    )
+    expected_version = request.data.get("version")
+    if expected_version is not None:
+        try:
+            expected_version = int(expected_version)
+        except (TypeError, ValueError):
+            return Response({"error": "Version must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Update property
-    property.current_department = new_department
-    property.save()
+    # Locks the row, logs the move and updates only the department.
+    try:
+        transfer_property(pk, new_department, request.user, expected_version=expected_version)
+    except Property.DoesNotExist:
+        return Response({"error": "Property not found."}, status=status.HTTP_404_NOT_FOUND)
+    except VersionConflict as exc:
+        return version_conflict(exc)
 
+    property = Property.objects.for_api().get(pk=pk)
     return Response(PropertySerializer(property).data, status=status.HTTP_200_OK)
 
 
@@ -166,17 +330,26 @@ def property_transfer_view(request, pk):
 # Transfers
 # --------------------
 
-class PropertyTransferListCreateView(generics.ListCreateAPIView):
-    queryset = PropertyTransfer.objects.all()
+class PropertyTransferListCreateView(FastListMixin, OptionalCursorPaginationMixin, SparseFieldsetViewMixin,
+                                     generics.ListCreateAPIView):
+    queryset = PropertyTransfer.objects.for_api()
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    cursor_pagination_class = PropertyTransferCursorPagination
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return PropertyTransferCreateSerializer
         return PropertyTransferSerializer
 
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except VersionConflict as exc:
+            return version_conflict(exc)
+
     def get_queryset(self):
-        queryset = PropertyTransfer.objects.all()
+        queryset = PropertyTransfer.objects.for_api()
         property_id = self.request.query_params.get('property', None)
 
         if property_id:
@@ -185,6 +358,93 @@ class PropertyTransferListCreateView(generics.ListCreateAPIView):
         return queryset
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_transfer_view(request):
+    serializer = BulkTransferSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    if wants_async(request):
+        payload = {key: data[key] for key in ('properties', 'filter') if key in data}
+        payload.update({
+            'to_department': data['to_department'].pk,
+            'from_department': data['from_department'].pk if data.get('from_department') else None,
+            'notes': data['notes'],
+            'user': request.user.pk,
+        })
+        return queue_job(request, 'bulk_transfer', payload)
+
+    if 'properties' in data:
+        queryset = Property.objects.filter(pk__in=data['properties'])
+    else:
+        queryset = filter_properties(Property.objects.all(), data['filter'])
+
+    try:
+        summary = bulk_transfer(
+            queryset,
+            data['to_department'],
+            request.user,
+            from_department=data.get('from_department'),
+            notes=data['notes'],
+            property_ids=data.get('properties'),
+        )
+    except TransferError as e:
+        return Response(
+            {"error": str(e), "properties": e.property_ids[:100]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(summary, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def transfer_export_view(request):
+    if wants_async(request):
+        return queue_export(request, 'transfers', ['property'])
+    queryset = PropertyTransfer.objects.all()
+    property_id = request.query_params.get('property', None)
+    if property_id:
+        queryset = queryset.filter(property__id=property_id)
+    return csv_download('transfers.csv', *export_rows('transfers', queryset))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def transfer_analytics_view(request):
+    params = request.query_params
+    bucket = params.get('bucket', 'month')
+    if bucket not in analytics.BUCKETS:
+        return Response({"error": "bucket must be day, week or month."}, status=status.HTTP_400_BAD_REQUEST)
+    group_by = [field for field in params.get('group_by', '').split(',') if field]
+    unknown = set(group_by) - set(analytics.GROUP_FIELDS)
+    if unknown:
+        return Response(
+            {"error": f"Unsupported group_by: {', '.join(sorted(unknown))}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        end = date.fromisoformat(params['end']) if params.get('end') else date.today() + timedelta(days=1)
+        start = date.fromisoformat(params['start']) if params.get('start') else end - timedelta(days=365)
+    except ValueError:
+        return Response({"error": "start and end must be YYYY-MM-DD dates."}, status=status.HTTP_400_BAD_REQUEST)
+    if start >= end:
+        return Response({"error": "start must be before end."}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = {
+        'bucket': bucket,
+        'group_by': group_by,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'results': analytics.transfer_analytics(start, end, bucket, group_by),
+    }
+    if {'from_department', 'to_department'} & set(group_by):
+        data['departments'] = dict(dashboard.department_names())
+    if 'category' in group_by:
+        data['categories'] = dict(Category.objects.values_list('id', 'name'))
+    return Response(data)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def recent_transfers(request):
@@ -194,11 +454,97 @@ def recent_transfers(request):
     except (ValueError, TypeError):
         limit = 5
     
-    transfers = PropertyTransfer.objects.order_by('-transfer_date')[:limit]
+    transfers = PropertyTransfer.objects.for_api().order_by('-transfer_date')[:limit]
     serializer = PropertyTransferSerializer(transfers, many=True)
     return Response(serializer.data)
 
 
+# --------------------
+# Depreciation & Valuation
+# --------------------
+
+class AdminWriteMixin:
+    def get_permissions(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return [permissions.IsAuthenticated(), IsAdminUser()]
+        return [permissions.IsAuthenticated()]
+
+
+class DepreciationPolicyListCreateView(AdminWriteMixin, generics.ListCreateAPIView):
+    queryset = DepreciationPolicy.objects.select_related('category').order_by('category__name')
+    serializer_class = DepreciationPolicySerializer
+
+
+class DepreciationPolicyDetailView(AdminWriteMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = DepreciationPolicy.objects.select_related('category')
+    serializer_class = DepreciationPolicySerializer
+
+
+class ValuationRunListView(generics.ListAPIView):
+    queryset = ValuationRun.objects.all()
+    serializer_class = ValuationRunSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated, IsAdminUser])
+def revalue_view(request):
+    as_of = request.data.get('as_of')
+    if as_of:
+        try:
+            as_of = date.fromisoformat(as_of)
+        except (TypeError, ValueError):
+            return Response({"error": "as_of must be a YYYY-MM-DD date."}, status=status.HTTP_400_BAD_REQUEST)
+        as_of = as_of.isoformat()
+    return queue_job(request, 'revaluation', {'as_of': as_of, 'user': request.user.pk})
+
+
+# --------------------
+# Jobs
+# --------------------
+
+def visible_jobs(user):
+    """Admins see every job, other users only their own."""
+    if user.role == 'admin':
+        return Job.objects.all()
+    return Job.objects.filter(created_by=user)
+
+
+class JobListView(generics.ListAPIView):
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = visible_jobs(self.request.user)
+        job_status = self.request.query_params.get('status')
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return visible_jobs(self.request.user)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def job_download(request, pk):
+    job = visible_jobs(request.user).filter(pk=pk).first()
+    if job is None or job.status != 'succeeded' or not (job.result or {}).get('file'):
+        raise Http404
+    storage = job_storage()
+    if not storage.exists(job.result['file']):
+        raise Http404
+    return FileResponse(
+        storage.open(job.result['file'], 'rb'), as_attachment=True,
+        filename=job.result.get('filename') or os.path.basename(job.result['file'])
+    )
+
+
 # --------------------
 # Dashboard
 # --------------------
@@ -206,31 +552,29 @@ def recent_transfers(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def dashboard_stats(request):
-    stats = {
-        'total_properties': Property.objects.count(),
-        'active_properties': Property.objects.filter(status='active').count(),
-        'total_departments': Department.objects.count(),
-        'total_categories': Category.objects.count(),
-        'recent_transfers': PropertyTransferSerializer(
-            PropertyTransfer.objects.order_by('-transfer_date')[:5],
-            many=True
-        ).data,
-        'properties_by_department': {}
-    }
+    return Response(dashboard.dashboard_stats(as_of=get_as_of(request)))
 
-    for dept in Department.objects.all():
-        stats['properties_by_department'][dept.name] = Property.objects.filter(
-            current_department=dept
-        ).count()
 
-    return Response(stats)
+# --------------------
+# Admin - Metrics
+# --------------------
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdminUser])
+@renderer_classes([JSONRenderer, PrometheusRenderer])
+def metrics_view(request):
+    """
+    This worker's request metrics per endpoint: JSON by default, the
+    Prometheus text format for ``Accept: text/plain`` or ``?format=prometheus``.
+    """
+    return Response(metrics.registry.snapshot())
 
 
 # --------------------
 # Admin - Users
 # --------------------
 
-class UserListCreateView(generics.ListCreateAPIView):
+class UserListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -240,12 +584,13 @@ class UserListCreateView(generics.ListCreateAPIView):
             return [permissions.IsAuthenticated(), IsAdminUser()]
         return [permissions.IsAuthenticated()]
 
-class DepartmentListCreateView(generics.ListCreateAPIView):
-    queryset = Department.objects.all()
+class DepartmentListCreateView(CachedListMixin, SparseFieldsetViewMixin, generics.ListCreateAPIView):
+    queryset = Department.objects.for_api()
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_resource = 'departments'
 class DepartmentDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Department.objects.all()
+    queryset = Department.objects.for_api()
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):